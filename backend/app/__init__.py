@@ -1,5 +1,6 @@
 from flask import Flask
 from flask_cors import CORS
+import multiprocessing
 import os
 from dotenv import load_dotenv
 
@@ -24,21 +25,77 @@ def create_app(test_config=None):
         'FPL_ASSISTANT_DATABASE',
         os.path.join(app.instance_path, 'fpl_assistant.sqlite3'),
     )
+    app.config['PROJECTION_RETENTION_SETS'] = int(os.getenv('FPL_PROJECTION_RETENTION_SETS', 5))
+    retention_days = os.getenv('FPL_PROJECTION_RETENTION_DAYS')
+    app.config['PROJECTION_RETENTION_DAYS'] = int(retention_days) if retention_days else None
+    app.config['REFRESH_WORKERS'] = int(os.getenv('FPL_REFRESH_WORKERS', 8))
+    app.config['SCHEDULER_ENABLED'] = os.getenv('FPL_SCHEDULER_ENABLED', '0') == '1'
+    app.config['SCHEDULER_INTERVAL_SECONDS'] = float(os.getenv('FPL_SCHEDULER_INTERVAL_SECONDS', 1800))
+    app.config['SCHEDULER_JITTER_SECONDS'] = float(os.getenv('FPL_SCHEDULER_JITTER_SECONDS', 60))
+    app.config['SCHEDULER_STALE_TEAM_SECONDS'] = float(os.getenv('FPL_SCHEDULER_STALE_TEAM_SECONDS', 6 * 3600))
+    app.config['PROJECTION_HORIZON'] = int(os.getenv('FPL_PROJECTION_HORIZON', 6))
+    app.config['SQLITE_POOL'] = os.getenv('FPL_SQLITE_POOL', '1') != '0'
+    app.config['SQLITE_CACHE_KIB'] = int(os.getenv('FPL_SQLITE_CACHE_KIB', 16384))
+    app.config['SQLITE_MMAP_BYTES'] = int(os.getenv('FPL_SQLITE_MMAP_BYTES', 64 * 1024 * 1024))
+    app.config['SQLITE_CACHED_STATEMENTS'] = int(os.getenv('FPL_SQLITE_CACHED_STATEMENTS', 256))
+    app.config['PHOTO_CACHE_DIR'] = os.getenv('FPL_PHOTO_CACHE_DIR', os.path.join(app.instance_path, 'photos'))
+    app.config['PHOTO_MEMORY_BYTES'] = int(os.getenv('FPL_PHOTO_MEMORY_BYTES', 16 * 1024 * 1024))
+    app.config['PHOTO_PREFETCH'] = os.getenv('FPL_PHOTO_PREFETCH', '0') == '1'
+    app.config['METRICS_ENABLED'] = os.getenv('FPL_METRICS_ENABLED', '1') != '0'
+    app.config['LEAGUE_MAX_MEMBERS'] = int(os.getenv('FPL_LEAGUE_MAX_MEMBERS', 1000))
+    app.config['LEAGUE_REQUESTS_PER_SECOND'] = float(os.getenv('FPL_LEAGUE_REQUESTS_PER_SECOND', 10))
+    app.config['PLANNER_WORKERS'] = int(os.getenv('FPL_PLANNER_WORKERS', min(4, os.cpu_count() or 1)))
+    app.config['UPSTREAM_MODE'] = os.getenv('FPL_UPSTREAM_MODE', 'off')
+    app.config['UPSTREAM_ARCHIVE'] = os.getenv('FPL_UPSTREAM_ARCHIVE', os.path.join(app.instance_path, 'upstream-archive'))
+    app.config['REPLAY_LATENCY'] = os.getenv('FPL_REPLAY_LATENCY')
+    app.config['REPLAY_AT'] = os.getenv('FPL_REPLAY_AT')
     if test_config:
         app.config.update(test_config)
 
     database_directory = os.path.dirname(app.config['DATABASE'])
     if database_directory:
         os.makedirs(database_directory, exist_ok=True)
+    # Store calls share one connection per thread; connections are closed at interpreter exit.
+    from app.utils.sqlite_pool import configure_pool
+    configure_pool(app.config['DATABASE'], cache_kib=app.config['SQLITE_CACHE_KIB'], mmap_bytes=app.config['SQLITE_MMAP_BYTES'],
+                   cached_statements=app.config['SQLITE_CACHED_STATEMENTS'], persistent=app.config['SQLITE_POOL'])
     from app.services.tracked_team_store import initialize_database
     initialize_database(app.config['DATABASE'])
+
+    # Record or replay every upstream response; see docs/api/ARCHITECTURE.md, "Record and Replay".
+    from app.utils.http_session import http_session
+    from app.utils.upstream_archive import archive_from_config
+    http_session.archive = archive_from_config(app.config)
+
+    from app.services.photo_store import PhotoStore
+    app.extensions['photo_store'] = PhotoStore(app.config['PHOTO_CACHE_DIR'], memory_bytes=app.config['PHOTO_MEMORY_BYTES'])
     
     # Register blueprints
-    from app.routes import team_bp, recommendations_bp, photos_bp, tracked_teams_bp, planning_bp
+    from app.routes import team_bp, recommendations_bp, photos_bp, tracked_teams_bp, planning_bp, metrics_bp, leagues_bp
     app.register_blueprint(team_bp)
     app.register_blueprint(recommendations_bp)
     app.register_blueprint(photos_bp)
     app.register_blueprint(tracked_teams_bp)
     app.register_blueprint(planning_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(leagues_bp)
+
+    from app.utils.instrumentation import init_app as init_instrumentation
+    init_instrumentation(app)
+
+    from app.utils.process_pool import configure as configure_process_pool
+    configure_process_pool(app.config['PLANNER_WORKERS'])
+
+    from app.commands import register_commands
+    register_commands(app)
+
+    # Every worker may start one; a database lease lets only one of them run refresh cycles.
+    # Planner pool processes re-import the main script, and with it any module-level create_app(); they never schedule.
+    if app.config['SCHEDULER_ENABLED'] and not app.config.get('TESTING') and multiprocessing.parent_process() is None:
+        import atexit
+        from app.services.background_refresh import scheduler_from_config
+        scheduler = app.extensions['refresh_scheduler'] = scheduler_from_config(app.config, app.extensions['photo_store'])
+        scheduler.start()
+        atexit.register(scheduler.stop, 5)
     
     return app
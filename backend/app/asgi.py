@@ -0,0 +1,144 @@
+"""ASGI serving path: upstream-bound team endpoints prefetch on asyncio, the Flask app renders every response."""
+
+import asyncio
+import io
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.data_context import PRIMED_CONTEXT_ENVIRON_KEY, FPLDataContext
+from app.utils.async_fpl_api import AsyncFPLClient
+
+# Team and recommendation endpoints start from the entry, its picks, bootstrap and fixtures.
+TEAM_PATH = re.compile(r'^/api/(?:team|recommendations)/(\d+)/')
+
+
+async def prefetch_team_context(upstream: AsyncFPLClient, team_id: int) -> FPLDataContext:
+    """A data context with entry, picks, bootstrap and fixtures fetched concurrently.
+
+    Picks need the current gameweek, so they wait for bootstrap only; the
+    request then waits roughly as long as its slowest fetch instead of the
+    sum of all of them. Failed fetches are left unprimed, so the handler
+    repeats them and reports the error exactly as the sync path does.
+    """
+    context = FPLDataContext(upstream.client)
+    bootstrap = asyncio.ensure_future(upstream.get_bootstrap_static())
+
+    async def current_picks():
+        await bootstrap
+        gameweek = await upstream.get_current_gameweek()
+        context.prime('current_gameweek', gameweek)
+        context.prime(('picks', team_id, gameweek), await upstream.get_team_picks(team_id, gameweek))
+
+    loads = {'bootstrap': bootstrap, 'fixtures': upstream.get_fixtures(), ('entry', team_id): upstream.get_team_data(team_id)}
+    results = await asyncio.gather(*loads.values(), current_picks(), return_exceptions=True)
+    for key, result in zip(loads, results):
+        if not isinstance(result, BaseException):
+            context.prime(key, result)
+    return context
+
+
+def _environ(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name, value = name.decode('latin-1').upper().replace('-', '_'), value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+        else:
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    # The body is already buffered, so chunked uploads get a length too.
+    environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+def _run_wsgi(wsgi_app, environ: Dict[str, Any]) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    response: Dict[str, Any] = {}
+    chunks: List[bytes] = []
+
+    def start_response(status, headers, exc_info=None):
+        response['status'], response['headers'] = status, headers
+        return chunks.append
+
+    iterable = wsgi_app(environ, start_response)
+    try:
+        chunks.extend(iterable)
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+    headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response['headers']]
+    return int(response['status'].split(' ', 1)[0]), headers, b''.join(chunks)
+
+
+class ASGIApplication:
+    """Serve a Flask app over ASGI, prefetching upstream payloads for team endpoints concurrently.
+
+    Every request is rendered by the Flask app on a pool of
+    ``handler_threads``, so responses and errors match the WSGI server
+    exactly. For team and recommendation endpoints the upstream fetches
+    happen first, on the event loop, and the handler receives them through
+    a primed data context; a handler thread is only held for the in-memory
+    work. Responses are buffered, which suits the JSON and photo endpoints.
+    """
+
+    def __init__(self, wsgi_app, upstream: Optional[AsyncFPLClient] = None, handler_threads: Optional[int] = None):
+        self.wsgi_app = wsgi_app
+        self.upstream = upstream or AsyncFPLClient()
+        self._handlers = ThreadPoolExecutor(handler_threads or int(os.getenv('FPL_ASGI_HANDLER_THREADS', 8)),
+                                            thread_name_prefix='fpl-asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        body = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        environ = _environ(scope, b''.join(body))
+        match = TEAM_PATH.match(scope['path'])
+        if match and scope['method'] == 'GET':
+            environ[PRIMED_CONTEXT_ENVIRON_KEY] = await prefetch_team_context(self.upstream, int(match.group(1)))
+        status, headers, content = await asyncio.get_running_loop().run_in_executor(self._handlers, _run_wsgi, self.wsgi_app, environ)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': content})
+
+    def close(self) -> None:
+        self._handlers.shutdown(wait=False, cancel_futures=True)
+        self.upstream.close()
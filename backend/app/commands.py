@@ -0,0 +1,113 @@
+"""Maintenance commands for the local tracker database, run with ``flask --app run <command>``."""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.services.background_refresh import scheduler_from_config
+from app.services.mini_league import refresh_league
+from app.services.photo_store import player_photo_codes
+from app.services.team_refresh import refresh_tracked_teams
+from app.services.tracked_team_store import TrackedTeamStore
+from app.utils.fpl_api import FPLAPIClient
+from app.utils.http_session import http_session
+from app.utils.upstream_archive import UpstreamArchive
+
+
+def register_commands(app):
+    app.cli.add_command(compact_database)
+    app.cli.add_command(refresh_teams)
+    app.cli.add_command(refresh_cycle)
+    app.cli.add_command(prefetch_photos)
+    app.cli.add_command(record_upstream)
+    app.cli.add_command(refresh_league_command)
+
+
+@click.command('compact-db')
+@click.option('--keep-latest', type=int, default=None, help='Projection sets to keep per season and model (default: PROJECTION_RETENTION_SETS).')
+@click.option('--keep-days', type=int, default=None, help='Also keep projection sets generated within this many days.')
+@click.option('--full', is_flag=True, help='Rewrite the whole file with VACUUM instead of freeing pages incrementally.')
+@with_appcontext
+def compact_database(keep_latest, keep_days, full):
+    """Apply projection retention, then return free pages to the file system."""
+    store = TrackedTeamStore(current_app.config['DATABASE'])
+    retention = store.prune_projection_sets(keep_latest or current_app.config['PROJECTION_RETENTION_SETS'],
+                                            keep_days if keep_days is not None else current_app.config['PROJECTION_RETENTION_DAYS'])
+    compaction = store.compact(full=full)
+    click.echo(json.dumps({'retention': retention, 'compaction': compaction}, indent=2))
+
+
+@click.command('refresh-teams')
+@click.option('--team-id', 'team_ids', type=int, multiple=True, help='Refresh only this tracked team; repeat for several (default: all).')
+@click.option('--workers', type=int, default=None, help='Concurrent upstream fetches (default: REFRESH_WORKERS).')
+@with_appcontext
+def refresh_teams(team_ids, workers):
+    """Refresh tracked teams concurrently and print per-team status."""
+    store = TrackedTeamStore(current_app.config['DATABASE'])
+    result = refresh_tracked_teams(store, FPLAPIClient, os.getenv('FPL_SEASON', 'current'), list(team_ids) or None,
+                                   workers or current_app.config['REFRESH_WORKERS'])
+    click.echo(json.dumps(result, indent=2))
+
+
+@click.command('refresh-cycle')
+@with_appcontext
+def refresh_cycle():
+    """Run one background refresh cycle now, for cron-style scheduling."""
+    click.echo(json.dumps(scheduler_from_config(current_app.config, current_app.extensions['photo_store']).run_once(), indent=2))
+
+
+@click.command('prefetch-photos')
+@click.option('--workers', type=int, default=None, help='Concurrent photo downloads (default: REFRESH_WORKERS).')
+@with_appcontext
+def prefetch_photos(workers):
+    """Store photos for every player in the bootstrap that is not stored yet."""
+    codes = player_photo_codes(FPLAPIClient.get_bootstrap_static())
+    result = current_app.extensions['photo_store'].prefetch(codes, workers or current_app.config['REFRESH_WORKERS'])
+    click.echo(json.dumps(result, indent=2))
+
+
+@click.command('record-upstream')
+@click.option('--team-id', 'team_ids', type=int, multiple=True, help="Also record this team's entry, history, picks and picked players; repeat for several.")
+@click.option('--photos', is_flag=True, help='Also record the photo of every player in the bootstrap.')
+@click.option('--workers', type=int, default=None, help='Concurrent photo downloads (default: REFRESH_WORKERS).')
+@with_appcontext
+def record_upstream(team_ids, photos, workers):
+    """Record the current upstream payloads to UPSTREAM_ARCHIVE for later replay."""
+    os.makedirs(current_app.config['UPSTREAM_ARCHIVE'], exist_ok=True)
+    archive = UpstreamArchive(current_app.config['UPSTREAM_ARCHIVE'], 'record')
+    previous, http_session.archive = http_session.archive, archive
+    # Cached payloads would not reach the network, and so would not be recorded.
+    FPLAPIClient.invalidate_cache()
+    try:
+        bootstrap = FPLAPIClient.get_bootstrap_static()
+        FPLAPIClient.get_fixtures()
+        gameweek = FPLAPIClient.get_current_gameweek()
+        for team_id in team_ids:
+            FPLAPIClient.get_team_data(team_id)
+            FPLAPIClient.get_team_history(team_id)
+            for pick in FPLAPIClient.get_team_picks(team_id, gameweek).get('picks', []):
+                FPLAPIClient.get_player_data(pick['element'])
+        if photos:
+            with ThreadPoolExecutor(max_workers=workers or current_app.config['REFRESH_WORKERS']) as executor:
+                list(executor.map(current_app.extensions['photo_store'].fetch, player_photo_codes(bootstrap)))
+    finally:
+        http_session.archive = previous
+    click.echo(json.dumps(archive.stats(), indent=2))
+
+
+@click.command('refresh-league')
+@click.option('--league-id', type=int, required=True, help='Classic league to ingest.')
+@click.option('--workers', type=int, default=None, help='Concurrent upstream fetches (default: REFRESH_WORKERS).')
+@click.option('--force', is_flag=True, help="Fetch every member's picks again, even when already stored for this gameweek.")
+@with_appcontext
+def refresh_league_command(league_id, workers, force):
+    """Store a league's standings and its members' current picks."""
+    store = TrackedTeamStore(current_app.config['DATABASE'])
+    result = refresh_league(store, FPLAPIClient, os.getenv('FPL_SEASON', 'current'), league_id,
+                            workers or current_app.config['REFRESH_WORKERS'], current_app.config['LEAGUE_REQUESTS_PER_SECOND'],
+                            current_app.config['LEAGUE_MAX_MEMBERS'], force)
+    click.echo(json.dumps(result, indent=2))
@@ -1,10 +1,11 @@
 """Pure domain primitives shared by import and recommendation services."""
 
 from .rulesets import FPLRuleset, get_ruleset
-from .validation import ValidationResult, validate_squad, validate_transfer
+from .validation import TransferLegality, ValidationResult, validate_squad, validate_transfer
 
 __all__ = [
     "FPLRuleset",
+    "TransferLegality",
     "ValidationResult",
     "get_ruleset",
     "validate_squad",
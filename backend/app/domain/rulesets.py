@@ -16,6 +16,8 @@ class FPLRuleset:
     initial_budget_tenths: int
     point_cost_per_extra_transfer: int
     max_bank_tenths: int
+    free_transfers_per_gameweek: int
+    max_free_transfers: int
 
 
 # Kept as data in one place so a seasonal update does not require changes to
@@ -29,6 +31,8 @@ STANDARD_2026_V1 = FPLRuleset(
     initial_budget_tenths=1000,
     point_cost_per_extra_transfer=4,
     max_bank_tenths=1000,
+    free_transfers_per_gameweek=1,
+    max_free_transfers=5,
 )
 
 RULESETS = {STANDARD_2026_V1.id: STANDARD_2026_V1}
@@ -103,3 +103,45 @@ def validate_transfer(
     squad_result = validate_squad(proposed_squad, ruleset)
     errors.extend(squad_result.errors)
     return ValidationResult(valid=not errors, errors=tuple(dict.fromkeys(errors)))
+
+
+class TransferLegality:
+    """Answer ``validate_transfer(...).valid`` for many swaps out of one squad.
+
+    Club counts and owned ids are cached once. When the current squad is
+    itself valid, a same-position swap keeps the size and position counts, so
+    only the incoming player's id, club count and price need checking. An
+    invalid current squad falls back to ``validate_transfer``.
+    """
+
+    def __init__(self, current_squad: Iterable[Mapping[str, Any]], ruleset: FPLRuleset):
+        self.squad = list(current_squad)
+        self.ruleset = ruleset
+        self.players = {_player_id(player): player for player in self.squad}
+        self.clubs = Counter(player.get("team", player.get("club_id")) for player in self.squad)
+        self.clean = validate_squad(self.squad, ruleset).valid
+
+    def allows(
+        self,
+        outgoing_player_id: Any,
+        incoming_player: Mapping[str, Any],
+        bank_tenths: Optional[int],
+        selling_price_tenths: Optional[int],
+    ) -> bool:
+        if not self.clean:
+            return validate_transfer(self.squad, outgoing_player_id, incoming_player, bank_tenths, self.ruleset, selling_price_tenths).valid
+        outgoing = self.players.get(outgoing_player_id)
+        incoming_id = _player_id(incoming_player)
+        if outgoing is None or incoming_id is None or incoming_id in self.players:
+            return False
+        position = _position(incoming_player)
+        if position is None or position != _position(outgoing) or bank_tenths is None or selling_price_tenths is None:
+            return False
+        incoming_cost = incoming_player.get("now_cost", incoming_player.get("price_tenths"))
+        if not isinstance(incoming_cost, int) or incoming_cost > selling_price_tenths + bank_tenths:
+            return False
+        club = incoming_player.get("team", incoming_player.get("club_id"))
+        if club is None:
+            return False
+        leaving = club == outgoing.get("team", outgoing.get("club_id"))
+        return self.clubs[club] - leaving + 1 <= self.ruleset.max_players_per_club
@@ -5,6 +5,8 @@ recommendations_bp = Blueprint('recommendations', __name__, url_prefix='/api/rec
 photos_bp = Blueprint('photos', __name__, url_prefix='/api/photos')
 tracked_teams_bp = Blueprint('tracked_teams', __name__, url_prefix='/api/tracked-teams')
 planning_bp = Blueprint('planning', __name__, url_prefix='/api/v1')
+metrics_bp = Blueprint('metrics', __name__)
+leagues_bp = Blueprint('leagues', __name__, url_prefix='/api/leagues')
 
 # Import routes to register them
-from . import team_routes, recommendation_routes, photo_routes, tracked_team_routes, planning_routes
+from . import team_routes, recommendation_routes, photo_routes, tracked_team_routes, planning_routes, metrics_routes, league_routes
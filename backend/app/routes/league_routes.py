@@ -0,0 +1,54 @@
+"""HTTP routes for mini-league standings and effective ownership."""
+
+import os
+from flask import current_app, jsonify, request
+from app.routes import leagues_bp
+from app.routes.recommendation_routes import api_error_response
+from app.routes.tracked_team_routes import capped
+from app.services.mini_league import league_ownership, refresh_league
+from app.services.tracked_team_store import TrackedTeamStore
+from app.utils.fpl_api import FPLAPIClient
+
+
+def _store():
+    return TrackedTeamStore(current_app.config['DATABASE'])
+
+
+def _not_found():
+    return jsonify({'error': {'code': 'not_found', 'message': 'League has not been refreshed.', 'retryable': False}}), 404
+
+
+@leagues_bp.route('/<int:league_id>/refresh', methods=['POST'])
+def refresh_league_picks(league_id):
+    payload, config = request.get_json(silent=True) or {}, current_app.config
+    try:
+        result = refresh_league(_store(), FPLAPIClient, os.getenv('FPL_SEASON', 'current'), league_id,
+                                capped(payload.get('max_workers', config['REFRESH_WORKERS']), config['REFRESH_WORKERS']),
+                                config['LEAGUE_REQUESTS_PER_SECOND'],
+                                capped(payload.get('max_members', config['LEAGUE_MAX_MEMBERS']), config['LEAGUE_MAX_MEMBERS']),
+                                bool(payload.get('force')))
+        return jsonify(result), 200
+    except ValueError as error:
+        return jsonify({'error': {'code': 'invalid_input', 'message': str(error), 'retryable': False}}), 400
+    except Exception as error:
+        return api_error_response(error)
+
+
+@leagues_bp.route('/<int:league_id>', methods=['GET'])
+def get_league(league_id):
+    league = _store().get_league(league_id)
+    if league is None:
+        return _not_found()
+    return jsonify(league), 200
+
+
+@leagues_bp.route('/<int:league_id>/effective-ownership', methods=['GET'])
+def get_effective_ownership(league_id):
+    team_id = request.args.get('team_id', type=int)
+    try:
+        result = league_ownership(_store(), league_id, team_id, FPLAPIClient.get_team_picks)
+    except Exception as error:
+        return api_error_response(error)
+    if result is None:
+        return _not_found()
+    return jsonify(result), 200
@@ -0,0 +1,43 @@
+"""Prometheus scrape endpoint: recorded latency histograms plus cache counters read at scrape time."""
+
+from flask import current_app
+
+from . import metrics_bp
+from app.services.derived_cache import derived_cache
+from app.services.projection_cache import projection_cache
+from app.utils.fpl_api import FPLAPIClient
+from app.utils.instrumentation import registry
+from app.utils.sqlite_pool import get_pool
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _cache_samples():
+    samples = []
+
+    def cache(name, hits, misses):
+        labels = (('cache', name),)
+        samples.append(('fpl_cache_hits_total', 'counter', labels, hits))
+        samples.append(('fpl_cache_misses_total', 'counter', labels, misses))
+        if hits + misses:
+            samples.append(('fpl_cache_hit_ratio', 'gauge', labels, round(hits / (hits + misses), 4)))
+
+    for endpoint, counters in FPLAPIClient.cache_stats().items():
+        # A stale hit is still answered from memory; its refresh runs in the background.
+        cache(f'upstream_{endpoint}', counters['hits'] + counters['stale_hits'], counters['misses'])
+    projections, derived = projection_cache.stats(), derived_cache.stats()
+    cache('projections', projections['hits'], projections['misses'])
+    cache('derived_results', derived['hits'], derived['misses'])
+    photo_store = current_app.extensions.get('photo_store')
+    if photo_store is not None:
+        photos = photo_store.stats()
+        cache('photos', photos['memory_hits'] + photos['disk_hits'] + photos['missing_hits'],
+              photos['downloads'] + photos['not_found'] + photos['errors'])
+    connections = get_pool(current_app.config['DATABASE']).stats()
+    cache('sqlite_connections', connections['reused'], connections['opened'])
+    return samples
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    return current_app.response_class(registry.render(_cache_samples()), content_type=PROMETHEUS_CONTENT_TYPE)
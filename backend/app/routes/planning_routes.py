@@ -4,14 +4,21 @@ from flask import current_app, jsonify, request
 
 from app.routes import planning_bp
 from app.routes.recommendation_routes import api_error_response
-from app.services.projection_engine import build_baseline_projections
+from app.services.background_refresh import regenerate_projections, scheduler_from_config
+from app.services.bootstrap_index import get_bootstrap_index
+from app.services.derived_cache import derived_cache
+from app.services.projection_cache import get_projection_values, projection_cache
 from app.services.tracked_team_store import TrackedTeamStore
-from app.services.transfer_planner import plan_one_transfer
+from app.services.transfer_planner import DEFAULT_PLAN_COUNT, DEFAULT_PLAN_TIME_LIMIT_MS, plan_transfer_horizon
+from app.services.exact_squad_solver import DEFAULT_TIME_LIMIT_MS
 from app.services.squad_optimizer import optimize_squad
 from app.services.strategy_service import squad_alerts, strategy_state
 from app.utils.fpl_api import FPLAPIClient
 
 
+SOLVED_STATUSES = ('optimal', 'feasible')
+
+
 def _store():
     return TrackedTeamStore(current_app.config['DATABASE'])
 
@@ -27,16 +34,40 @@ def _gameweeks(payload):
 def refresh_projections():
     try:
         gameweeks = _gameweeks(request.get_json(silent=True) or {})
-        bootstrap, fixtures = FPLAPIClient.get_bootstrap_static(), FPLAPIClient.get_fixtures()
-        projections, warnings = build_baseline_projections(bootstrap.get('elements', []), fixtures, gameweeks)
-        projection_set = _store().save_projection_set('current', gameweeks, projections, warnings)
-        return jsonify({'projection_set': projection_set, 'coverage': len(projections)}), 201
+        result = regenerate_projections(_store(), FPLAPIClient.get_bootstrap_static(), FPLAPIClient.get_fixtures(), gameweeks,
+                                        current_app.config['PROJECTION_RETENTION_SETS'], current_app.config['PROJECTION_RETENTION_DAYS'])
+        return jsonify(result), 201
     except ValueError as error:
         return jsonify({'error': {'code': 'invalid_input', 'message': str(error), 'retryable': False}}), 400
     except Exception as error:
         return api_error_response(error)
 
 
+@planning_bp.route('/storage/metrics', methods=['GET'])
+def storage_metrics():
+    try:
+        metrics = _store().storage_stats()
+        metrics['projection_cache'] = projection_cache.stats()
+        return jsonify(metrics), 200
+    except Exception as error:
+        return api_error_response(error)
+
+
+@planning_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({'upstream': FPLAPIClient.cache_stats(), 'projections': projection_cache.stats(),
+                    'derived_results': derived_cache.stats()}), 200
+
+
+@planning_bp.route('/scheduler/status', methods=['GET'])
+def scheduler_status():
+    try:
+        scheduler = current_app.extensions.get('refresh_scheduler') or scheduler_from_config(current_app.config)
+        return jsonify({'enabled': current_app.config['SCHEDULER_ENABLED'], **scheduler.status()}), 200
+    except Exception as error:
+        return api_error_response(error)
+
+
 @planning_bp.route('/projections/latest', methods=['GET'])
 def latest_projections():
     projection_set = _store().latest_projection_set()
@@ -59,8 +90,8 @@ def get_strategy_alerts(team_id):
         state = _store().latest_squad_state(team_id)
         if state is None:
             return jsonify({'error': {'code': 'not_found', 'message': 'Tracked team was not found.', 'retryable': False}}), 404
-        bootstrap = FPLAPIClient.get_bootstrap_static()
-        return jsonify({'alerts': squad_alerts(state['team'], state['snapshot'], state['picks'], bootstrap.get('elements', []))}), 200
+        index = get_bootstrap_index(FPLAPIClient.get_bootstrap_static())
+        return jsonify({'alerts': squad_alerts(state['team'], state['snapshot'], state['picks'], index.players)}), 200
     except Exception as error:
         return api_error_response(error)
 
@@ -73,10 +104,14 @@ def _optimize(payload, budget_tenths):
     if any(gameweek not in projection_set['gameweeks'] for gameweek in gameweeks):
         return None, jsonify({'error': {'code': 'missing_projections', 'message': 'The latest projection set does not cover every requested gameweek.', 'retryable': False}}), 400
     bootstrap = FPLAPIClient.get_bootstrap_static()
-    result = optimize_squad(bootstrap.get('elements', []), _store().projection_values(projection_set['id']), gameweeks,
-                            budget_tenths, payload.get('locked_player_ids'), payload.get('excluded_player_ids'), payload.get('alternative_count', 0))
+    result = optimize_squad(bootstrap.get('elements', []), get_projection_values(_store(), projection_set['id']), gameweeks,
+                            budget_tenths, payload.get('locked_player_ids'), payload.get('excluded_player_ids'), payload.get('alternative_count', 0),
+                            payload.get('mode', 'exact'), payload.get('time_limit_ms', DEFAULT_TIME_LIMIT_MS))
+    if result['status'] == 'invalid_input':
+        raise ValueError(result['warnings'][0])
     return {'run': {'kind': payload.get('kind', 'squad_builder'), 'status': result['status'], 'projection_set_id': projection_set['id'],
-                    'ruleset_id': '2026-v1', 'optimizer_version': 'optimizer-0.1'}, 'solutions': result['solutions'], 'warnings': result['warnings']}, None, None
+                    'ruleset_id': '2026-v1', 'optimizer_version': 'optimizer-0.2', 'solver': result['solver']},
+            'solutions': result['solutions'], 'warnings': result['warnings']}, None, None
 
 
 @planning_bp.route('/optimizations/squad', methods=['POST'])
@@ -84,7 +119,7 @@ def build_initial_squad():
     try:
         payload = request.get_json(silent=True) or {}
         result, error, status = _optimize(payload, payload.get('budget_tenths'))
-        return (error, status) if error else (jsonify(result), 200 if result['run']['status'] == 'feasible' else 400)
+        return (error, status) if error else (jsonify(result), 200 if result['run']['status'] in SOLVED_STATUSES else 400)
     except ValueError as error:
         return jsonify({'error': {'code': 'invalid_input', 'message': str(error), 'retryable': False}}), 400
     except Exception as error:
@@ -104,7 +139,7 @@ def build_wildcard_squad(team_id):
             return jsonify({'error': {'code': 'missing_team_state', 'message': 'Wildcard mode requires bank and selling prices for every owned player.', 'retryable': False}}), 400
         payload['kind'] = 'wildcard'
         result, error, status = _optimize(payload, selling_total + state['snapshot']['bank_tenths'])
-        return (error, status) if error else (jsonify(result), 200 if result['run']['status'] == 'feasible' else 400)
+        return (error, status) if error else (jsonify(result), 200 if result['run']['status'] in SOLVED_STATUSES else 400)
     except ValueError as error:
         return jsonify({'error': {'code': 'invalid_input', 'message': str(error), 'retryable': False}}), 400
     except Exception as error:
@@ -123,13 +158,18 @@ def plan_transfers(team_id):
         if not projection_set:
             return jsonify({'error': {'code': 'missing_projections', 'message': 'Generate a projection set before planning transfers.', 'retryable': False}}), 400
         gameweeks = _gameweeks(payload)
-        if payload.get('max_transfers', 1) != 1:
-            return jsonify({'error': {'code': 'invalid_input', 'message': 'The initial planner supports exactly one transfer.', 'retryable': False}}), 400
+        alternative_count = payload.get('alternative_count', DEFAULT_PLAN_COUNT - 1)
+        if not isinstance(alternative_count, int) or isinstance(alternative_count, bool) or alternative_count < 0:
+            raise ValueError('alternative_count must be a non-negative integer.')
         if any(gameweek not in projection_set['gameweeks'] for gameweek in gameweeks):
             return jsonify({'error': {'code': 'missing_projections', 'message': 'The latest projection set does not cover every requested gameweek.', 'retryable': False}}), 400
         bootstrap = FPLAPIClient.get_bootstrap_static()
-        result = plan_one_transfer(state['snapshot'], state['picks'], bootstrap.get('elements', []),
-                                   _store().projection_values(projection_set['id']), gameweeks, payload.get('overrides'))
+        result = plan_transfer_horizon(state['snapshot'], state['picks'], bootstrap.get('elements', []),
+                                       get_projection_values(_store(), projection_set['id']), gameweeks, payload.get('overrides'),
+                                       max_transfers=payload.get('max_transfers', 1), max_transfers_per_gameweek=payload.get('max_transfers_per_gameweek'),
+                                       max_hit_points=payload.get('max_hit_points'), locked_player_ids=payload.get('locked_player_ids'),
+                                       excluded_player_ids=payload.get('excluded_player_ids'), plan_count=alternative_count + 1,
+                                       time_limit_ms=payload.get('time_limit_ms', DEFAULT_PLAN_TIME_LIMIT_MS))
         if result['status'] == 'invalid_input':
             return jsonify({'error': {'code': 'invalid_input', 'message': result['warnings'][0], 'retryable': False}}), 400
         minimum = payload.get('minimum_net_gain', 0)
@@ -141,7 +181,8 @@ def plan_transfers(team_id):
             solution['terminal_adjustment'] = 0
             solution['validation_status'] = 'valid'
         return jsonify({'run': {'kind': 'transfer_plan', 'status': result['status'], 'snapshot_id': state['snapshot']['id'],
-                                'projection_set_id': projection_set['id'], 'ruleset_id': '2026-v1', 'optimizer_version': 'optimizer-0.1'},
+                                'projection_set_id': projection_set['id'], 'ruleset_id': '2026-v1', 'optimizer_version': 'optimizer-0.2',
+                                'solver': result['solver']},
                         'baseline': result['baseline'], 'solutions': solutions, 'warnings': result['warnings']}), 200
     except ValueError as error:
         return jsonify({'error': {'code': 'invalid_input', 'message': str(error), 'retryable': False}}), 400
@@ -1,5 +1,7 @@
 from flask import request, jsonify
 from . import recommendations_bp
+from app.services.data_context import request_data_context
+from app.services.derived_cache import cached_team_response
 from app.services.recommendation_engine import RecommendationEngine
 from app.utils.fpl_api import FPLAPIError, FPLResourceNotFound
 
@@ -15,22 +17,26 @@ def api_error_response(error):
 def get_transfer_recommendations(team_id):
     """Get best 5 transfer options per position"""
     try:
-        engine = RecommendationEngine(team_id)
-        recommendations = engine.get_best_transfers_per_position()
-        
-        # Add debug info
-        debug_info = {
-            'team_id': team_id,
-            'positions_with_recommendations': {
-                pos: len(players) for pos, players in recommendations.items()
+        engine = RecommendationEngine(team_id, request_data_context())
+
+        def build():
+            recommendations = engine.get_best_transfers_per_position()
+            
+            # Add debug info
+            debug_info = {
+                'team_id': team_id,
+                'positions_with_recommendations': {
+                    pos: len(players) for pos, players in recommendations.items()
+                }
             }
-        }
-        
-        return jsonify({
-            'team_id': team_id,
-            'recommendations': recommendations,
-            '_debug': debug_info
-        }), 200
+            
+            return {
+                'team_id': team_id,
+                'recommendations': recommendations,
+                '_debug': debug_info
+            }
+
+        return cached_team_response('transfers', team_id, build)
     except Exception as error:
         return api_error_response(error)
 
@@ -38,12 +44,11 @@ def get_transfer_recommendations(team_id):
 def get_differentials(team_id):
     """Get 5 high-upside differentials"""
     try:
-        engine = RecommendationEngine(team_id)
-        differentials = engine.get_high_upside_differentials(count=5)
-        return jsonify({
+        engine = RecommendationEngine(team_id, request_data_context())
+        return cached_team_response('differentials', team_id, lambda: {
             'team_id': team_id,
-            'differentials': differentials
-        }), 200
+            'differentials': engine.get_high_upside_differentials(count=5)
+        })
     except Exception as error:
         return api_error_response(error)
 
@@ -51,11 +56,10 @@ def get_differentials(team_id):
 def get_all_recommendations(team_id):
     """Get all recommendations (transfers + differentials)"""
     try:
-        engine = RecommendationEngine(team_id)
-        all_recs = engine.get_smart_recommendations()
-        return jsonify({
+        engine = RecommendationEngine(team_id, request_data_context())
+        return cached_team_response('all', team_id, lambda: {
             'team_id': team_id,
-            'data': all_recs
-        }), 200
+            'data': engine.get_smart_recommendations()
+        })
     except Exception as error:
         return api_error_response(error)
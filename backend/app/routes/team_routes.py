@@ -3,6 +3,8 @@ from . import team_bp
 from app.services.team_analyzer import TeamAnalyzer
 from app.services.squad_transfer_analyzer import SquadTransferAnalyzer
 from app.routes.recommendation_routes import api_error_response
+from app.services.data_context import request_data_context
+from app.services.derived_cache import cached_team_response
 from app.utils.fpl_api import FPLAPIClient
 
 @team_bp.route('/current-gameweek', methods=['GET'])
@@ -18,7 +20,7 @@ def get_current_gameweek():
 def get_team_summary(team_id):
     """Get team summary"""
     try:
-        analyzer = TeamAnalyzer(team_id)
+        analyzer = TeamAnalyzer(team_id, request_data_context())
         summary = analyzer.get_team_summary()
         return jsonify(summary), 200
     except Exception as error:
@@ -28,7 +30,7 @@ def get_team_summary(team_id):
 def get_team_squad(team_id):
     """Get current squad"""
     try:
-        analyzer = TeamAnalyzer(team_id)
+        analyzer = TeamAnalyzer(team_id, request_data_context())
         squad = analyzer.get_current_squad()
         return jsonify({'squad': squad}), 200
     except Exception as error:
@@ -38,7 +40,7 @@ def get_team_squad(team_id):
 def get_team_analysis(team_id):
     """Get detailed team analysis"""
     try:
-        analyzer = TeamAnalyzer(team_id)
+        analyzer = TeamAnalyzer(team_id, request_data_context())
         analysis = analyzer.analyze_squad_health()
         return jsonify(analysis), 200
     except Exception as error:
@@ -48,9 +50,8 @@ def get_team_analysis(team_id):
 def get_detailed_team_analysis(team_id):
     """Get comprehensive team analysis including depth and upcoming fixtures"""
     try:
-        analyzer = TeamAnalyzer(team_id)
-        analysis = analyzer.get_detailed_analysis()
-        return jsonify(analysis), 200
+        analyzer = TeamAnalyzer(team_id, request_data_context())
+        return cached_team_response('detailed-analysis', team_id, analyzer.get_detailed_analysis)
     except Exception as error:
         return api_error_response(error)
 
@@ -58,7 +59,7 @@ def get_detailed_team_analysis(team_id):
 def get_squad_depth(team_id):
     """Get squad depth analysis"""
     try:
-        analyzer = TeamAnalyzer(team_id)
+        analyzer = TeamAnalyzer(team_id, request_data_context())
         depth = analyzer.analyze_squad_depth()
         return jsonify(depth), 200
     except Exception as error:
@@ -68,9 +69,8 @@ def get_squad_depth(team_id):
 def get_squad_transfer_analysis(team_id):
     """Get squad transfer analysis with smart swaps"""
     try:
-        analyzer = SquadTransferAnalyzer(team_id)
-        analysis = analyzer.analyze_squad_for_transfers()
-        return jsonify(analysis), 200
+        analyzer = SquadTransferAnalyzer(team_id, request_data_context())
+        return cached_team_response('transfer-analysis', team_id, analyzer.analyze_squad_for_transfers)
     except Exception as error:
         return api_error_response(error)
 
@@ -78,7 +78,7 @@ def get_squad_transfer_analysis(team_id):
 def get_underperformers(team_id):
     """Get list of underperforming players in current squad"""
     try:
-        analyzer = SquadTransferAnalyzer(team_id)
+        analyzer = SquadTransferAnalyzer(team_id, request_data_context())
         underperformers = analyzer._identify_underperformers()
         return jsonify({'underperformers': underperformers}), 200
     except Exception as error:
@@ -88,7 +88,7 @@ def get_underperformers(team_id):
 def get_smart_swaps(team_id):
     """Get smart swap recommendations for each position"""
     try:
-        analyzer = SquadTransferAnalyzer(team_id)
+        analyzer = SquadTransferAnalyzer(team_id, request_data_context())
         swaps = analyzer._generate_smart_swaps()
         return jsonify({'smart_swaps': swaps}), 200
     except Exception as error:
@@ -98,7 +98,7 @@ def get_smart_swaps(team_id):
 def get_squad_overview(team_id):
     """Get detailed squad overview with performance metrics"""
     try:
-        analyzer = SquadTransferAnalyzer(team_id)
+        analyzer = SquadTransferAnalyzer(team_id, request_data_context())
         overview = analyzer.get_squad_overview()
         return jsonify(overview), 200
     except Exception as error:
@@ -1,9 +1,10 @@
 """HTTP routes for persisted FPL squad tracking."""
 
 import os
-from flask import current_app, jsonify
+from flask import current_app, jsonify, request
 from app.routes import tracked_teams_bp
 from app.routes.recommendation_routes import api_error_response
+from app.services.team_refresh import refresh_tracked_teams
 from app.services.tracked_team_store import TrackedTeamStore
 from app.utils.fpl_api import FPLAPIClient
 
@@ -12,6 +13,11 @@ def _store():
     return TrackedTeamStore(current_app.config['DATABASE'])
 
 
+def capped(value, limit):
+    """A client-supplied integer clamped to the server's ``limit``; other values are left for the service to reject."""
+    return min(value, limit) if isinstance(value, int) and not isinstance(value, bool) else value
+
+
 @tracked_teams_bp.route('', methods=['GET'])
 def list_tracked_teams():
     return jsonify({'teams': _store().list_teams()}), 200
@@ -53,3 +59,20 @@ def refresh_tracked_team(team_id):
     except Exception as error:
         store.mark_refresh_failed(team_id, season, str(error))
         return api_error_response(error)
+
+
+@tracked_teams_bp.route('/refresh', methods=['POST'])
+def refresh_tracked_teams_batch():
+    payload = request.get_json(silent=True) or {}
+    try:
+        team_ids = payload.get('team_ids')
+        if team_ids is not None and not isinstance(team_ids, list):
+            raise ValueError('team_ids must be a list of positive integers.')
+        workers = current_app.config['REFRESH_WORKERS']
+        result = refresh_tracked_teams(_store(), FPLAPIClient, os.getenv('FPL_SEASON', 'current'), team_ids,
+                                       capped(payload.get('max_workers', workers), workers))
+        return jsonify(result), 200
+    except ValueError as error:
+        return jsonify({'error': {'code': 'invalid_input', 'message': str(error), 'retryable': False}}), 400
+    except Exception as error:
+        return api_error_response(error)
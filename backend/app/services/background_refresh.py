@@ -0,0 +1,244 @@
+"""Background refresh of upstream payloads, projection sets and stale tracked teams."""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.services.photo_store import player_photo_codes
+from app.services.projection_cache import projection_cache
+from app.services.projection_engine import build_projection_matrix
+from app.services.team_refresh import DEFAULT_REFRESH_WORKERS, refresh_tracked_teams
+from app.services.tracked_team_store import TrackedTeamStore, utcnow
+from app.utils.fpl_api import DEADLINE_GRACE_SECONDS, FPLAPIClient
+
+DEFAULT_INTERVAL_SECONDS = 1800
+DEFAULT_JITTER_SECONDS = 60
+DEFAULT_STALE_TEAM_SECONDS = 6 * 3600
+DEFAULT_PROJECTION_HORIZON = 6
+# Cycles are never closer together than this, even right around a deadline.
+MIN_DELAY_SECONDS = 60
+SCHEDULER_JOB = 'scheduler'
+
+logger = logging.getLogger(__name__)
+
+
+def regenerate_projections(store: TrackedTeamStore, bootstrap: Dict[str, Any], fixtures: List[Dict[str, Any]], gameweeks: List[int],
+                           keep_latest: int, keep_days: Optional[int]) -> Dict[str, Any]:
+    """Build and save a projection set, apply retention and drop cached values for the database."""
+    projection = build_projection_matrix(bootstrap.get('elements', []), fixtures, gameweeks)
+    projection_set = store.save_projection_set('current', gameweeks, projection.rows(), projection.warnings)
+    retention = store.prune_projection_sets(keep_latest, keep_days)
+    projection_cache.invalidate(store.database_path)
+    return {'projection_set': projection_set, 'coverage': len(projection), 'retention': retention}
+
+
+def upcoming_gameweeks(bootstrap: Dict[str, Any], horizon: int) -> List[int]:
+    """The first ``horizon`` gameweeks that have not finished."""
+    return sorted(event['id'] for event in bootstrap.get('events', []) if not event.get('finished'))[:horizon]
+
+
+def _deadlines(bootstrap: Dict[str, Any]) -> List[float]:
+    deadlines = []
+    for event in bootstrap.get('events', []):
+        try:
+            deadlines.append(datetime.fromisoformat(event['deadline_time'].replace('Z', '+00:00')).timestamp())
+        except (KeyError, AttributeError, ValueError):
+            continue
+    return sorted(deadlines)
+
+
+def _fingerprint(*payloads) -> str:
+    canonical = json.dumps(payloads, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class RefreshScheduler:
+    """Run refresh cycles on a background thread at a deadline-aware cadence.
+
+    A cycle reloads bootstrap and fixtures, regenerates the projection set
+    when its inputs or the upcoming gameweeks changed, and refreshes tracked
+    teams not refreshed since ``stale_team_seconds`` ago or since the last
+    deadline. Cycles run every ``interval_seconds``, or sooner so that one
+    starts just after the next deadline, plus up to ``jitter_seconds`` of
+    random delay. A lease row in the database lets only one process run
+    cycles, so every worker of a multi-process server may start a scheduler.
+    Each job's last outcome is stored for the status endpoint.
+    """
+
+    def __init__(self, database_path: str, client=FPLAPIClient, season: str = 'current',
+                 interval_seconds: float = DEFAULT_INTERVAL_SECONDS, jitter_seconds: float = DEFAULT_JITTER_SECONDS,
+                 stale_team_seconds: float = DEFAULT_STALE_TEAM_SECONDS, projection_horizon: int = DEFAULT_PROJECTION_HORIZON,
+                 max_workers: int = DEFAULT_REFRESH_WORKERS, keep_latest: int = 5, keep_days: Optional[int] = None,
+                 photo_store=None, clock=time.time, rng: Optional[random.Random] = None):
+        self.store = TrackedTeamStore(database_path)
+        self.client = client
+        self.season = season
+        self.interval_seconds = interval_seconds
+        self.jitter_seconds = jitter_seconds
+        self.stale_team_seconds = stale_team_seconds
+        self.projection_horizon = projection_horizon
+        self.max_workers = max_workers
+        self.keep_latest = keep_latest
+        self.keep_days = keep_days
+        self.photo_store = photo_store
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.owner = f'{socket.gethostname()}:{os.getpid()}'
+        self._projection_inputs: Optional[str] = None
+        self._holds_lease = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._cycle_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='fpl-refresh-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.store.release_job_lease(SCHEDULER_JOB, self.owner)
+        self._holds_lease = False
+
+    def run_forever(self) -> None:
+        """Run cycles in the calling thread until ``stop`` is called, for a dedicated scheduler process."""
+        self._stop.clear()
+        self._loop()
+
+    def _loop(self) -> None:
+        # Schedulers started together (one per worker) do not all wake at once.
+        delay = self.rng.uniform(0, self.jitter_seconds)
+        while not self._stop.wait(delay):
+            # A locked database (for example during a full compaction) fails one cycle, never the thread.
+            try:
+                self.run_once()
+            except Exception as error:
+                self._loop_failed('cycle', error)
+            try:
+                delay = self.next_delay()
+            except Exception as error:
+                self._loop_failed('delay', error)
+                delay = self.interval_seconds + self.rng.uniform(0, self.jitter_seconds)
+
+    def _loop_failed(self, step: str, error: Exception) -> None:
+        logger.exception('Background refresh %s failed', step)
+        try:
+            self.store.record_job(SCHEDULER_JOB, 'failed', finished_at=utcnow(), error=f'{step}: {error}')
+        except Exception:
+            logger.exception('Could not record the failed background refresh %s', step)
+
+    def next_delay(self) -> float:
+        """Seconds until the next cycle: the regular interval, cut short to land just after a deadline."""
+        now = self.clock()
+        delay = self.interval_seconds
+        try:
+            upcoming = [deadline for deadline in _deadlines(self.client.get_bootstrap_static()) if deadline + DEADLINE_GRACE_SECONDS > now]
+        except Exception:
+            upcoming = []
+        if upcoming:
+            delay = min(delay, upcoming[0] + DEADLINE_GRACE_SECONDS - now)
+        delay = max(delay, MIN_DELAY_SECONDS) + self.rng.uniform(0, self.jitter_seconds)
+        if self._holds_lease:
+            self.store.record_job(SCHEDULER_JOB, 'waiting', next_run_at=_isoformat(now + delay))
+        return delay
+
+    def run_once(self) -> Dict[str, Any]:
+        """Run one cycle now unless another cycle or another process's scheduler is running."""
+        if not self._cycle_lock.acquire(blocking=False):
+            return {'status': 'skipped', 'reason': 'A refresh cycle is already running.'}
+        try:
+            lease_seconds = self.interval_seconds + self.jitter_seconds + MIN_DELAY_SECONDS
+            self._holds_lease = self.store.acquire_job_lease(SCHEDULER_JOB, self.owner, lease_seconds)
+            if not self._holds_lease:
+                return {'status': 'skipped', 'reason': 'Another scheduler holds the lease.'}
+            results = {}
+            jobs = [('upstream', self._refresh_upstream), ('projections', self._refresh_projections), ('tracked_teams', self._refresh_teams)]
+            if self.photo_store is not None:
+                jobs.append(('photos', self._prefetch_photos))
+            for name, job in jobs:
+                started = utcnow()
+                self.store.record_job(name, 'running', started_at=started)
+                try:
+                    results[name] = job()
+                    self.store.record_job(name, 'ok', finished_at=utcnow(), result=results[name])
+                except Exception as error:
+                    results[name] = {'error': str(error)}
+                    self.store.record_job(name, 'failed', finished_at=utcnow(), error=str(error))
+            self.store.record_job(SCHEDULER_JOB, 'ok', finished_at=utcnow())
+            return {'status': 'complete', 'jobs': results}
+        finally:
+            self._cycle_lock.release()
+
+    def _refresh_upstream(self) -> Dict[str, Any]:
+        self.client.warm_cache()
+        bootstrap = self.client.get_bootstrap_static()
+        upcoming = [deadline for deadline in _deadlines(bootstrap) if deadline > self.clock()]
+        return {'current_gameweek': self.client.get_current_gameweek(),
+                'next_deadline': _isoformat(upcoming[0]) if upcoming else None}
+
+    def _refresh_projections(self) -> Dict[str, Any]:
+        bootstrap, fixtures = self.client.get_bootstrap_static(), self.client.get_fixtures()
+        gameweeks = upcoming_gameweeks(bootstrap, self.projection_horizon)
+        if not gameweeks:
+            return {'status': 'skipped', 'reason': 'Every gameweek has finished.'}
+        inputs = _fingerprint(bootstrap.get('elements', []), fixtures, gameweeks)
+        latest = self.store.latest_projection_set()
+        if latest and latest['gameweeks'] == gameweeks and inputs == self._projection_inputs:
+            return {'status': 'unchanged', 'projection_set_id': latest['id']}
+        saved = regenerate_projections(self.store, bootstrap, fixtures, gameweeks, self.keep_latest, self.keep_days)
+        self._projection_inputs = inputs
+        return {'status': 'regenerated', 'projection_set_id': saved['projection_set']['id'], 'gameweeks': gameweeks,
+                'coverage': saved['coverage'], 'retention': saved['retention']}
+
+    def _refresh_teams(self) -> Dict[str, Any]:
+        now = self.clock()
+        cutoff = now - self.stale_team_seconds
+        passed = [deadline + DEADLINE_GRACE_SECONDS for deadline in _deadlines(self.client.get_bootstrap_static())
+                  if deadline + DEADLINE_GRACE_SECONDS <= now]
+        if passed:
+            # Squads lock at each deadline, so anything refreshed before the latest one is out of date.
+            cutoff = max(cutoff, passed[-1])
+        team_ids = self.store.stale_team_ids(_isoformat(cutoff))
+        if not team_ids:
+            return {'stale': 0}
+        result = refresh_tracked_teams(self.store, self.client, self.season, team_ids, self.max_workers)
+        return {'stale': len(team_ids), **result['summary'], 'elapsed_seconds': result['elapsed_seconds']}
+
+    def _prefetch_photos(self) -> Dict[str, Any]:
+        # Stored photos are served from disk, so after the first cycle only new players go upstream.
+        return self.photo_store.prefetch(player_photo_codes(self.client.get_bootstrap_static()), self.max_workers)
+
+    def status(self) -> Dict[str, Any]:
+        jobs = {job['name']: job for job in self.store.background_jobs()}
+        scheduler = jobs.pop(SCHEDULER_JOB, {})
+        return {'running_here': self.running, 'lease_owner': scheduler.get('lease_owner'),
+                'lease_expires_at': scheduler.get('lease_expires_at'), 'next_run_at': scheduler.get('next_run_at'),
+                'last_cycle_finished_at': scheduler.get('last_finished_at'), 'jobs': list(jobs.values())}
+
+
+def scheduler_from_config(config, photo_store=None) -> RefreshScheduler:
+    return RefreshScheduler(config['DATABASE'], season=os.getenv('FPL_SEASON', 'current'),
+                            interval_seconds=config['SCHEDULER_INTERVAL_SECONDS'], jitter_seconds=config['SCHEDULER_JITTER_SECONDS'],
+                            stale_team_seconds=config['SCHEDULER_STALE_TEAM_SECONDS'], projection_horizon=config['PROJECTION_HORIZON'],
+                            max_workers=config['REFRESH_WORKERS'], keep_latest=config['PROJECTION_RETENTION_SETS'],
+                            keep_days=config['PROJECTION_RETENTION_DAYS'],
+                            photo_store=photo_store if config.get('PHOTO_PREFETCH') else None)
@@ -0,0 +1,121 @@
+"""Lookup tables over bootstrap and fixtures payloads, built once per payload version."""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Mapping, Optional
+
+POSITION_NAMES = {1: 'GK', 2: 'DEF', 3: 'MID', 4: 'FWD'}
+
+
+def payload_version(payload: Any) -> str:
+    """Content hash of an upstream payload, memoized per payload object."""
+    return _versions.get(payload)
+
+
+class _VersionMemo:
+    """Hash each payload object once; holding a reference keeps ``id`` unambiguous."""
+
+    def __init__(self, size: int = 8):
+        self.size = size
+        self._entries: 'OrderedDict[int, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, payload: Any) -> str:
+        with self._lock:
+            entry = self._entries.get(id(payload))
+            if entry and entry[0] is payload:
+                self._entries.move_to_end(id(payload))
+                return entry[1]
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        version = hashlib.sha256(canonical.encode()).hexdigest()
+        with self._lock:
+            self._entries[id(payload)] = (payload, version)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return version
+
+
+_versions = _VersionMemo()
+
+
+class BootstrapIndex:
+    """O(1) player and club lookups for one bootstrap payload.
+
+    ``players_by_position`` keeps bootstrap order so callers that rank with a
+    stable sort produce the same output as a scan of ``elements``.
+    """
+
+    def __init__(self, bootstrap: Mapping[str, Any]):
+        self.version = payload_version(bootstrap)
+        self.elements: List[Dict] = list(bootstrap.get('elements', []))
+        self.players: Dict[int, Dict] = {}
+        self.players_by_position: Dict[str, List[Dict]] = defaultdict(list)
+        for player in self.elements:
+            self.players.setdefault(player.get('id'), player)
+            self.players_by_position[POSITION_NAMES.get(player.get('element_type', 0), 'Unknown')].append(player)
+        self.team_short_names: Dict[int, str] = {}
+        for team in bootstrap.get('teams', []):
+            self.team_short_names.setdefault(team.get('id'), team.get('short_name'))
+
+    def player(self, player_id: int) -> Dict:
+        return self.players.get(player_id, {})
+
+    def team_short_name(self, team_id: Optional[int], default: str = 'Unknown') -> str:
+        return self.team_short_names.get(team_id, default)
+
+
+class FixtureIndex:
+    """Each club's fixtures, in payload order and grouped by gameweek."""
+
+    def __init__(self, fixtures: List[Mapping[str, Any]]):
+        self.version = payload_version(fixtures)
+        self.by_team: Dict[int, List[Mapping[str, Any]]] = defaultdict(list)
+        self.by_team_gameweek: Dict[int, Dict[Optional[int], List[Mapping[str, Any]]]] = defaultdict(lambda: defaultdict(list))
+        for fixture in fixtures:
+            for team_id in dict.fromkeys((fixture.get('team_h'), fixture.get('team_a'))):
+                self.by_team[team_id].append(fixture)
+                self.by_team_gameweek[team_id][fixture.get('event')].append(fixture)
+
+    def for_team(self, team_id: Optional[int]) -> List[Mapping[str, Any]]:
+        return self.by_team.get(team_id, [])
+
+    def for_team_gameweek(self, team_id: Optional[int], gameweek: int) -> List[Mapping[str, Any]]:
+        return self.by_team_gameweek.get(team_id, {}).get(gameweek, [])
+
+
+class _IndexCache:
+    def __init__(self, factory, size: int = 4):
+        self.factory = factory
+        self.size = size
+        self._indexes: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, payload):
+        version = payload_version(payload)
+        with self._lock:
+            index = self._indexes.get(version)
+            if index is not None:
+                self._indexes.move_to_end(version)
+                return index
+        index = self.factory(payload)
+        with self._lock:
+            self._indexes[version] = index
+            while len(self._indexes) > self.size:
+                self._indexes.popitem(last=False)
+        return index
+
+
+_bootstrap_indexes = _IndexCache(BootstrapIndex)
+_fixture_indexes = _IndexCache(FixtureIndex)
+
+
+def get_bootstrap_index(bootstrap: Mapping[str, Any]) -> BootstrapIndex:
+    """Return the shared index for this bootstrap version, building it on first use."""
+    return _bootstrap_indexes.get(bootstrap)
+
+
+def get_fixture_index(fixtures: List[Mapping[str, Any]]) -> FixtureIndex:
+    """Return the shared index for this fixtures version, building it on first use."""
+    return _fixture_indexes.get(fixtures)
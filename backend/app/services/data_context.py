@@ -0,0 +1,94 @@
+"""Request-scoped upstream data shared by the team analysis services."""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from app.services.bootstrap_index import BootstrapIndex, FixtureIndex, get_bootstrap_index, get_fixture_index
+from app.services.fixture_difficulty import FixtureDifficultyTable, get_fixture_difficulty
+from app.utils.fpl_api import FPLAPIClient
+from app.utils.single_flight import SingleFlight
+
+
+class FPLDataContext:
+    """Bootstrap, fixtures, gameweek and entry payloads, each fetched at most once.
+
+    Analyzers that receive the same context share every payload instead of
+    fetching their own copies. Concurrent loads of one key are coalesced, so
+    threads working on the same request never duplicate an upstream call.
+    """
+
+    def __init__(self, client=FPLAPIClient):
+        self.client = client
+        self._values: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    @property
+    def bootstrap(self) -> Dict:
+        return self._load('bootstrap', self.client.get_bootstrap_static)
+
+    @property
+    def fixtures(self) -> List[Dict]:
+        return self._load('fixtures', self.client.get_fixtures)
+
+    @property
+    def bootstrap_index(self) -> BootstrapIndex:
+        return self._load('bootstrap_index', lambda: get_bootstrap_index(self.bootstrap))
+
+    @property
+    def fixture_index(self) -> FixtureIndex:
+        return self._load('fixture_index', lambda: get_fixture_index(self.fixtures))
+
+    @property
+    def fixture_difficulty(self) -> FixtureDifficultyTable:
+        return self._load('fixture_difficulty', lambda: get_fixture_difficulty(self.fixtures, self.current_gameweek))
+
+    @property
+    def current_gameweek(self) -> int:
+        return self._load('current_gameweek', self.client.get_current_gameweek)
+
+    def entry(self, team_id: int) -> Dict:
+        return self._load(('entry', team_id), lambda: self.client.get_team_data(team_id))
+
+    def picks(self, team_id: int, gameweek: Optional[int] = None) -> Dict:
+        gameweek = self.current_gameweek if gameweek is None else gameweek
+        return self._load(('picks', team_id, gameweek), lambda: self.client.get_team_picks(team_id, gameweek))
+
+    def history(self, team_id: int) -> Dict:
+        return self._load(('history', team_id), lambda: self.client.get_team_history(team_id))
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """Store an already-fetched payload, e.g. one loaded concurrently elsewhere."""
+        with self._lock:
+            self._values[key] = value
+
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+
+        def load_once():
+            with self._lock:
+                if key in self._values:
+                    return self._values[key]
+            value = loader()
+            self.prime(key, value)
+            return value
+
+        return self._flights.do(key, load_once)
+
+
+# The ASGI entry point hands a prefetched context to the request through this WSGI environ key.
+PRIMED_CONTEXT_ENVIRON_KEY = 'fpl_assistant.data_context'
+
+
+def request_data_context() -> FPLDataContext:
+    """Return the context for the active Flask request, creating it on first use."""
+    from flask import g, has_app_context, has_request_context, request
+
+    if not has_app_context():
+        return FPLDataContext()
+    if 'fpl_data_context' not in g:
+        primed = request.environ.get(PRIMED_CONTEXT_ENVIRON_KEY) if has_request_context() else None
+        g.fpl_data_context = primed or FPLDataContext()
+    return g.fpl_data_context
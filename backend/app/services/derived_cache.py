@@ -0,0 +1,120 @@
+"""Rendered analysis responses reused while their upstream inputs are unchanged."""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.services.data_context import FPLDataContext, request_data_context
+from app.utils.single_flight import SingleFlight
+
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class DerivedResult:
+    body: bytes
+    etag: str
+
+
+def _digest(payload: Any) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def team_input_key(context: FPLDataContext, team_id: int) -> Tuple[Hashable, ...]:
+    """Everything the team analyzers read: gameweek, bootstrap, fixtures, entry and current picks.
+
+    Bootstrap and fixtures use the versions their shared indexes already
+    computed. Entry and picks are small and differ per team, so they are
+    hashed directly rather than through the bootstrap-sized version memo.
+    """
+    gameweek = context.current_gameweek
+    return (gameweek, context.bootstrap_index.version, context.fixture_index.version,
+            _digest(context.entry(team_id)), _digest(context.picks(team_id, gameweek)))
+
+
+class DerivedResultCache:
+    """LRU of rendered response bodies bounded by their total size.
+
+    Keys include the version of every input, so an entry never goes stale;
+    changed inputs simply produce a new key and the old entry ages out.
+    Concurrent misses for one key render once.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Hashable, DerivedResult]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.hits = self.misses = self.evictions = self.not_modified = 0
+
+    def get(self, key: Hashable, render: Callable[[], bytes]) -> DerivedResult:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+        return self._flights.do(key, lambda: self._render(key, render))
+
+    def _render(self, key: Hashable, render: Callable[[], bytes]) -> DerivedResult:
+        body = render()
+        result = DerivedResult(body, hashlib.sha256(body).hexdigest()[:32])
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.body)
+            self._entries[key] = result
+            self._size += len(body)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+                self.evictions += 1
+        return result
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def invalidate(self, endpoint: Optional[str] = None) -> int:
+        """Drop every entry, or only those whose key starts with ``endpoint``."""
+        with self._lock:
+            keys = [key for key in self._entries if endpoint is None or key[0] == endpoint]
+            for key in keys:
+                self._size -= len(self._entries.pop(key).body)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._size, 'max_bytes': self.max_bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions, 'not_modified': self.not_modified}
+
+
+derived_cache = DerivedResultCache(int(os.getenv('FPL_DERIVED_CACHE_BYTES', DEFAULT_CACHE_BYTES)))
+
+
+def cached_team_response(endpoint: str, team_id: int, build: Callable[[], Any]):
+    """A JSON response for ``build()``, reused while the team's inputs are unchanged.
+
+    Callers construct their analyzer on the request data context first, so
+    the inputs are already loaded and only the analysis itself is skipped
+    on a hit. Responses carry a strong ETag of the body, and a matching
+    ``If-None-Match`` gets an empty 304. Errors raised while reading inputs
+    or building propagate to the caller and are not cached.
+    """
+    from flask import current_app, request
+
+    key = (endpoint, team_id) + team_input_key(request_data_context(), team_id)
+    result = derived_cache.get(key, lambda: current_app.json.response(build()).get_data())
+    response = current_app.response_class(result.body, mimetype='application/json')
+    response.set_etag(result.etag)
+    response = response.make_conditional(request)
+    if response.status_code == 304:
+        derived_cache.record_not_modified()
+    return response
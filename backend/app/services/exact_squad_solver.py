@@ -0,0 +1,254 @@
+"""Exact branch-and-bound selection of a full squad, starting XI and captain."""
+
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.domain import FPLRuleset
+from app.services.transfer_planner import _position
+
+# Starting XI bounds used by ``transfer_planner._best_lineup``.
+STARTER_BOUNDS = {'GK': (1, 1), 'DEF': (3, 5), 'MID': (2, 5), 'FWD': (1, 3)}
+XI_SIZE = 11
+DEFAULT_TIME_LIMIT_MS = 8000
+# Projection values are rounded to thousandths, so the search runs on exact integers.
+_POINT_SCALE = 1000
+_CHECK_CLOCK_EVERY = 1024
+_INFEASIBLE = -(2 ** 60)
+# Table entries stay far below this however many weights are added to them.
+_UNREACHABLE = _INFEASIBLE // 2
+# Bound table flags: the captain is still to be chosen, or already counted.
+_CAPTAIN_OPEN, _CAPTAIN_SET = 0, 1
+
+
+@dataclass(frozen=True)
+class ExactSolution:
+    """Outcome of one exact search; ``squad_ids`` is None when nothing legal was found."""
+
+    squad_ids: Optional[Tuple[int, ...]]
+    proven_optimal: bool
+    projected_points: Optional[float]
+    upper_bound: Optional[float]
+    optimality_gap: Optional[float]
+    nodes: int
+    elapsed_seconds: float
+
+
+class _Timeout(Exception):
+    pass
+
+
+def formations(ruleset: FPLRuleset) -> List[Tuple[int, ...]]:
+    """Starter counts per squad position, in ruleset order, for every legal XI shape."""
+    ranges = [range(STARTER_BOUNDS[position][0], min(STARTER_BOUNDS[position][1], count) + 1)
+              for position, count in ruleset.squad_position_counts.items()]
+    return [starters for starters in itertools.product(*ranges) if sum(starters) == XI_SIZE]
+
+
+def _undominated(ordered, locked_ids, required):
+    """Drop players that a cheaper, at-least-as-valuable player can always replace.
+
+    ``ordered`` is sorted best first, so every earlier player costing no more
+    dominates. A replacement is blocked only when it is already selected or its
+    club is full; with ``required`` dominators spread over the player's own club
+    and distinct other clubs one of them is always free to swap in.
+    """
+    kept = []
+    for index, player in enumerate(ordered):
+        if player['id'] not in locked_ids:
+            same_club, other_clubs = 0, set()
+            for dominator in ordered[:index]:
+                if dominator['now_cost'] > player['now_cost']:
+                    continue
+                if dominator['team'] == player['team']:
+                    same_club += 1
+                else:
+                    other_clubs.add(dominator['team'])
+                if same_club + len(other_clubs) >= required:
+                    break
+            if same_club + len(other_clubs) >= required:
+                continue
+        kept.append(player)
+    return kept
+
+
+class _PositionPool:
+    """Candidates for one squad position, best first, as the search visits them."""
+
+    def __init__(self, players, scaled, locked_ids, count, full_clubs, club_index):
+        ordered = sorted(players, key=lambda player: (-scaled[player['id']], player['now_cost'], player['id']))
+        kept = _undominated(ordered, locked_ids, count + full_clubs)
+        self.count = count
+        self.ids = [player['id'] for player in kept]
+        self.value = [scaled[player['id']] for player in kept]
+        self.cost = [player['now_cost'] for player in kept]
+        self.values = np.array([scaled[player['id']] for player in kept], dtype=np.int64)
+        self.costs = np.array([player['now_cost'] for player in kept], dtype=np.int64)
+        self.clubs = np.array([club_index[player['team']] for player in kept], dtype=np.int64)
+        self.locked = [player_id in locked_ids for player_id in self.ids]
+        size = len(kept)
+        self.next_lock, self.locks_from = [size] * (size + 1), [0] * (size + 1)
+        for index in range(size - 1, -1, -1):
+            self.next_lock[index] = index if self.locked[index] else self.next_lock[index + 1]
+            self.locks_from[index] = self.locks_from[index + 1] + self.locked[index]
+
+
+class ExactSquadSolver:
+    """Branch and bound over formations and best-first player combinations.
+
+    The objective is the projected XI plus the captain's second score, as
+    reported by ``_best_lineup``; bench value only breaks ties. Each node is
+    bounded by a budget dynamic programme over the remaining picks that
+    relaxes only the club limit, so a search that finishes proves the
+    incumbent optimal and one that runs out of time reports its gap.
+    """
+
+    def __init__(self, players: Iterable[Mapping[str, Any]], values: Mapping[int, float], budget_tenths: int,
+                 locked_ids: Iterable[int], ruleset: FPLRuleset, time_limit_ms: int = DEFAULT_TIME_LIMIT_MS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ruleset, self.budget, self.clock = ruleset, budget_tenths, clock
+        self.time_limit = time_limit_ms / 1000
+        self.locked_ids = set(locked_ids)
+        self.positions = list(ruleset.squad_position_counts)
+        players = [player for player in players if _position(player) in ruleset.squad_position_counts]
+        self.players = {player['id']: player for player in players}
+        self.scaled = {player['id']: round(values.get(player['id'], 0) * _POINT_SCALE) for player in players}
+        spread = max(self.scaled.values(), default=0) - min(self.scaled.values(), default=0)
+        # Larger than any difference in bench totals, so the XI always decides first.
+        self.bench_scale = (ruleset.squad_size - XI_SIZE) * spread + 1
+        full_clubs = (ruleset.squad_size - 1) // ruleset.max_players_per_club
+        self.club_index = {club: index for index, club in enumerate(sorted({player['team'] for player in players}))}
+        self.pools = [_PositionPool([player for player in players if _position(player) == position], self.scaled,
+                                    self.locked_ids, count, full_clubs, self.club_index)
+                      for position, count in ruleset.squad_position_counts.items()]
+        # No squad can spend more than its most expensive picks, which caps the table width.
+        self.capacity = max(0, min(budget_tenths, sum(sum(sorted(pool.cost)[-pool.count:]) for pool in self.pools)))
+        self.nodes = 0
+
+    def objective(self, squad_ids: Iterable[int]) -> Tuple[int, int]:
+        """Scaled (XI plus captain, bench) totals of a complete squad under its best formation."""
+        by_position = {position: [] for position in self.positions}
+        for player_id in squad_ids:
+            by_position[_position(self.players[player_id])].append(self.scaled[player_id])
+        for values in by_position.values():
+            values.sort(reverse=True)
+        best = (_INFEASIBLE, 0)
+        for starters in formations(self.ruleset):
+            lineup = [value for position, count in zip(self.positions, starters) for value in by_position[position][:count]]
+            bench = sum(sum(by_position[position][count:]) for position, count in zip(self.positions, starters))
+            best = max(best, (sum(lineup) + max(lineup), bench))
+        return best
+
+    def solve(self, incumbent_ids: Optional[Iterable[int]] = None) -> ExactSolution:
+        started = self.clock()
+        self.deadline = started + self.time_limit
+        self.best_ids = tuple(incumbent_ids) if incumbent_ids else None
+        self.best_value = _UNREACHABLE
+        if self.best_ids:
+            lineup, bench = self.objective(self.best_ids)
+            self.best_value = lineup * self.bench_scale + bench
+        roots = []
+        for starters in formations(self.ruleset):
+            tables = self._bound_tables(starters)
+            roots.append((int(tables[0][0, 0, _CAPTAIN_OPEN, self.capacity]), starters))
+        roots.sort(reverse=True)
+        unfinished = [root for root, _ in roots]
+        try:
+            for root, starters in roots:
+                if root > self.best_value:
+                    self.starters, self.tables = starters, self._bound_tables(starters)
+                    self.club_counts = np.zeros(len(self.club_index), dtype=np.int64)
+                    self._branch(0, 0, 0, 0, 0, _INFEASIBLE, [])
+                unfinished.pop(0)
+        except _Timeout:
+            pass
+        elapsed = round(self.clock() - started, 3)
+        if self.best_ids is None:
+            return ExactSolution(None, not unfinished, None, None, None, self.nodes, elapsed)
+        points = self.objective(self.best_ids)[0] / _POINT_SCALE
+        gap = round((max([self.best_value] + unfinished) - self.best_value) / (self.bench_scale * _POINT_SCALE), 3)
+        return ExactSolution(self.best_ids, not unfinished, points, round(points + gap, 3), gap, self.nodes, elapsed)
+
+    def _bound_tables(self, starters):
+        """Best remaining value for every (slot, next candidate, captain flag, budget) per position.
+
+        Built backwards over positions in search order; club limits are the
+        only constraint left out, and locked players can never be skipped.
+        """
+        width = self.capacity + 1
+        following = np.full((2, width), _INFEASIBLE, dtype=np.int64)
+        following[_CAPTAIN_SET] = 0
+        tables = [None] * len(self.pools)
+        for position in range(len(self.pools) - 1, -1, -1):
+            pool, starter_slots = self.pools[position], starters[position]
+            size = len(pool.ids)
+            table = np.full((pool.count + 1, size + 1, 2, width), _INFEASIBLE, dtype=np.int64)
+            for start in range(size + 1):
+                if not pool.locks_from[start]:
+                    table[pool.count, start] = following
+            for slot in range(pool.count - 1, -1, -1):
+                for index in range(size - 1, -1, -1):
+                    row, taken = table[slot, index], table[slot + 1, index + 1]
+                    if not pool.locked[index]:
+                        row[:] = table[slot, index + 1]
+                    cost = pool.cost[index]
+                    if cost > self.capacity:
+                        continue
+                    value = pool.value[index]
+                    if slot < starter_slots:
+                        weight = value * self.bench_scale
+                        np.maximum(row[:, cost:], taken[:, :width - cost] + weight, out=row[:, cost:])
+                        np.maximum(row[_CAPTAIN_OPEN, cost:], taken[_CAPTAIN_SET, :width - cost] + 2 * weight,
+                                   out=row[_CAPTAIN_OPEN, cost:])
+                    else:
+                        np.maximum(row[:, cost:], taken[:, :width - cost] + value, out=row[:, cost:])
+            tables[position] = table
+            following = table[0, 0]
+        return tables
+
+    def _branch(self, position, slot, start, cost, score, captain, chosen):
+        """Expand a node whose bound beats the incumbent, most promising child first."""
+        self.nodes += 1
+        if self.nodes % _CHECK_CLOCK_EVERY == 0 and self.clock() > self.deadline:
+            raise _Timeout
+        pool = self.pools[position]
+        if slot == pool.count:
+            if position + 1 < len(self.pools):
+                self._branch(position + 1, 0, 0, cost, score, captain, chosen)
+            else:
+                self.best_value, self.best_ids = score + captain * self.bench_scale, tuple(chosen)
+            return
+        # A locked player cannot be skipped, so the scan stops at the next one.
+        last = min(len(pool.ids) - (pool.count - slot), pool.next_lock[start])
+        indices = np.arange(start, last + 1)
+        values, new_costs = pool.values[start:last + 1], cost + pool.costs[start:last + 1]
+        legal = (new_costs <= self.budget) & (self.club_counts[pool.clubs[start:last + 1]] < self.ruleset.max_players_per_club)
+        budget_left = np.minimum(np.maximum(self.budget - new_costs, 0), self.capacity)
+        following = self.tables[position][slot + 1]
+        open_captain, set_captain = following[indices + 1, _CAPTAIN_OPEN, budget_left], following[indices + 1, _CAPTAIN_SET, budget_left]
+        if slot < self.starters[position]:
+            new_scores, new_captains = score + values * self.bench_scale, np.maximum(values, captain)
+        else:
+            new_scores, new_captains = score + values, np.full(len(indices), captain)
+        bounds = new_scores + np.maximum(open_captain, new_captains * self.bench_scale + set_captain)
+        promising = np.flatnonzero(legal & (bounds > self.best_value))
+        for child in promising[np.lexsort((promising, -bounds[promising]))]:
+            if bounds[child] <= self.best_value:
+                break
+            index = start + int(child)
+            club = pool.clubs[index]
+            self.club_counts[club] += 1
+            chosen.append(pool.ids[index])
+            self._branch(position, slot + 1, index + 1, int(new_costs[child]), int(new_scores[child]), int(new_captains[child]), chosen)
+            chosen.pop()
+            self.club_counts[club] -= 1
+
+
+def solve_exact_squad(players: Iterable[Mapping[str, Any]], values: Mapping[int, float], budget_tenths: int,
+                      locked_ids: Iterable[int], ruleset: FPLRuleset, time_limit_ms: int = DEFAULT_TIME_LIMIT_MS,
+                      incumbent_ids: Optional[Iterable[int]] = None) -> ExactSolution:
+    """Search eligible ``players`` for the best squad, seeded with a known legal squad when given."""
+    return ExactSquadSolver(players, values, budget_tenths, locked_ids, ruleset, time_limit_ms).solve(incumbent_ids)
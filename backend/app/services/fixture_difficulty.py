@@ -0,0 +1,92 @@
+"""Upcoming fixture difficulty per club, computed once per fixtures version and gameweek."""
+
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from app.services.bootstrap_index import payload_version
+
+DEFAULT_HORIZONS = (3, 5, 8)
+NEUTRAL_FDR = 3.0
+
+
+class FixtureDifficultyTable:
+    """Per-club upcoming difficulties shared by every transfer scorer.
+
+    ``average_fdr`` covers a club's next N fixtures in payload order, which is
+    how the recommendation scorers have always counted. ``gameweek_difficulties``
+    covers the next N gameweeks instead, so a blank is an empty list and a
+    double gameweek holds two difficulties.
+    """
+
+    def __init__(self, fixtures: Iterable[Mapping[str, Any]], current_gameweek: int,
+                 horizons: Tuple[int, ...] = DEFAULT_HORIZONS):
+        self.current_gameweek = current_gameweek
+        self.horizons = tuple(sorted(set(horizons)))
+        last_gameweek = current_gameweek + max(self.horizons) - 1
+        self._prefix_sums: Dict[int, List[float]] = defaultdict(lambda: [0])
+        self._by_gameweek: Dict[int, Dict[int, List[Any]]] = defaultdict(lambda: defaultdict(list))
+        for fixture in fixtures:
+            event = fixture.get('event', 0) or 0
+            if event < current_gameweek:
+                continue
+            for team_key, difficulty_key in (('team_a', 'team_a_difficulty'), ('team_h', 'team_h_difficulty')):
+                team_id = fixture.get(team_key)
+                difficulty = fixture.get(difficulty_key, 3)
+                sums = self._prefix_sums[team_id]
+                sums.append(sums[-1] + difficulty)
+                if event <= last_gameweek:
+                    self._by_gameweek[team_id][event].append(difficulty)
+                if fixture.get('team_a') == fixture.get('team_h'):
+                    break
+        self._horizon_fdr = {
+            (team_id, horizon): self._average_over_gameweeks(team_id, horizon)
+            for team_id in self._by_gameweek for horizon in self.horizons
+        }
+
+    def average_fdr(self, team_id: Optional[int], fixtures: int = 3) -> float:
+        """Mean difficulty of the club's next ``fixtures`` fixtures, neutral when unknown."""
+        if not team_id:
+            return NEUTRAL_FDR
+        sums = self._prefix_sums.get(team_id)
+        count = min(fixtures, len(sums) - 1) if sums else 0
+        return sums[count] / count if count > 0 else NEUTRAL_FDR
+
+    def gameweek_difficulties(self, team_id: Optional[int], horizon: int = 5) -> List[List[Any]]:
+        """Difficulties for each of the next ``horizon`` gameweeks, including blanks and doubles."""
+        by_gameweek = self._by_gameweek.get(team_id, {})
+        return [list(by_gameweek.get(gameweek, [])) for gameweek in range(self.current_gameweek, self.current_gameweek + horizon)]
+
+    def fixture_counts(self, team_id: Optional[int], horizon: int = 5) -> List[int]:
+        return [len(difficulties) for difficulties in self.gameweek_difficulties(team_id, horizon)]
+
+    def horizon_fdr(self, team_id: Optional[int], horizon: int = 5) -> float:
+        """Mean difficulty over every fixture in the next ``horizon`` gameweeks."""
+        if (team_id, horizon) in self._horizon_fdr:
+            return self._horizon_fdr[(team_id, horizon)]
+        return self._average_over_gameweeks(team_id, horizon)
+
+    def _average_over_gameweeks(self, team_id, horizon):
+        values = [value for difficulties in self.gameweek_difficulties(team_id, horizon) for value in difficulties]
+        return sum(values) / len(values) if values else NEUTRAL_FDR
+
+
+_tables: 'OrderedDict[tuple, FixtureDifficultyTable]' = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+def get_fixture_difficulty(fixtures: List[Mapping[str, Any]], current_gameweek: int,
+                           horizons: Tuple[int, ...] = DEFAULT_HORIZONS) -> FixtureDifficultyTable:
+    """Return the shared table for this fixtures version and gameweek, building it on first use."""
+    key = (payload_version(fixtures), current_gameweek, tuple(sorted(set(horizons))))
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is not None:
+            _tables.move_to_end(key)
+            return table
+    table = FixtureDifficultyTable(fixtures, current_gameweek, horizons)
+    with _tables_lock:
+        _tables[key] = table
+        while len(_tables) > 4:
+            _tables.popitem(last=False)
+    return table
@@ -0,0 +1,217 @@
+"""Mini-league ingestion: standings and rival picks fetched concurrently, effective ownership as a player × member matrix."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.tracked_team_store import TrackedTeamStore
+from app.utils.instrumentation import timed
+
+STANDINGS_PAGE_SIZE = 50
+DEFAULT_LEAGUE_WORKERS = 8
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+# Classic leagues can have millions of entries; only the top of a larger league is ingested.
+DEFAULT_MAX_MEMBERS = 1000
+
+
+class RateLimiter:
+    """Spaces calls from any number of threads at least ``1 / per_second`` apart; ``None`` or 0 disables it."""
+
+    def __init__(self, per_second: Optional[float], clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.interval = 1 / per_second if per_second else 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            self.sleep(slot - now)
+
+
+class OwnershipMatrix:
+    """League picks as a player × member matrix of pick multipliers.
+
+    Rows follow ``player_ids`` and columns ``member_ids``, both ascending. A
+    cell is 0 for a benched pick, 1 for a starter, 2 for the captain and 3
+    under Triple Captain; ``owned`` marks every pick, benched or not.
+    Percentages are over the members that have picks.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, int, int]]):
+        picks = np.array(list(rows), dtype=np.int64).reshape(-1, 3)
+        members, member_index = np.unique(picks[:, 0], return_inverse=True)
+        players, player_index = np.unique(picks[:, 1], return_inverse=True)
+        self.member_ids: List[int] = members.tolist()
+        self.player_ids: List[int] = players.tolist()
+        self.multipliers = np.zeros((len(players), len(members)), dtype=np.int8)
+        self.multipliers[player_index, member_index] = picks[:, 2]
+        self.owned = np.zeros(self.multipliers.shape, dtype=bool)
+        self.owned[player_index, member_index] = True
+
+    def _percent(self, counts: np.ndarray) -> np.ndarray:
+        return counts * (100.0 / len(self.member_ids)) if self.member_ids else counts.astype(float)
+
+    @property
+    def ownership(self) -> np.ndarray:
+        return self._percent(self.owned.sum(axis=1))
+
+    @property
+    def starting(self) -> np.ndarray:
+        return self._percent((self.multipliers > 0).sum(axis=1))
+
+    @property
+    def captaincy(self) -> np.ndarray:
+        return self._percent((self.multipliers > 1).sum(axis=1))
+
+    @property
+    def effective_ownership(self) -> np.ndarray:
+        """Sum of multipliers per player as a percentage of members: 100 means one multiplier per member on average."""
+        return self._percent(self.multipliers.sum(axis=1, dtype=np.int64))
+
+    def member_multipliers(self, fpl_team_id: int) -> Dict[int, int]:
+        """Multiplier of each player in one member's squad."""
+        column = self.member_ids.index(fpl_team_id)
+        owned = np.flatnonzero(self.owned[:, column])
+        return {self.player_ids[row]: int(self.multipliers[row, column]) for row in owned.tolist()}
+
+    def players(self, our_multipliers: Optional[Dict[int, int]] = None) -> List[Dict[str, Any]]:
+        """One row per picked player, by effective ownership descending.
+
+        With ``our_multipliers`` each row also gets ``exposure``: our
+        multiplier as a percentage minus the league's effective ownership.
+        Positive exposure gains ground on the league when the player scores;
+        negative exposure loses it. Players we own that no member picked are
+        included with zero ownership.
+        """
+        effective = self.effective_ownership
+        columns = (self.ownership.tolist(), self.starting.tolist(), self.captaincy.tolist(), effective.tolist())
+        rows = [{'fpl_player_id': player_id, 'ownership': round(owned, 1), 'starting': round(starting, 1),
+                 'captaincy': round(captaincy, 1), 'effective_ownership': round(eo, 1)}
+                for player_id, owned, starting, captaincy, eo in zip(self.player_ids, *columns)]
+        if our_multipliers is not None:
+            known = set(self.player_ids)
+            rows.extend({'fpl_player_id': player_id, 'ownership': 0.0, 'starting': 0.0, 'captaincy': 0.0, 'effective_ownership': 0.0}
+                        for player_id in sorted(our_multipliers) if player_id not in known)
+            for row in rows:
+                multiplier = our_multipliers.get(row['fpl_player_id'], 0)
+                row['our_multiplier'] = multiplier
+                row['exposure'] = round(multiplier * 100 - row['effective_ownership'], 1)
+        rows.sort(key=lambda row: (-row['effective_ownership'], row['fpl_player_id']))
+        return rows
+
+
+def _fetch_standings(client, league_id: int, limiter: RateLimiter, max_members: int,
+                     executor: ThreadPoolExecutor, max_workers: int) -> Tuple[Dict[str, Any], List[Dict[str, Any]], bool]:
+    """League details, member rows in rank order, and whether the league has more members than ``max_members``.
+
+    Standings only say whether a next page exists, so later pages are
+    requested ``max_workers`` at a time until one reports the end.
+    """
+    def page(number):
+        limiter.wait()
+        return client.get_league_standings(league_id, number)['standings']
+
+    limiter.wait()
+    first = client.get_league_standings(league_id, 1)
+    standings = first['standings']
+    rows, has_next, number = list(standings.get('results', [])), standings.get('has_next', False), 2
+    last_page = -(-max_members // STANDINGS_PAGE_SIZE)
+    while has_next and number <= last_page:
+        window = range(number, min(number + max_workers, last_page + 1))
+        for standings in executor.map(page, window):
+            rows.extend(standings.get('results', []))
+            has_next = standings.get('has_next', False)
+            if not has_next:
+                break
+        number = window.stop
+    # Standings can shift between page requests; keep each entry's first row.
+    members, seen = [], set()
+    for row in rows:
+        if row['entry'] not in seen:
+            seen.add(row['entry'])
+            members.append(row)
+    return first.get('league') or {}, members[:max_members], has_next or len(members) > max_members
+
+
+@timed('service')
+def refresh_league(store: TrackedTeamStore, client, season: str, league_id: int, max_workers: int = DEFAULT_LEAGUE_WORKERS,
+                   requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND, max_members: int = DEFAULT_MAX_MEMBERS,
+                   force: bool = False) -> Dict[str, Any]:
+    """Store a league's standings and every member's current-gameweek picks.
+
+    Standings pages and picks are fetched on up to ``max_workers`` threads,
+    with all requests spaced by one shared ``requests_per_second`` limit.
+    Picks are fixed at the gameweek deadline, so members whose picks for the
+    gameweek are already stored (from this league or another) are not
+    fetched again unless ``force`` is set: a refresh within a gameweek only
+    requests new members and earlier failures, and the first refresh after a
+    deadline requests each member once. Picks are written
+    ``TEAM_IMPORT_BATCH_SIZE`` teams per transaction and failures are
+    reported per member.
+    """
+    started = time.perf_counter()
+    for name, value in (('league_id', league_id), ('max_workers', max_workers), ('max_members', max_members)):
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise ValueError(f'{name} must be a positive integer.')
+    gameweek = client.get_current_gameweek()
+    limiter = RateLimiter(requests_per_second)
+
+    def fetch_picks(team_id):
+        limiter.wait()
+        return client.get_team_picks(team_id, gameweek)
+
+    fetched, failures = [], {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        league, members, truncated = _fetch_standings(client, league_id, limiter, max_members, executor, max_workers)
+        stored = set() if force else store.league_pick_team_ids(season, gameweek)
+        pending = [member['entry'] for member in members if member['entry'] not in stored]
+        futures = {executor.submit(fetch_picks, team_id): team_id for team_id in pending}
+        for future in as_completed(futures):
+            team_id = futures[future]
+            try:
+                fetched.append((team_id, future.result()))
+            except Exception as error:
+                failures[team_id] = str(error)
+    store.save_league(league_id, season, gameweek, league.get('name'), members, truncated)
+    store.save_league_picks(season, gameweek, fetched)
+    return {'fpl_league_id': league_id, 'name': league.get('name'), 'current_gameweek': gameweek, 'members': len(members),
+            'truncated': truncated,
+            'summary': {'fetched': len(fetched), 'already_stored': len(members) - len(pending), 'failed': len(failures)},
+            'failures': [{'fpl_team_id': team_id, 'error': failures[team_id]} for team_id in sorted(failures)],
+            'elapsed_seconds': round(time.perf_counter() - started, 3)}
+
+
+@timed('service')
+def league_ownership(store: TrackedTeamStore, league_id: int, team_id: Optional[int] = None,
+                     fetch_team_picks: Optional[Callable[[int, int], Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+    """Effective ownership in a stored league for its last refreshed gameweek, or None if the league is unknown.
+
+    ``team_id`` adds our exposure to each player. Its picks come from the
+    store when the team is a member, and from ``fetch_team_picks(team_id,
+    gameweek)`` otherwise.
+    """
+    league = store.get_league(league_id)
+    if league is None:
+        return None
+    matrix = OwnershipMatrix(store.league_pick_rows(league_id, league['season'], league['gameweek']))
+    ours = None
+    if team_id is not None:
+        if team_id in matrix.member_ids:
+            ours = matrix.member_multipliers(team_id)
+        elif fetch_team_picks is not None:
+            picks = fetch_team_picks(team_id, league['gameweek']).get('picks', [])
+            ours = {pick['element']: pick.get('multiplier') or 0 for pick in picks if isinstance(pick.get('element'), int)}
+    return {'fpl_league_id': league_id, 'name': league['name'], 'gameweek': league['gameweek'],
+            'members': league['member_count'], 'members_with_picks': len(matrix.member_ids),
+            'fpl_team_id': team_id if ours is not None else None, 'players': matrix.players(ours)}
@@ -0,0 +1,193 @@
+"""Local store for player photos: content-addressed files on disk behind an in-memory LRU."""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from app.utils.http_session import http_session
+from app.utils.instrumentation import span
+from app.utils.single_flight import SingleFlight
+
+PHOTO_URL = 'https://resources.premierleague.com/premierleague/photos/players/110x140/p{code}.png'
+# The photo host answers 403 without a browser User-Agent.
+PHOTO_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+DEFAULT_MEMORY_BYTES = 16 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 30 * 86400
+DEFAULT_MISSING_TTL_SECONDS = 6 * 3600
+DEFAULT_MISSING_ENTRIES = 4096
+
+
+@dataclass(frozen=True)
+class Photo:
+    content: bytes
+    digest: str
+
+    @property
+    def etag(self) -> str:
+        return self.digest[:32]
+
+
+def player_photo_codes(bootstrap: Dict) -> List[int]:
+    """Photo codes for every player in a bootstrap payload."""
+    return [element['code'] for element in bootstrap.get('elements', []) if element.get('code')]
+
+
+def _fetch_photo(code: int) -> Tuple[int, bytes]:
+    with span('upstream', 'photo'):
+        response = http_session.get(PHOTO_URL.format(code=code), headers=PHOTO_HEADERS, timeout=10)
+        return response.status_code, response.content
+
+
+class PhotoStore:
+    """Player photos keyed by player code, fetched upstream at most once per ``max_age_seconds``.
+
+    Image bytes are written once under ``objects/`` by their SHA-256, and a
+    small ``codes/<code>`` file points each player at its current digest, so
+    identical images share a file and every write is an atomic rename. Recently
+    served photos stay in memory up to ``memory_bytes``. Concurrent misses for
+    one code share one download, and a 404 is remembered for
+    ``missing_ttl_seconds`` so absent photos are not requested again on every
+    page view; at most ``missing_entries`` codes are remembered. Other
+    upstream failures are not cached; an expired file is served instead when
+    one exists. A download that cannot be written to disk is still served,
+    from memory.
+    """
+
+    def __init__(self, directory: str, memory_bytes: int = DEFAULT_MEMORY_BYTES, max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+                 missing_ttl_seconds: float = DEFAULT_MISSING_TTL_SECONDS, missing_entries: int = DEFAULT_MISSING_ENTRIES,
+                 fetch: Callable[[int], Tuple[int, bytes]] = _fetch_photo, clock: Callable[[], float] = time.time):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.max_age_seconds = max_age_seconds
+        self.missing_ttl_seconds = missing_ttl_seconds
+        self.missing_entries = missing_entries
+        self.fetch = fetch
+        self.clock = clock
+        self._memory: 'OrderedDict[int, Tuple[Photo, float]]' = OrderedDict()
+        self._memory_size = 0
+        self._missing: 'OrderedDict[int, float]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'downloads': 0, 'missing_hits': 0, 'not_found': 0, 'errors': 0, 'write_errors': 0}
+
+    def get(self, code: int) -> Optional[Photo]:
+        """The photo for ``code``, or None when upstream has none or cannot be reached."""
+        now = self.clock()
+        with self._lock:
+            cached = self._memory.get(code)
+            if cached and now - cached[1] < self.max_age_seconds:
+                self._memory.move_to_end(code)
+                self._counters['memory_hits'] += 1
+                return cached[0]
+            if self._missing.get(code, 0) > now:
+                self._counters['missing_hits'] += 1
+                return None
+        return self._flights.do(code, lambda: self._load(code))
+
+    def _load(self, code: int) -> Optional[Photo]:
+        stored = self._read(code)
+        if stored and self.clock() - stored[1] < self.max_age_seconds:
+            self._count('disk_hits')
+            self._remember(code, *stored)
+            return stored[0]
+        try:
+            status, content = self.fetch(code)
+        except requests.RequestException:
+            status, content = None, b''
+        if status == 404:
+            self._count('not_found')
+            self._remember_missing(code)
+            return None
+        if status != 200 or not content:
+            self._count('errors')
+            return stored[0] if stored else None
+        self._count('downloads')
+        try:
+            photo = self._write(code, content)
+        except OSError:
+            # A full or read-only volume costs the disk copy, not the response.
+            self._count('write_errors')
+            photo = Photo(content, hashlib.sha256(content).hexdigest())
+        self._remember(code, photo, self.clock())
+        return photo
+
+    def _read(self, code: int) -> Optional[Tuple[Photo, float]]:
+        reference = os.path.join(self.directory, 'codes', str(code))
+        try:
+            with open(reference) as handle:
+                digest = handle.read().strip()
+            fetched_at = os.path.getmtime(reference)
+            with open(self._object_path(digest), 'rb') as handle:
+                return Photo(handle.read(), digest), fetched_at
+        except OSError:
+            return None
+
+    def _write(self, code: int, content: bytes) -> Photo:
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._atomic_write(path, content)
+        reference = os.path.join(self.directory, 'codes', str(code))
+        os.makedirs(os.path.dirname(reference), exist_ok=True)
+        self._atomic_write(reference, digest.encode())
+        return Photo(content, digest)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, 'objects', digest[:2], f'{digest}.png')
+
+    @staticmethod
+    def _atomic_write(path: str, content: bytes) -> None:
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(handle, 'wb') as stream:
+                stream.write(content)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def _remember(self, code: int, photo: Photo, fetched_at: float) -> None:
+        with self._lock:
+            previous = self._memory.pop(code, None)
+            if previous:
+                self._memory_size -= len(previous[0].content)
+            self._memory[code] = (photo, fetched_at)
+            self._memory_size += len(photo.content)
+            while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+                _, (evicted, _) = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted.content)
+
+    def _remember_missing(self, code: int) -> None:
+        now = self.clock()
+        with self._lock:
+            # Every entry gets the same TTL, so insertion order is expiry order: expired codes sit at the front.
+            self._missing.pop(code, None)
+            self._missing[code] = now + self.missing_ttl_seconds
+            while self._missing and (next(iter(self._missing.values())) <= now or len(self._missing) > self.missing_entries):
+                self._missing.popitem(last=False)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def prefetch(self, codes: Iterable[int], max_workers: int = 8) -> Dict[str, int]:
+        """Load every code not already stored, ``max_workers`` at a time."""
+        started = dict(self.stats())
+        codes = list(dict.fromkeys(codes))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self.get, codes))
+        finished = self.stats()
+        return {'codes': len(codes), **{name: finished[name] - started[name] for name in ('downloads', 'not_found', 'errors')}}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters, memory_entries=len(self._memory), memory_bytes=self._memory_size, missing=len(self._missing))
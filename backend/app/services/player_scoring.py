@@ -0,0 +1,93 @@
+"""Columnar transfer and differential scores for every bootstrap player at once."""
+
+import threading
+from collections import OrderedDict
+from typing import Iterable, List
+
+import numpy as np
+
+from app.services.bootstrap_index import POSITION_NAMES, BootstrapIndex
+from app.services.fixture_difficulty import FixtureDifficultyTable
+
+# Rankings compare ``round(score, 2)``. NumPy and Python rounding can disagree
+# by one 0.01 step on a boundary, so both the k-th score and a candidate's
+# score may each be off by one step.
+_ROUNDING_MARGIN = 0.0201
+
+
+class PlayerColumns:
+    """Bootstrap player fields as parallel NumPy arrays, in bootstrap order."""
+
+    def __init__(self, index: BootstrapIndex):
+        players = index.elements
+        self.players = players
+        self.ids = [player['id'] for player in players]
+        self.position = np.array([POSITION_NAMES.get(player.get('element_type', 0), 'Unknown') for player in players])
+        self.active = np.array([player.get('status') == 'a' for player in players], dtype=bool)
+        self.form = np.array([float(player.get('form', 0)) for player in players], dtype=float)
+        self.cost = np.array([(player.get('now_cost', 0) or 0) / 10 for player in players], dtype=float)
+        self.selected = np.array([float(player.get('selected_by_percent', 0)) for player in players], dtype=float)
+        self.minutes = np.array([player.get('minutes', 0) for player in players], dtype=float)
+        self.team = [player.get('team', 0) or 0 for player in players]
+
+    def fdr(self, difficulty: FixtureDifficultyTable, weeks: int = 3) -> np.ndarray:
+        by_club = {team_id: difficulty.average_fdr(team_id, weeks) for team_id in set(self.team)}
+        return np.array([by_club[team_id] for team_id in self.team], dtype=float)
+
+    def candidates(self, position: str, excluded_ids: Iterable[int]) -> np.ndarray:
+        """Indices of active players at ``position`` that are not excluded, in bootstrap order."""
+        excluded = set(excluded_ids)
+        mask = self.active & (self.position == position)
+        return np.array([index for index in np.flatnonzero(mask) if self.ids[index] not in excluded], dtype=int)
+
+
+def transfer_scores(columns: PlayerColumns, fdr: np.ndarray) -> np.ndarray:
+    """Vectorized ``RecommendationEngine._score_player_for_transfer`` composite score."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = np.where(columns.cost > 0, columns.form / columns.cost, 0.0)
+    ownership = (100 - columns.selected) / 100
+    fixture = (6 - fdr) / 5
+    playing_time = np.minimum(columns.minutes / 90, 1.0)
+    return (columns.form * 0.25) + (value * 0.20) + (ownership * 0.15) + (fixture * 0.25) + (playing_time * 0.15)
+
+
+def differential_scores(columns: PlayerColumns, fdr: np.ndarray) -> np.ndarray:
+    """Vectorized ``RecommendationEngine._score_differential`` score."""
+    ownership = (100 - columns.selected) / 100
+    fixture = (6 - fdr) / 5
+    return (np.maximum(0, columns.form) * 0.30) + (ownership * 0.40) + (fixture * 0.20) + (columns.minutes / 90 * 0.10)
+
+
+def top_k_candidates(candidates: np.ndarray, scores: np.ndarray, k: int) -> List[int]:
+    """Candidate indices that can reach the top ``k`` by rounded score, in bootstrap order.
+
+    Uses ``argpartition`` to find the k-th best score and keeps every candidate
+    within two rounding steps of it, so the caller's exact stable sort of the
+    survivors gives the same top ``k`` as sorting every candidate.
+    """
+    if k <= 0 or not len(candidates):
+        return []
+    if len(candidates) <= k:
+        return candidates.tolist()
+    rounded = np.round(scores[candidates], 2)
+    kth_best = rounded[np.argpartition(-rounded, k - 1)[:k]].min()
+    return candidates[rounded >= kth_best - _ROUNDING_MARGIN].tolist()
+
+
+_columns: 'OrderedDict[str, PlayerColumns]' = OrderedDict()
+_columns_lock = threading.Lock()
+
+
+def get_player_columns(index: BootstrapIndex) -> PlayerColumns:
+    """Return the shared columns for this bootstrap version, building them on first use."""
+    with _columns_lock:
+        columns = _columns.get(index.version)
+        if columns is not None:
+            _columns.move_to_end(index.version)
+            return columns
+    columns = PlayerColumns(index)
+    with _columns_lock:
+        _columns[index.version] = columns
+        while len(_columns) > 4:
+            _columns.popitem(last=False)
+    return columns
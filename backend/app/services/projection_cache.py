@@ -0,0 +1,136 @@
+"""Shared, read-only projection values per projection set, held as player × gameweek matrices."""
+
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from app.utils.single_flight import SingleFlight
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class ProjectionValues(Mapping):
+    """Expected points keyed by ``(player_id, gameweek)``, backed by one float matrix.
+
+    Behaves like the ``projection_values`` dict the planners already take,
+    but a full season costs one small array instead of tens of thousands of
+    tuple keys. Missing pairs are stored as NaN and are not keys.
+    """
+
+    def __init__(self, player_ids: Iterable[int], gameweeks: Iterable[int], matrix: np.ndarray):
+        self.player_ids = list(player_ids)
+        self.gameweeks = list(gameweeks)
+        self.matrix = matrix
+        self.matrix.setflags(write=False)
+        self._rows = {player_id: row for row, player_id in enumerate(self.player_ids)}
+        self._columns = {gameweek: column for column, gameweek in enumerate(self.gameweeks)}
+        self._size = int(np.count_nonzero(~np.isnan(matrix)))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, int, float]]) -> 'ProjectionValues':
+        rows = list(rows)
+        player_ids = sorted({row[0] for row in rows})
+        gameweeks = sorted({row[1] for row in rows})
+        matrix = np.full((len(player_ids), len(gameweeks)), np.nan)
+        if rows:
+            players = {player_id: index for index, player_id in enumerate(player_ids)}
+            columns = {gameweek: index for index, gameweek in enumerate(gameweeks)}
+            matrix[[players[row[0]] for row in rows], [columns[row[1]] for row in rows]] = [row[2] for row in rows]
+        return cls(player_ids, gameweeks, matrix)
+
+    @property
+    def nbytes(self) -> int:
+        # The index dicts cost roughly as much per player and gameweek as a few matrix cells.
+        return self.matrix.nbytes + 100 * (len(self.player_ids) + len(self.gameweeks))
+
+    def get(self, key, default=None):
+        row, column = self._rows.get(key[0]), self._columns.get(key[1])
+        if row is None or column is None:
+            return default
+        value = self.matrix[row, column]
+        return default if value != value else float(value)
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        for row, column in zip(*np.nonzero(~np.isnan(self.matrix))):
+            yield self.player_ids[row], self.gameweeks[column]
+
+    def __len__(self):
+        return self._size
+
+    def items(self):
+        for (row, column), value in zip(zip(*np.nonzero(~np.isnan(self.matrix))), self.matrix[~np.isnan(self.matrix)].tolist()):
+            yield (self.player_ids[row], self.gameweeks[column]), value
+
+
+class ProjectionCache:
+    """LRU cache of ``ProjectionValues`` bounded by an approximate memory budget.
+
+    Projection sets never change once written, so an entry stays valid until
+    it is evicted or ``invalidate`` is called after a new set is saved.
+    Concurrent misses for the same set share one database read.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Tuple[str, str], ProjectionValues]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, store, projection_set_id: str) -> ProjectionValues:
+        key = (store.database_path, projection_set_id)
+        with self._lock:
+            values = self._entries.get(key)
+            if values is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return values
+            self.misses += 1
+        return self._flights.do(key, lambda: self._load(key, store, projection_set_id))
+
+    def _load(self, key, store, projection_set_id: str) -> ProjectionValues:
+        values = ProjectionValues.from_rows(store.projection_value_rows(projection_set_id))
+        with self._lock:
+            self._entries[key] = values
+            self._entries.move_to_end(key)
+            total = sum(entry.nbytes for entry in self._entries.values())
+            # The newest entry is kept even when it alone exceeds the budget.
+            while total > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                total -= evicted.nbytes
+                self.evictions += 1
+        return values
+
+    def invalidate(self, database_path: Optional[str] = None) -> None:
+        with self._lock:
+            if database_path is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == database_path]:
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': sum(entry.nbytes for entry in self._entries.values()),
+                    'max_bytes': self.max_bytes, 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+projection_cache = ProjectionCache(int(os.getenv('FPL_PROJECTION_CACHE_BYTES', DEFAULT_CACHE_BYTES)))
+
+
+def get_projection_values(store, projection_set_id: str) -> ProjectionValues:
+    """Projection values for one set from the shared process-wide cache."""
+    return projection_cache.get(store, projection_set_id)
@@ -1,16 +1,121 @@
 """Transparent, versioned baseline projections from official FPL fields."""
 
 from collections import defaultdict
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, Iterator, List
 
+import numpy as np
 
-def build_baseline_projections(players: Iterable[Dict[str, Any]], fixtures: Iterable[Dict[str, Any]], gameweeks: List[int]):
-    """Use official form, availability, and FDR as an auditable interim model.
+from app.utils.instrumentation import timed
 
-    ``form`` is FPL's recent points per match. It is adjusted independently for
-    each fixture, so blank and double gameweeks naturally receive zero and two
-    fixture contributions respectively.
+
+class ProjectionMatrix:
+    """Baseline projections as player × gameweek arrays.
+
+    Rows follow the eligible players in input order and columns follow
+    ``gameweeks``. ``rows()`` yields the same dicts as the scalar model, one
+    at a time, so callers can stream them without holding a full list.
     """
+
+    def __init__(self, player_ids: List[int], gameweeks: List[int], form: np.ndarray, availability: np.ndarray,
+                 fixture_count: np.ndarray, fdr_multiplier: np.ndarray, warnings: List[str]):
+        self.player_ids = player_ids
+        self.gameweeks = gameweeks
+        self.form = form
+        self.availability = availability
+        self.fixture_count = fixture_count
+        self.fdr_multiplier = fdr_multiplier
+        self.warnings = warnings
+        # Same operand order as the scalar model, so every product is bit-identical.
+        self.raw_points = form[:, None] * availability[:, None] * fdr_multiplier
+        self._expected_points = None
+
+    def __len__(self):
+        return len(self.player_ids) * len(self.gameweeks)
+
+    @property
+    def expected_points(self) -> np.ndarray:
+        """Expected points rounded with Python's ``round``, which ``np.round`` does not always match."""
+        if self._expected_points is None:
+            rounded = [round(value, 3) for value in self.raw_points.ravel().tolist()]
+            self._expected_points = np.array(rounded, dtype=float).reshape(self.raw_points.shape)
+        return self._expected_points
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        minutes = (90 * self.availability)[:, None] * self.fixture_count
+        gameweeks = self.gameweeks
+        for player_id, form, availability, points, counts, multipliers, played in zip(
+                self.player_ids, self.form.tolist(), self.availability.tolist(), self.raw_points.tolist(),
+                self.fixture_count.tolist(), self.fdr_multiplier.tolist(), minutes.tolist()):
+            risk = round(1 - availability, 3)
+            for gameweek, expected, fixture_count, fdr_multiplier, expected_minutes in zip(gameweeks, points, counts, multipliers, played):
+                yield {
+                    'fpl_player_id': player_id, 'gameweek': gameweek, 'expected_points': round(expected, 3),
+                    'expected_minutes': round(expected_minutes, 1),
+                    'appearance_probability': availability if fixture_count else 0.0,
+                    'risk': risk, 'fixture_count': fixture_count,
+                    # A blank gameweek has the scalar model's integer zero multiplier.
+                    'components': {'official_form': form, 'availability': availability,
+                                   'fdr_multiplier': round(fdr_multiplier, 3) if fixture_count else 0},
+                }
+
+
+def _club_fixture_matrix(fixtures: Iterable[Dict[str, Any]], clubs: Dict[int, int], gameweeks: List[int]):
+    """Fixture counts and summed FDR multipliers per (club, gameweek) cell."""
+    columns = defaultdict(list)
+    for column, gameweek in enumerate(gameweeks):
+        columns[gameweek].append(column)
+    difficulties = defaultdict(list)
+    for fixture in fixtures:
+        gameweek = fixture.get('event')
+        if gameweek in columns:
+            difficulties[(fixture.get('team_h'), gameweek)].append(fixture.get('team_h_difficulty'))
+            difficulties[(fixture.get('team_a'), gameweek)].append(fixture.get('team_a_difficulty'))
+    count = np.zeros((len(clubs), len(gameweeks)), dtype=int)
+    multiplier = np.zeros((len(clubs), len(gameweeks)), dtype=float)
+    for (club, gameweek), values in difficulties.items():
+        row = clubs.get(club)
+        if row is None:
+            continue
+        values = [value for value in values if isinstance(value, int)]
+        for column in columns[gameweek]:
+            count[row, column] = len(values)
+            multiplier[row, column] = sum(1 + (3 - difficulty) * 0.1 for difficulty in values)
+    return count, multiplier
+
+
+@timed('service')
+def build_projection_matrix(players: Iterable[Dict[str, Any]], fixtures: Iterable[Dict[str, Any]], gameweeks: List[int]) -> ProjectionMatrix:
+    """Columnar form of ``build_baseline_projections``.
+
+    Per-player form and availability are broadcast against a (club ×
+    gameweek) fixture matrix built once, instead of re-filtering fixtures for
+    every player and gameweek.
+    """
+    gameweeks = list(gameweeks)
+    player_ids, club_rows, forms, availabilities, warnings, clubs = [], [], [], [], [], {}
+    for player in players:
+        player_id, team_id = player.get('id'), player.get('team')
+        if not isinstance(player_id, int) or not isinstance(team_id, int):
+            continue
+        try:
+            form = float(player.get('form'))
+        except (TypeError, ValueError):
+            form = 0.0
+            warnings.append(f"Player {player_id} has no official form; a zero baseline was used.")
+        chance = player.get('chance_of_playing_next_round')
+        player_ids.append(player_id)
+        club_rows.append(clubs.setdefault(team_id, len(clubs)))
+        forms.append(form)
+        availabilities.append(1.0 if player.get('status') == 'a' else (chance / 100 if isinstance(chance, int) else 0.0))
+    count, multiplier = _club_fixture_matrix(fixtures, clubs, gameweeks)
+    rows = np.array(club_rows, dtype=int)
+    return ProjectionMatrix(player_ids, gameweeks, np.array(forms, dtype=float), np.array(availabilities, dtype=float),
+                            count[rows].reshape(len(rows), len(gameweeks)), multiplier[rows].reshape(len(rows), len(gameweeks)),
+                            sorted(set(warnings)))
+
+
+def _scalar_baseline_projections(players: Iterable[Dict[str, Any]], fixtures: Iterable[Dict[str, Any]], gameweeks: List[int]):
+    """Row-at-a-time reference model kept for equivalence tests and benchmarks."""
     by_team_gw = defaultdict(list)
     for fixture in fixtures:
         gameweek = fixture.get('event')
@@ -42,3 +147,15 @@ def build_baseline_projections(players: Iterable[Dict[str, Any]], fixtures: Iter
                 'components': {'official_form': form, 'availability': availability, 'fdr_multiplier': round(fdr_multiplier, 3)},
             })
     return result, sorted(set(warnings))
+
+
+@timed('service')
+def build_baseline_projections(players: Iterable[Dict[str, Any]], fixtures: Iterable[Dict[str, Any]], gameweeks: List[int]):
+    """Use official form, availability, and FDR as an auditable interim model.
+
+    ``form`` is FPL's recent points per match. It is adjusted independently for
+    each fixture, so blank and double gameweeks naturally receive zero and two
+    fixture contributions respectively.
+    """
+    projection = build_projection_matrix(players, fixtures, gameweeks)
+    return list(projection.rows()), projection.warnings
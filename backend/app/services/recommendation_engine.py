@@ -1,36 +1,59 @@
 """Service for generating transfer recommendations"""
 from typing import Dict, List, Optional
-from app.utils.fpl_api import FPLAPIClient
+from app.services.data_context import FPLDataContext
+from app.services.player_scoring import differential_scores, get_player_columns, top_k_candidates, transfer_scores
 from app.services.team_analyzer import TeamAnalyzer
+from app.utils.instrumentation import timed_methods
 from collections import defaultdict
 
+@timed_methods('service')
 class RecommendationEngine:
     """Generates optimized transfer recommendations"""
     
-    def __init__(self, team_id: int):
+    # Rank with the columnar scorer; the scalar path is kept as a reference.
+    vectorized = True
+    
+    def __init__(self, team_id: int, context: Optional[FPLDataContext] = None, analyzer: Optional[TeamAnalyzer] = None):
         self.team_id = team_id
-        self.analyzer = TeamAnalyzer(team_id)
+        self.analyzer = analyzer or TeamAnalyzer(team_id, context)
         self.bootstrap = self.analyzer.bootstrap
         self.current_gameweek = self.analyzer.current_gameweek
         self.all_players = self.bootstrap['elements']
         self.fixtures = self.analyzer.fixtures
+        self.index = self.analyzer.index
+        self.difficulty = self.analyzer.context.fixture_difficulty
         
     def get_best_transfers_per_position(self) -> Dict[str, List[Dict]]:
         """Get best 5 transfer options per position"""
         current_squad = self.analyzer.get_current_squad()
         current_player_ids = {p['player_id'] for p in current_squad}
+        if not self.vectorized:
+            return self._best_transfers_scalar(current_player_ids)
         
+        # Score every player in one pass and only build response rows for likely winners
+        columns = get_player_columns(self.index)
+        scores = transfer_scores(columns, columns.fdr(self.difficulty, weeks=3))
+        recommendations = {}
+        
+        for position in ['GK', 'DEF', 'MID', 'FWD']:
+            candidates = columns.candidates(position, current_player_ids)
+            scored_players = [
+                self._score_player_for_transfer(columns.players[i], position)
+                for i in top_k_candidates(candidates, scores, 5)
+            ]
+            recommendations[position] = sorted(scored_players, key=lambda x: x['score'], reverse=True)[:5]
+        
+        return recommendations
+    
+    def _best_transfers_scalar(self, current_player_ids: set) -> Dict[str, List[Dict]]:
+        """Reference path: score every available player as a full row"""
         recommendations = {}
         
         for position in ['GK', 'DEF', 'MID', 'FWD']:
-            # Get players in squad for this position
-            squad_players = [p for p in current_squad if p['position'] == position]
-            
             # Get available players for this position (not in squad)
             available_players = [
-                p for p in self.all_players 
-                if self._get_position_name(p.get('element_type', 0)) == position
-                and p['id'] not in current_player_ids
+                p for p in self.index.players_by_position.get(position, [])
+                if p['id'] not in current_player_ids
                 and p.get('status') == 'a'  # Active only
             ]
             
@@ -50,7 +73,24 @@ class RecommendationEngine:
         """Get high-upside differentials organized by position (5 per position)"""
         current_squad = self.analyzer.get_current_squad()
         current_player_ids = {p['player_id'] for p in current_squad}
+        if not self.vectorized:
+            return self._differentials_scalar(current_player_ids, count)
+        
+        columns = get_player_columns(self.index)
+        scores = differential_scores(columns, columns.fdr(self.difficulty, weeks=3))
+        result = {}
+        for position in ['GK', 'DEF', 'MID', 'FWD']:
+            candidates = columns.candidates(position, current_player_ids)
+            differentials = [
+                self._score_differential(columns.players[i])
+                for i in top_k_candidates(candidates, scores, count)
+            ]
+            result[position] = sorted(differentials, key=lambda x: x['differential_score'], reverse=True)[:count]
         
+        return result
+    
+    def _differentials_scalar(self, current_player_ids: set, count: int) -> Dict[str, List[Dict]]:
+        """Reference path: score every available player as a full row"""
         # Get available players
         available_players = [
             p for p in self.all_players
@@ -59,14 +99,14 @@ class RecommendationEngine:
         ]
         
         # Score differentials
-        differential_scores = [
+        scored_differentials = [
             self._score_differential(p)
             for p in available_players
         ]
         
         # Group by position and get top 5 per position
         by_position = defaultdict(list)
-        for diff in differential_scores:
+        for diff in scored_differentials:
             by_position[diff['position']].append(diff)
         
         # Get top 5 per position
@@ -210,25 +250,7 @@ class RecommendationEngine:
     
     def _calculate_upcoming_fdr(self, team_id: int, weeks: int = 3) -> float:
         """Calculate average fixture difficulty rating for upcoming weeks"""
-        if not team_id:
-            return 3.0  # Default medium difficulty
-        
-        upcoming_fdr_values = []
-        fixture_count = 0
-        
-        for fixture in self.fixtures:
-            event = fixture.get('event', 0) or 0
-            if event >= self.current_gameweek and fixture_count < weeks:
-                if fixture['team_a'] == team_id:
-                    fdr = fixture.get('team_a_difficulty', 3)
-                    upcoming_fdr_values.append(fdr)
-                    fixture_count += 1
-                elif fixture['team_h'] == team_id:
-                    fdr = fixture.get('team_h_difficulty', 3)
-                    upcoming_fdr_values.append(fdr)
-                    fixture_count += 1
-        
-        return sum(upcoming_fdr_values) / len(upcoming_fdr_values) if upcoming_fdr_values else 3.0
+        return self.difficulty.average_fdr(team_id, weeks)
     
     def _generate_recommendation_reason(self, player: Dict, form: float, ownership: float, fdr: float) -> str:
         """Generate human-readable reason for recommendation"""
@@ -259,10 +281,7 @@ class RecommendationEngine:
     
     def _get_team_name(self, team_id: int) -> str:
         """Get team name from ID"""
-        for team in self.bootstrap['teams']:
-            if team['id'] == team_id:
-                return team['short_name']
-        return 'Unknown'
+        return self.index.team_short_name(team_id)
     
     def _get_player_photo_url(self, player_code: Optional[int]) -> str:
         """Get player photo URL from our API proxy endpoint"""
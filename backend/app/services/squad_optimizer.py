@@ -1,20 +1,30 @@
 """Deterministic, constraint-aware full-squad builder for initial and wildcard modes."""
 
+import heapq
 from collections import Counter
 from typing import Any, Dict, Iterable, List, Mapping
 
 from app.domain import get_ruleset, validate_squad
+from app.services.exact_squad_solver import DEFAULT_TIME_LIMIT_MS, solve_exact_squad
 from app.services.transfer_planner import _best_lineup, _position
+from app.utils.instrumentation import timed
+from app.utils.process_pool import run_parts
 
+OPTIMIZER_MODES = ('beam', 'exact')
+BEAM_WARNING = 'Bounded-beam optimizer; solution is feasible but not proven optimal.'
+BEAM_WIDTH = 800
+# A modest price term keeps affordable paths alive in the bounded beam.
+PRICE_WEIGHT = 0.025
+# One expansion is a few tuple operations, so a beam step needs about this many before a process pool pays off.
+PARALLEL_MIN_EXPANSIONS = 40000
+# Every alternative is a full beam search, so two of them already make a process pool worth its overhead.
+PARALLEL_MIN_ALTERNATIVES = 2
+# Fields of a player that the beam and squad validation read; alternative workers get only these.
+_SQUAD_FIELDS = ('id', 'element_type', 'position', 'team', 'club_id', 'now_cost', 'price_tenths', 'status')
 
-def _ranked_states(states, limit=800):
-    # A modest price term keeps affordable paths alive in the bounded beam.
-    return sorted(states, key=lambda state: (state['score'] - state['cost'] * 0.025, -state['cost']), reverse=True)[:limit]
 
-
-def _build_squad(players: List[Mapping[str, Any]], values, budget: int, locked_ids, excluded_ids, diversity_ids=frozenset()):
-    ruleset = get_ruleset()
-    player_by_id = {player['id']: player for player in players if isinstance(player.get('id'), int)}
+def _locked_players(player_by_id, budget: int, locked_ids, excluded_ids, ruleset):
+    """Return the locked players, or an explanation when the locks alone are infeasible."""
     locks = [player_by_id[player_id] for player_id in locked_ids if player_id in player_by_id]
     if len(locks) != len(locked_ids):
         return None, ['One or more locked players are unavailable in the player pool.']
@@ -24,66 +34,225 @@ def _build_squad(players: List[Mapping[str, Any]], values, budget: int, locked_i
         return None, ['Unavailable players cannot be locked into a new squad.']
     if any(not isinstance(player.get('now_cost'), int) for player in locks):
         return None, ['Locked players must have known prices.']
+    if any(player.get('team') is None for player in locks):
+        return None, ['Locked players must belong to a known club.']
     position_counts, clubs = Counter(_position(player) for player in locks), Counter(player.get('team') for player in locks)
     if any(position_counts[position] > count for position, count in ruleset.squad_position_counts.items()) or any(count > ruleset.max_players_per_club for count in clubs.values()):
         return None, ['Locked players violate squad composition or club limits.']
     if sum(player.get('now_cost', 0) for player in locks) > budget:
         return None, ['Locked players exceed the available budget.']
-    states = [{'ids': tuple(player['id'] for player in locks), 'cost': sum(player['now_cost'] for player in locks),
-               'score': sum(values.get(player['id'], 0) for player in locks), 'clubs': clubs, 'positions': position_counts}]
-    for position, required_count in ruleset.squad_position_counts.items():
-        additions = required_count - position_counts[position]
+    return locks, []
+
+
+def _ranked_shard(shared, indexed_states):
+    """The ``width`` best expansions of ``(index, state)`` pairs as full heap entries, best first.
+
+    The tie-break is each expansion's position in the full state × candidate
+    order, so shards of one beam step can be merged into exactly the entries
+    an unsharded run keeps.
+    """
+    candidates, budget, max_per_club, width = shared
+    heap, stride = [], len(candidates)
+    for index, (score, cost, ids, clubs, picked) in indexed_states:
+        base = -index * stride
+        for offset, (bit, player_id, price, club, value) in enumerate(candidates):
+            if picked & bit:
+                continue
+            new_cost = cost + price
+            if new_cost > budget or clubs[club] >= max_per_club:
+                continue
+            new_score = score + value
+            key = new_score - new_cost * PRICE_WEIGHT
+            order = base - offset
+            if len(heap) == width and (key, -new_cost, order) < heap[0][:3]:
+                continue
+            entry = (key, -new_cost, order, new_score, new_cost, ids + (player_id,), clubs[:club] + (clubs[club] + 1,) + clubs[club + 1:], picked | bit)
+            if len(heap) < width:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heapreplace(heap, entry)
+    return sorted(heap, reverse=True)
+
+
+def _ranked_states(states, candidates, budget: int, max_per_club: int, width: int):
+    """Expand every state by every candidate and keep the ``width`` best by price-adjusted score.
+
+    States are ``(score, cost, ids, club_counts, picked_mask)`` tuples. A bounded
+    min-heap ordered by (score - price term, -cost, -expansion order) gives the
+    same states, in the same order, as a stable full sort of every expansion,
+    and a rejected expansion allocates nothing. Large steps are split by state
+    across the shared process pool and the shards' best entries merged.
+    """
+    shards = run_parts(_ranked_shard, (candidates, budget, max_per_club, width), list(enumerate(states)),
+                       len(states) * len(candidates), PARALLEL_MIN_EXPANSIONS)
+    entries = shards[0] if len(shards) == 1 else heapq.nlargest(width, (entry for shard in shards for entry in shard))
+    return [entry[3:] for entry in entries]
+
+
+def _beam_squads(players: List[Mapping[str, Any]], values, budget: int, locked_ids, excluded_ids, count: int,
+                 diversity_ids=frozenset(), width: int = BEAM_WIDTH):
+    """Up to ``count`` legal squads from one beam search, best first, with a warning only when there are none.
+
+    The diversity constraint only filters the beam's final states, so one
+    search serves every rank: each squad must include a player outside
+    ``diversity_ids`` and outside every squad ranked before it.
+    """
+    ruleset = get_ruleset()
+    player_by_id = {player['id']: player for player in players if isinstance(player.get('id'), int)}
+    locks, warnings = _locked_players(player_by_id, budget, locked_ids, excluded_ids, ruleset)
+    if warnings:
+        return None, warnings
+    position_counts, club_slots = Counter(_position(player) for player in locks), {}
+    for player in locks:
+        club_slots.setdefault(player['team'], len(club_slots))
+    pools = {}
+    for position in ruleset.squad_position_counts:
         candidates = [player for player in players if _position(player) == position and player.get('status') == 'a'
                       and player['id'] not in excluded_ids and player['id'] not in locked_ids]
         # Keep all cheap players and the strongest projected choices; the beam still validates all constraints.
         candidates = list({player['id']: player for player in (sorted(candidates, key=lambda player: player.get('now_cost', 10**9))[:40]
                      + sorted(candidates, key=lambda player: values.get(player['id'], 0), reverse=True)[:80])}.values())
-        for _ in range(additions):
-            next_states = []
-            for state in states:
-                for player in candidates:
-                    price, club = player.get('now_cost'), player.get('team')
-                    if player['id'] in state['ids'] or not isinstance(price, int) or club is None:
-                        continue
-                    if state['cost'] + price > budget or state['clubs'][club] >= ruleset.max_players_per_club:
-                        continue
-                    next_states.append({'ids': state['ids'] + (player['id'],), 'cost': state['cost'] + price,
-                                        'score': state['score'] + values.get(player['id'], 0),
-                                        'clubs': state['clubs'] + Counter([club]),
-                                        'positions': state['positions'] + Counter([position])})
-            states = _ranked_states(next_states)
+        pools[position] = [(1 << bit, player['id'], player['now_cost'], club_slots.setdefault(player['team'], len(club_slots)),
+                            values.get(player['id'], 0))
+                           for bit, player in enumerate(candidates) if isinstance(player.get('now_cost'), int) and player.get('team') is not None]
+    clubs = [0] * len(club_slots)
+    for player in locks:
+        clubs[club_slots[player['team']]] += 1
+    states = [(sum(values.get(player['id'], 0) for player in locks), sum(player['now_cost'] for player in locks),
+               tuple(player['id'] for player in locks), tuple(clubs), 0)]
+    for position, required_count in ruleset.squad_position_counts.items():
+        # Each position has its own candidates, so the picked mask restarts with it.
+        states = [state[:4] + (0,) for state in states]
+        for _ in range(required_count - position_counts[position]):
+            states = _ranked_states(states, pools[position], budget, ruleset.max_players_per_club, width)
             if not states:
-                return None, ['No legal squad can be constructed within the budget and constraints.']
-    ranked = sorted(states, key=lambda state: (state['score'], -state['cost']), reverse=True)
-    for state in ranked:
-        if diversity_ids and not (set(state['ids']) - diversity_ids):
+                return [], ['No legal squad can be constructed within the budget and constraints.']
+    ranked = sorted(states, key=lambda state: (state[0], -state[1]), reverse=True)
+    squads, covered = [], set(diversity_ids)
+    for _, _, ids, _, _ in ranked:
+        if covered and not (set(ids) - covered):
             continue
-        squad = [player_by_id[player_id] for player_id in state['ids']]
+        squad = [player_by_id[player_id] for player_id in ids]
         if validate_squad(squad, ruleset, budget).valid:
-            return squad, []
-    return None, ['No legal squad remains after applying the requested diversity constraint.']
+            squads.append(squad)
+            covered.update(ids)
+            if len(squads) == count:
+                return squads, []
+    return squads, [] if squads else ['No legal squad remains after applying the requested diversity constraint.']
+
+
+def _build_squad(players: List[Mapping[str, Any]], values, budget: int, locked_ids, excluded_ids, diversity_ids=frozenset(),
+                 width: int = BEAM_WIDTH):
+    squads, warnings = _beam_squads(players, values, budget, locked_ids, excluded_ids, 1, diversity_ids, width)
+    return (squads[0] if squads else None), warnings
+
+
+def _exact_squad(pool, values, budget: int, locked_ids, excluded_ids, time_limit_ms):
+    ruleset = get_ruleset()
+    eligible = [player for player in pool if isinstance(player.get('id'), int) and player.get('status') == 'a'
+                and player['id'] not in excluded_ids and isinstance(player.get('now_cost'), int) and player.get('team') is not None]
+    result = solve_exact_squad(eligible, values, budget, locked_ids, ruleset, time_limit_ms)
+    player_by_id = {player['id']: player for player in eligible}
+    squad = [player_by_id[player_id] for player_id in result.squad_ids] if result.squad_ids else None
+    if squad and not validate_squad(squad, ruleset, budget).valid:
+        raise RuntimeError('Exact optimizer returned a squad that fails validation.')
+    return squad, result
 
 
+def _alternative_shard(shared, dropped_ids):
+    """Candidate squads as id tuples from one beam per player in ``dropped_ids``, each beam run without that player.
+
+    Module-level and fed only plain data, so ``run_parts`` can run the
+    alternatives' beams in worker processes.
+    """
+    pool, values, budget, locked_ids, excluded_ids, count = shared
+    return [tuple(player['id'] for player in squad) for player_id in dropped_ids
+            for squad in _beam_squads(pool, values, budget, locked_ids, excluded_ids | {player_id}, count)[0]]
+
+
+def _alternatives(pool, values, budget: int, locked_ids, excluded_ids, first, count: int, extra_candidates=()):
+    """Up to ``count`` squads ranked after ``first``, each with a player outside every squad ranked before it.
+
+    Each of the ``count`` most valuable unlocked players of ``first`` gets a
+    beam run without them, split across the shared process pool. Their squads
+    and ``extra_candidates`` are then taken by total value, ties by ids,
+    whenever they add a player not yet used by a better solution.
+    """
+    player_by_id = {player['id']: player for player in pool if isinstance(player.get('id'), int)}
+    dropped = sorted((player['id'] for player in first if player['id'] not in locked_ids), key=lambda player_id: (-values.get(player_id, 0), player_id))
+    shared = ([{field: player[field] for field in _SQUAD_FIELDS if field in player} for player in player_by_id.values()],
+              {player_id: values.get(player_id, 0) for player_id in player_by_id}, budget, frozenset(locked_ids), frozenset(excluded_ids), count)
+    candidates = {tuple(sorted(ids)) for part in run_parts(_alternative_shard, shared, dropped[:count], count, PARALLEL_MIN_ALTERNATIVES)
+                  for ids in part}
+    candidates.update(tuple(sorted(player['id'] for player in squad)) for squad in extra_candidates)
+    chosen, covered = [], {player['id'] for player in first}
+    for ids in sorted(candidates, key=lambda ids: (-round(sum(values.get(player_id, 0) for player_id in ids), 3), ids)):
+        if len(chosen) == count:
+            break
+        if set(ids) - covered:
+            chosen.append([player_by_id[player_id] for player_id in ids])
+            covered.update(ids)
+    return chosen
+
+
+@timed('service')
 def optimize_squad(players: Iterable[Mapping[str, Any]], projection_values, gameweeks: List[int], budget_tenths: int,
-                   locked_player_ids=None, excluded_player_ids=None, alternative_count=0):
+                   locked_player_ids=None, excluded_player_ids=None, alternative_count=0, mode='beam',
+                   time_limit_ms=DEFAULT_TIME_LIMIT_MS):
+    """Build the best squad for ``gameweeks`` with either the bounded beam or the exact solver.
+
+    ``exact`` mode proves its squad optimal when the search finishes within
+    ``time_limit_ms`` and otherwise reports the remaining optimality gap; if it
+    finds no squad in time, the beam is used as a fallback. Alternatives always
+    come from beam searches, each with a player outside every solution
+    ranked before it.
+    """
     if not isinstance(budget_tenths, int) or budget_tenths < 0:
         return {'status': 'invalid_input', 'warnings': ['budget_tenths must be a non-negative integer.']}
+    if mode not in OPTIMIZER_MODES:
+        return {'status': 'invalid_input', 'warnings': [f"mode must be one of: {', '.join(OPTIMIZER_MODES)}."]}
+    if isinstance(time_limit_ms, bool) or not isinstance(time_limit_ms, int) or time_limit_ms <= 0:
+        return {'status': 'invalid_input', 'warnings': ['time_limit_ms must be a positive integer.']}
     locks, exclusions = set(locked_player_ids or []), set(excluded_player_ids or [])
+    alternative_count = max(0, alternative_count)
     pool = list(players)
     values = {player.get('id'): round(sum(projection_values.get((player.get('id'), gameweek), 0) for gameweek in gameweeks), 3) for player in pool}
-    squad, warnings = _build_squad(pool, values, budget_tenths, locks, exclusions)
+    solver = {'mode': mode, 'proven_optimal': False, 'optimality_gap': None, 'upper_bound': None, 'nodes': 0, 'elapsed_seconds': 0.0}
+    status, optimizer_warnings, beam_squads = 'feasible', [BEAM_WARNING], []
+    if mode == 'exact':
+        player_by_id = {player['id']: player for player in pool if isinstance(player.get('id'), int)}
+        squad, warnings = _locked_players(player_by_id, budget_tenths, locks, exclusions, get_ruleset())
+        if squad is not None:
+            squad, exact = _exact_squad(pool, values, budget_tenths, locks, exclusions, time_limit_ms)
+            solver.update({'proven_optimal': exact.proven_optimal, 'optimality_gap': exact.optimality_gap, 'upper_bound': exact.upper_bound,
+                           'nodes': exact.nodes, 'elapsed_seconds': exact.elapsed_seconds})
+            if squad:
+                status = 'optimal' if exact.proven_optimal else 'feasible'
+                optimizer_warnings = [] if exact.proven_optimal else ['Exact optimizer reached its time limit; solution is feasible within the reported optimality gap.']
+            elif exact.proven_optimal:
+                warnings = ['No legal squad can be constructed within the budget and constraints.']
+            else:
+                beam_squads, warnings = _beam_squads(pool, values, budget_tenths, locks, exclusions, alternative_count + 1)
+                squad = beam_squads[0] if beam_squads else None
+                optimizer_warnings.append('Exact optimizer found no squad within its time limit; the bounded beam was used instead.')
+                if not squad:
+                    return {'status': 'timeout', 'warnings': sorted(set(warnings + optimizer_warnings)), 'solutions': [], 'solver': solver}
+    else:
+        beam_squads, warnings = _beam_squads(pool, values, budget_tenths, locks, exclusions, alternative_count + 1)
+        squad = beam_squads[0] if beam_squads else None
     if not squad:
-        return {'status': 'infeasible', 'warnings': warnings, 'solutions': []}
+        return {'status': 'infeasible', 'warnings': warnings, 'solutions': [], 'solver': solver}
+    squads = [squad]
+    if alternative_count:
+        squads.extend(_alternatives(pool, values, budget_tenths, locks, exclusions, squad, alternative_count, beam_squads[1:]))
+        if len(squads) <= alternative_count:
+            warnings.append('No legal squad remains after applying the requested diversity constraint.')
+        if mode == 'exact' and len(squads) > 1:
+            optimizer_warnings.append('Alternative solutions come from the bounded-beam optimizer and are not proven optimal.')
     solutions = []
-    for rank in range(1, max(0, alternative_count) + 2):
-        if rank > 1:
-            squad, alternative_warning = _build_squad(pool, values, budget_tenths, locks, exclusions, {player['id'] for player in solutions[0]['squad']})
-            if not squad:
-                if alternative_warning:
-                    warnings.extend(alternative_warning)
-                break
+    for rank, squad in enumerate(squads, 1):
         lineup = _best_lineup(squad, values)
         solutions.append({'rank': rank, 'squad': [{'player_id': player['id'], 'price_tenths': player['now_cost']} for player in squad],
                           'projected_points': lineup['projected_points'], 'remaining_bank_tenths': budget_tenths - sum(player['now_cost'] for player in squad),
                           'lineup': lineup, 'validation_status': 'valid'})
-    return {'status': 'feasible', 'warnings': sorted(set(warnings + ['Bounded-beam optimizer; solution is feasible but not proven optimal.'])), 'solutions': solutions}
+    return {'status': status, 'warnings': sorted(set(warnings + optimizer_warnings)), 'solutions': solutions, 'solver': solver}
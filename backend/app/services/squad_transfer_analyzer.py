@@ -1,19 +1,22 @@
 """Service for suggesting squad transfers based on current squad analysis"""
 from typing import Dict, List, Tuple, Optional
-from app.utils.fpl_api import FPLAPIClient
+from app.services.data_context import FPLDataContext
 from app.services.team_analyzer import TeamAnalyzer
 from app.services.recommendation_engine import RecommendationEngine
+from app.utils.instrumentation import timed_methods
 
+@timed_methods('service')
 class SquadTransferAnalyzer:
     """Analyzes current squad and suggests specific player swaps"""
     
-    def __init__(self, team_id: int):
+    def __init__(self, team_id: int, context: Optional[FPLDataContext] = None):
         self.team_id = team_id
-        self.analyzer = TeamAnalyzer(team_id)
-        self.engine = RecommendationEngine(team_id)
+        self.analyzer = TeamAnalyzer(team_id, context)
+        self.engine = RecommendationEngine(team_id, analyzer=self.analyzer)
         self.bootstrap = self.analyzer.bootstrap
         self.current_squad = self.analyzer.get_current_squad()
         self.all_players = self.bootstrap['elements']
+        self.index = self.analyzer.index
         
     def get_squad_overview(self) -> Dict:
         """Get detailed squad overview with performance metrics and photos"""
@@ -208,14 +211,11 @@ class SquadTransferAnalyzer:
         """Find replacement players at a position within price range"""
         candidates = []
         
-        for player in self.all_players:
+        for player in self.index.players_by_position.get(position, []):
             player_id = player['id']
             if player_id in exclude_ids:
                 continue
             
-            if self._get_position_name(player.get('element_type', 0)) != position:
-                continue
-            
             price = (player.get('now_cost', 0) or 0) / 10
             if price > max_price:
                 continue
@@ -263,10 +263,7 @@ class SquadTransferAnalyzer:
     
     def _get_player_full_data(self, player_id: int) -> Dict:
         """Get full player data from bootstrap"""
-        for player in self.all_players:
-            if player['id'] == player_id:
-                return player
-        return {}
+        return self.index.player(player_id)
     
     def _generate_underperformance_reason(
         self, 
@@ -308,10 +305,7 @@ class SquadTransferAnalyzer:
         """Get team name from ID"""
         if not team_id:
             return 'Unknown'
-        for team in self.bootstrap['teams']:
-            if team['id'] == team_id:
-                return team['short_name']
-        return 'Unknown'
+        return self.index.team_short_name(team_id)
     
     def _rate_performance(self, player_info: Dict, price: float) -> str:
         """Rate player performance as Excellent, Good, Average, Poor"""
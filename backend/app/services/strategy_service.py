@@ -1,7 +1,7 @@
 """Phase 4 strategy state: remaining chips and actionable squad alerts."""
 
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, Mapping
+from typing import Any, Dict, Iterable, Mapping, Union
 
 
 CHIPS = {'wildcard': 'Wildcard', 'freehit': 'Free Hit', 'bboost': 'Bench Boost', '3xc': 'Triple Captain'}
@@ -14,7 +14,7 @@ def strategy_state(used_chips):
     ]}
 
 
-def squad_alerts(team: Mapping[str, Any], snapshot: Mapping[str, Any], picks: Iterable[Mapping[str, Any]], players: Iterable[Mapping[str, Any]], now=None):
+def squad_alerts(team: Mapping[str, Any], snapshot: Mapping[str, Any], picks: Iterable[Mapping[str, Any]], players: Union[Iterable[Mapping[str, Any]], Mapping[int, Mapping[str, Any]]], now=None):
     now = now or datetime.now(timezone.utc)
     alerts = []
     if team.get('refresh_status') == 'failed':
@@ -26,9 +26,14 @@ def squad_alerts(team: Mapping[str, Any], snapshot: Mapping[str, Any], picks: It
             alerts.append({'type': 'stale_squad', 'severity': 'warning', 'message': f'Squad data is {round(age_hours)} hours old; refresh before planning.'})
     except (TypeError, ValueError):
         alerts.append({'type': 'freshness_unknown', 'severity': 'info', 'message': 'Squad freshness is unknown.'})
-    owned_ids = {pick['fpl_player_id'] for pick in picks}
-    for player in players:
-        if player.get('id') in owned_ids and player.get('status') != 'a':
+    if isinstance(players, Mapping):
+        # An id -> player index (see BootstrapIndex.players) avoids scanning every element.
+        owned = [players[pick['fpl_player_id']] for pick in picks if pick['fpl_player_id'] in players]
+    else:
+        owned_ids = {pick['fpl_player_id'] for pick in picks}
+        owned = [player for player in players if player.get('id') in owned_ids]
+    for player in owned:
+        if player.get('status') != 'a':
             news = player.get('news') or 'Availability is uncertain.'
             alerts.append({'type': 'player_unavailable', 'severity': 'warning', 'player_id': player['id'],
                            'message': f"{player.get('web_name', 'A squad player')} is unavailable: {news}"})
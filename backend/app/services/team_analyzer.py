@@ -1,19 +1,24 @@
 """Service for analyzing FPL teams"""
 from typing import Dict, List, Optional, Tuple
-from app.utils.fpl_api import FPLAPIClient
+from app.services.data_context import FPLDataContext
+from app.utils.instrumentation import timed_methods
 import json
 from datetime import datetime, timedelta
 
+@timed_methods('service')
 class TeamAnalyzer:
     """Analyzes FPL team data"""
     
-    def __init__(self, team_id: int):
+    def __init__(self, team_id: int, context: Optional[FPLDataContext] = None):
         self.team_id = team_id
-        self.current_gameweek = FPLAPIClient.get_current_gameweek()
-        self.bootstrap = FPLAPIClient.get_bootstrap_static()
-        self.team_data = FPLAPIClient.get_team_data(team_id)
-        self.team_picks = FPLAPIClient.get_team_picks(team_id, self.current_gameweek)
-        self.fixtures = FPLAPIClient.get_fixtures()
+        self.context = context or FPLDataContext()
+        self.current_gameweek = self.context.current_gameweek
+        self.bootstrap = self.context.bootstrap
+        self.team_data = self.context.entry(team_id)
+        self.team_picks = self.context.picks(team_id, self.current_gameweek)
+        self.fixtures = self.context.fixtures
+        self.index = self.context.bootstrap_index
+        self.fixture_index = self.context.fixture_index
         
     def get_team_summary(self) -> Dict:
         """Get team summary information"""
@@ -63,10 +68,7 @@ class TeamAnalyzer:
     
     def _get_player_info(self, player_id: int) -> Dict:
         """Get player information from bootstrap data"""
-        for player in self.bootstrap['elements']:
-            if player['id'] == player_id:
-                return player
-        return {}
+        return self.index.player(player_id)
     
     def _get_position_name(self, position_id: int) -> str:
         """Convert position ID to name"""
@@ -75,10 +77,7 @@ class TeamAnalyzer:
     
     def _get_team_name(self, team_id: int) -> str:
         """Get team name from ID"""
-        for team in self.bootstrap['teams']:
-            if team['id'] == team_id:
-                return team['short_name']
-        return 'Unknown'
+        return self.index.team_short_name(team_id)
     
     def analyze_squad_health(self) -> Dict:
         """Analyze squad form, fixtures, and potential issues"""
@@ -107,7 +106,7 @@ class TeamAnalyzer:
         team_id = self.team_data.get('favourite_team')
         
         upcoming = []
-        for fixture in self.fixtures:
+        for fixture in self.fixture_index.for_team(team_id):
             if fixture['event'] and fixture['event'] >= self.current_gameweek:
                 if fixture['team_a'] == team_id or fixture['team_h'] == team_id:
                     upcoming.append({
@@ -0,0 +1,70 @@
+"""Refresh many tracked teams at once: concurrent upstream fetches, batched snapshot writes."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Optional
+
+from app.services.tracked_team_store import TrackedTeamStore, current_snapshot_hash
+from app.utils.instrumentation import timed
+
+DEFAULT_REFRESH_WORKERS = 8
+
+
+@timed('service')
+def refresh_tracked_teams(store: TrackedTeamStore, client, season: str, team_ids: Optional[Iterable[int]] = None,
+                          max_workers: int = DEFAULT_REFRESH_WORKERS) -> Dict[str, Any]:
+    """Refresh ``team_ids`` (every tracked team when omitted) against the current gameweek.
+
+    The gameweek is looked up once for the whole batch. Entry and picks are
+    fetched for each team on up to ``max_workers`` threads; a team whose
+    current-gameweek record hashes to the stored ``source_payload_hash`` is
+    reported ``unchanged`` without fetching its history or rewriting its
+    snapshots. Changed teams are written with ``import_teams`` and failures
+    are recorded per team, so one bad team does not fail the batch.
+    """
+    started = time.perf_counter()
+    if team_ids is None:
+        team_ids = [team['fpl_team_id'] for team in store.list_teams()]
+    team_ids = list(dict.fromkeys(team_ids))
+    if any(not isinstance(team_id, int) or isinstance(team_id, bool) or team_id < 1 for team_id in team_ids):
+        raise ValueError('team_ids must be a list of positive integers.')
+    if not isinstance(max_workers, int) or isinstance(max_workers, bool) or max_workers < 1:
+        raise ValueError('max_workers must be a positive integer.')
+    gameweek = client.get_current_gameweek()
+    stored_hashes = store.current_snapshot_hashes(season, gameweek)
+
+    def fetch(team_id):
+        team, picks = client.get_team_data(team_id), client.get_team_picks(team_id, gameweek)
+        if stored_hashes.get(team_id) == current_snapshot_hash(team, picks):
+            return None
+        return team_id, team, picks, client.get_team_history(team_id)
+
+    imports, unchanged, failures = [], [], {}
+    if team_ids:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(team_ids))) as executor:
+            futures = {executor.submit(fetch, team_id): team_id for team_id in team_ids}
+            for future in as_completed(futures):
+                team_id = futures[future]
+                try:
+                    fetched = future.result()
+                except Exception as error:
+                    failures[team_id] = str(error)
+                    continue
+                if fetched is None:
+                    unchanged.append(team_id)
+                else:
+                    imports.append(fetched)
+    store.import_teams(season, gameweek, imports)
+    store.mark_refresh_unchanged(unchanged)
+    store.mark_refresh_failures(season, failures)
+
+    refreshed = {item[0] for item in imports}
+    teams = []
+    for team_id in team_ids:
+        if team_id in failures:
+            teams.append({'fpl_team_id': team_id, 'status': 'failed', 'error': failures[team_id]})
+        else:
+            teams.append({'fpl_team_id': team_id, 'status': 'refreshed' if team_id in refreshed else 'unchanged'})
+    return {'current_gameweek': gameweek, 'teams': teams,
+            'summary': {'refreshed': len(refreshed), 'unchanged': len(unchanged), 'failed': len(failures)},
+            'elapsed_seconds': round(time.perf_counter() - started, 3)}
@@ -2,31 +2,65 @@
 
 import hashlib
 import json
+import os
 import sqlite3
 import uuid
-from contextlib import contextmanager
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Mapping, Optional
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from app.utils.instrumentation import timed_methods
+from app.utils.sqlite_pool import get_pool
+
+# Projection rows are written in chunks of this size, inside one transaction.
+PROJECTION_CHUNK_SIZE = 5000
+# Retention keeps this many newest projection sets per season and model unless configured otherwise.
+DEFAULT_RETAINED_PROJECTION_SETS = 5
+# Incremental compaction frees at most this many pages per write transaction.
+COMPACTION_PAGES_PER_STEP = 256
+# Batch imports write this many teams per transaction.
+TEAM_IMPORT_BATCH_SIZE = 200
+_COUNTED_TABLES = ('tracked_teams', 'team_snapshots', 'squad_picks', 'projection_sets', 'player_projections', 'chip_usage',
+                   'league_members', 'league_picks')
+# The baseline model's components, stored as typed columns instead of JSON text.
+PROJECTION_COMPONENTS = ('official_form', 'availability', 'fdr_multiplier')
 
 
 def utcnow() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-@contextmanager
 def _connection(database_path: str):
-    connection = sqlite3.connect(database_path)
-    connection.row_factory = sqlite3.Row
-    try:
-        yield connection
-        connection.commit()
-    finally:
-        connection.close()
+    return get_pool(database_path).connection()
+
+
+# Rows are clustered by projection set, so reading or deleting one set touches contiguous pages.
+_PLAYER_PROJECTIONS_TABLE = """
+    CREATE TABLE {exists}player_projections (
+        projection_set_id TEXT NOT NULL REFERENCES projection_sets(id),
+        fpl_player_id INTEGER NOT NULL,
+        gameweek INTEGER NOT NULL,
+        expected_points REAL NOT NULL,
+        expected_minutes REAL NOT NULL,
+        appearance_probability REAL NOT NULL,
+        risk REAL NOT NULL,
+        fixture_count INTEGER NOT NULL,
+        official_form REAL,
+        availability REAL,
+        fdr_multiplier REAL,
+        PRIMARY KEY(projection_set_id, fpl_player_id, gameweek)
+    ) WITHOUT ROWID"""
 
 
 def initialize_database(database_path: str) -> None:
-    with _connection(database_path) as connection:
+    # Schema setup uses its own connection: pooled ones switch to WAL on open, after which auto_vacuum is fixed.
+    connection = sqlite3.connect(database_path)
+    connection.row_factory = sqlite3.Row
+    with closing(connection), connection:
+        # New files reclaim freed pages incrementally; older files switch over on their next full compaction.
         connection.executescript("""
+            PRAGMA auto_vacuum = INCREMENTAL;
             PRAGMA foreign_keys = ON;
             CREATE TABLE IF NOT EXISTS tracked_teams (
                 id INTEGER PRIMARY KEY,
@@ -82,25 +116,101 @@ def initialize_database(database_path: str) -> None:
                 status TEXT NOT NULL,
                 warnings_json TEXT NOT NULL DEFAULT '[]'
             );
-            CREATE TABLE IF NOT EXISTS player_projections (
-                projection_set_id TEXT NOT NULL REFERENCES projection_sets(id),
-                fpl_player_id INTEGER NOT NULL,
-                gameweek INTEGER NOT NULL,
-                expected_points REAL NOT NULL,
-                expected_minutes REAL NOT NULL,
-                appearance_probability REAL NOT NULL,
-                risk REAL NOT NULL,
-                fixture_count INTEGER NOT NULL,
-                components_json TEXT NOT NULL,
-                PRIMARY KEY(projection_set_id, fpl_player_id, gameweek)
-            );
+            {player_projections}
+            CREATE INDEX IF NOT EXISTS projection_sets_generated_at ON projection_sets(generated_at);
+            CREATE INDEX IF NOT EXISTS projection_sets_series ON projection_sets(season, model_version, generated_at);
             CREATE TABLE IF NOT EXISTS chip_usage (
                 tracked_team_id INTEGER NOT NULL REFERENCES tracked_teams(id),
                 chip_name TEXT NOT NULL,
                 gameweek INTEGER NOT NULL,
                 PRIMARY KEY(tracked_team_id, chip_name)
             );
-        """)
+            CREATE TABLE IF NOT EXISTS leagues (
+                fpl_league_id INTEGER PRIMARY KEY,
+                name TEXT,
+                season TEXT NOT NULL,
+                gameweek INTEGER NOT NULL,
+                member_count INTEGER NOT NULL,
+                truncated INTEGER NOT NULL DEFAULT 0,
+                last_refresh_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS league_members (
+                fpl_league_id INTEGER NOT NULL REFERENCES leagues(fpl_league_id) ON DELETE CASCADE,
+                fpl_team_id INTEGER NOT NULL,
+                team_name TEXT,
+                manager_name TEXT,
+                rank INTEGER,
+                total_points INTEGER,
+                gameweek_points INTEGER,
+                PRIMARY KEY(fpl_league_id, fpl_team_id)
+            ) WITHOUT ROWID;
+            -- Picks are kept per team rather than per league, so a rival in several leagues is fetched once.
+            CREATE TABLE IF NOT EXISTS league_picks (
+                fpl_team_id INTEGER NOT NULL,
+                season TEXT NOT NULL,
+                gameweek INTEGER NOT NULL,
+                fpl_player_id INTEGER NOT NULL,
+                squad_position INTEGER NOT NULL,
+                multiplier INTEGER NOT NULL,
+                PRIMARY KEY(fpl_team_id, season, gameweek, fpl_player_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS league_pick_sets (
+                fpl_team_id INTEGER NOT NULL,
+                season TEXT NOT NULL,
+                gameweek INTEGER NOT NULL,
+                active_chip TEXT,
+                fetched_at TEXT NOT NULL,
+                PRIMARY KEY(fpl_team_id, season, gameweek)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS background_jobs (
+                name TEXT PRIMARY KEY,
+                status TEXT NOT NULL DEFAULT 'idle',
+                last_started_at TEXT,
+                last_finished_at TEXT,
+                last_error TEXT,
+                result_json TEXT NOT NULL DEFAULT '{{}}',
+                next_run_at TEXT,
+                lease_owner TEXT,
+                lease_expires_at TEXT
+            );
+        """.format(player_projections=_PLAYER_PROJECTIONS_TABLE.format(exists='IF NOT EXISTS ') + ';'))
+        # WAL lets readers continue while a projection set is being written; the mode persists in the file.
+        connection.execute('PRAGMA journal_mode = WAL')
+        _migrate_player_projections(connection)
+
+
+_PROJECTION_COLUMNS = ('projection_set_id', 'fpl_player_id', 'gameweek', 'expected_points', 'expected_minutes',
+                       'appearance_probability', 'risk', 'fixture_count') + PROJECTION_COMPONENTS
+_INSERT_PROJECTION = (f"INSERT INTO player_projections ({', '.join(_PROJECTION_COLUMNS)}) "
+                      f"VALUES ({', '.join('?' for _ in _PROJECTION_COLUMNS)})")
+
+
+def _migrate_player_projections(connection) -> None:
+    """Rebuild ``player_projections`` from older layouts: per-row JSON components or a rowid table."""
+    table = connection.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'player_projections'").fetchone()
+    columns = {row['name'] for row in connection.execute('PRAGMA table_info(player_projections)')}
+    if 'components_json' not in columns and 'WITHOUT ROWID' in table['sql'].upper():
+        return
+    connection.execute('BEGIN')
+    connection.execute('ALTER TABLE player_projections RENAME TO player_projections_previous')
+    connection.execute(_PLAYER_PROJECTIONS_TABLE.format(exists=''))
+    if 'components_json' not in columns:
+        connection.execute(f"INSERT INTO player_projections ({', '.join(_PROJECTION_COLUMNS)}) "
+                           f"SELECT {', '.join(_PROJECTION_COLUMNS)} FROM player_projections_previous")
+    else:
+        rows = connection.execute('SELECT * FROM player_projections_previous')
+        while True:
+            chunk = rows.fetchmany(PROJECTION_CHUNK_SIZE)
+            if not chunk:
+                break
+            connection.executemany(_INSERT_PROJECTION, [(row['projection_set_id'],) + _projection_row(row, json.loads(row['components_json']))
+                                                        for row in chunk])
+    connection.execute('DROP TABLE player_projections_previous')
+
+
+def _projection_row(item: Mapping[str, Any], components: Mapping[str, Any]) -> tuple:
+    return (item['fpl_player_id'], item['gameweek'], item['expected_points'], item['expected_minutes'], item['appearance_probability'],
+            item['risk'], item['fixture_count']) + tuple(components.get(name) for name in PROJECTION_COMPONENTS)
 
 
 def _payload_hash(payload: Mapping[str, Any]) -> str:
@@ -108,6 +218,44 @@ def _payload_hash(payload: Mapping[str, Any]) -> str:
     return hashlib.sha256(canonical.encode()).hexdigest()
 
 
+def current_snapshot_record(team: Mapping[str, Any], picks_payload: Mapping[str, Any]) -> Dict[str, Any]:
+    """The current-gameweek snapshot record built from the entry and picks payloads."""
+    record = dict(picks_payload.get('entry_history') or {})
+    record.update({
+        'overall_points': team.get('summary_overall_points'),
+        'overall_rank': team.get('summary_overall_rank'),
+        'transfers_available': team.get('transfers_available'),
+    })
+    return record
+
+
+def current_snapshot_hash(team: Mapping[str, Any], picks_payload: Mapping[str, Any]) -> str:
+    """``source_payload_hash`` an import of these payloads stores for the current gameweek."""
+    return _payload_hash(current_snapshot_record(team, picks_payload))
+
+
+_UPSERT_SNAPSHOT = """
+    INSERT INTO team_snapshots (tracked_team_id, season, gameweek, as_of, overall_points, overall_rank, gameweek_points,
+        bank_tenths, team_value_tenths, free_transfers, gameweek_transfer_count, gameweek_transfer_cost, active_chip,
+        source_payload_hash, import_status, warnings_json, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(tracked_team_id, season, gameweek) DO UPDATE SET as_of=excluded.as_of,
+        overall_points=excluded.overall_points, overall_rank=excluded.overall_rank, gameweek_points=excluded.gameweek_points,
+        bank_tenths=excluded.bank_tenths, team_value_tenths=excluded.team_value_tenths, free_transfers=excluded.free_transfers,
+        gameweek_transfer_count=excluded.gameweek_transfer_count, gameweek_transfer_cost=excluded.gameweek_transfer_cost,
+        active_chip=excluded.active_chip, source_payload_hash=excluded.source_payload_hash,
+        import_status=excluded.import_status, warnings_json=excluded.warnings_json, updated_at=excluded.updated_at
+"""
+
+
+def _snapshot_row(team_id, season, gameweek, record, observed_at, status, warnings) -> tuple:
+    return (team_id, season, gameweek, observed_at, record.get('total_points', record.get('overall_points')),
+            record.get('overall_rank'), record.get('points'), record.get('bank'), record.get('value'),
+            record.get('transfers_available'), record.get('event_transfers'), record.get('event_transfers_cost'),
+            record.get('active_chip'), _payload_hash(record), status, json.dumps(warnings), observed_at, observed_at)
+
+
+@timed_methods('db')
 class TrackedTeamStore:
     def __init__(self, database_path: str):
         self.database_path = database_path
@@ -178,19 +326,25 @@ class TrackedTeamStore:
             )]
         return {'team': self._team(team), 'snapshot': self._snapshot(snapshot), 'picks': picks}
 
-    def save_projection_set(self, season: str, gameweeks: List[int], projections: List[Mapping[str, Any]], warnings: List[str]) -> Dict[str, Any]:
+    def save_projection_set(self, season: str, gameweeks: List[int], projections: Iterable[Mapping[str, Any]], warnings: List[str],
+                            chunk_size: int = PROJECTION_CHUNK_SIZE) -> Dict[str, Any]:
+        """Stream projection rows into a new set, ``chunk_size`` rows at a time, in a single transaction.
+
+        ``projections`` may be a generator; only one chunk is held in memory.
+        A failure part-way leaves no partial set behind.
+        """
         projection_set_id, now = str(uuid.uuid4()), utcnow()
+        rows = iter(projections)
         with _connection(self.database_path) as connection:
             connection.execute("""
                 INSERT INTO projection_sets (id, season, generated_at, model_version, gameweeks_json, status, warnings_json)
                 VALUES (?, ?, ?, 'baseline-0.1', ?, 'complete', ?)
             """, (projection_set_id, season, now, json.dumps(gameweeks), json.dumps(warnings)))
-            connection.executemany("""
-                INSERT INTO player_projections (projection_set_id, fpl_player_id, gameweek, expected_points, expected_minutes,
-                    appearance_probability, risk, fixture_count, components_json)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, [(projection_set_id, item['fpl_player_id'], item['gameweek'], item['expected_points'], item['expected_minutes'],
-                     item['appearance_probability'], item['risk'], item['fixture_count'], json.dumps(item['components'])) for item in projections])
+            while True:
+                chunk = [(projection_set_id,) + _projection_row(item, item['components']) for item in islice(rows, chunk_size)]
+                if not chunk:
+                    break
+                connection.executemany(_INSERT_PROJECTION, chunk)
         return self.get_projection_set(projection_set_id)
 
     def get_projection_set(self, projection_set_id: str) -> Optional[Dict[str, Any]]:
@@ -203,11 +357,111 @@ class TrackedTeamStore:
             row = connection.execute('SELECT * FROM projection_sets ORDER BY generated_at DESC LIMIT 1').fetchone()
         return self._projection_set(row) if row else None
 
+    def projection_value_rows(self, projection_set_id: str) -> List[tuple]:
+        """``(player_id, gameweek, expected_points)`` tuples of one set, in key order."""
+        with _connection(self.database_path) as connection:
+            # Pooled connections are shared across calls, so plain tuples are asked for on the cursor only.
+            cursor = connection.cursor()
+            cursor.row_factory = None
+            return cursor.execute('SELECT fpl_player_id, gameweek, expected_points FROM player_projections WHERE projection_set_id = ? '
+                                  'ORDER BY fpl_player_id, gameweek', (projection_set_id,)).fetchall()
+
     def projection_values(self, projection_set_id: str) -> Dict[tuple, float]:
         with _connection(self.database_path) as connection:
             rows = connection.execute("SELECT fpl_player_id, gameweek, expected_points FROM player_projections WHERE projection_set_id = ?", (projection_set_id,)).fetchall()
         return {(row['fpl_player_id'], row['gameweek']): row['expected_points'] for row in rows}
 
+    def projections(self, projection_set_id: str) -> List[Dict[str, Any]]:
+        """Stored rows of one projection set with their components, by player and gameweek."""
+        with _connection(self.database_path) as connection:
+            rows = connection.execute(f"SELECT {', '.join(_PROJECTION_COLUMNS[1:])} FROM player_projections WHERE projection_set_id = ? "
+                                      "ORDER BY fpl_player_id, gameweek", (projection_set_id,)).fetchall()
+        result = []
+        for row in rows:
+            item = {name: row[name] for name in _PROJECTION_COLUMNS[1:8]}
+            item['components'] = {name: row[name] for name in PROJECTION_COMPONENTS}
+            result.append(item)
+        return result
+
+    def prune_projection_sets(self, keep_latest: int = DEFAULT_RETAINED_PROJECTION_SETS, keep_days: Optional[int] = None,
+                              now: Optional[datetime] = None) -> Dict[str, int]:
+        """Delete projection sets outside the retention policy, per season and model version.
+
+        A set is kept when it is one of the ``keep_latest`` newest sets of its
+        series or, if ``keep_days`` is given, was generated within that many
+        days. The newest set of each series is always kept.
+        """
+        if not isinstance(keep_latest, int) or keep_latest < 1:
+            raise ValueError('keep_latest must be a positive integer.')
+        if keep_days is not None and (not isinstance(keep_days, int) or keep_days < 0):
+            raise ValueError('keep_days must be a non-negative integer.')
+        cutoff = ((now or datetime.now(timezone.utc)) - timedelta(days=keep_days)).isoformat() if keep_days is not None else None
+        with _connection(self.database_path) as connection:
+            rows = connection.execute("""
+                SELECT id, season, model_version, generated_at FROM projection_sets
+                ORDER BY season, model_version, generated_at DESC, id DESC
+            """).fetchall()
+            expired, position, series = [], 0, None
+            for row in rows:
+                position = position + 1 if (row['season'], row['model_version']) == series else 1
+                series = (row['season'], row['model_version'])
+                if position > keep_latest and (cutoff is None or row['generated_at'] < cutoff):
+                    expired.append(row['id'])
+            deleted_rows = 0
+            for start in range(0, len(expired), 500):
+                chunk = expired[start:start + 500]
+                placeholders = ', '.join('?' for _ in chunk)
+                deleted_rows += connection.execute(f'DELETE FROM player_projections WHERE projection_set_id IN ({placeholders})', chunk).rowcount
+                connection.execute(f'DELETE FROM projection_sets WHERE id IN ({placeholders})', chunk)
+        return {'deleted_sets': len(expired), 'deleted_rows': deleted_rows}
+
+    def compact(self, full: bool = False, busy_timeout_ms: int = 5000) -> Dict[str, Any]:
+        """Return free pages to the file system without blocking other connections for long.
+
+        Incremental auto-vacuum files are shrunk ``COMPACTION_PAGES_PER_STEP``
+        pages per transaction, so concurrent readers and writers only wait for
+        one short step. ``full`` (or a file created before incremental
+        auto-vacuum) runs ``VACUUM``, which rewrites the whole file and also
+        switches it to incremental mode. The WAL is checkpointed and truncated
+        afterwards.
+        """
+        before = self.storage_stats()['database']
+        connection = sqlite3.connect(self.database_path, isolation_level=None)
+        try:
+            connection.execute(f'PRAGMA busy_timeout = {int(busy_timeout_ms)}')
+            incremental = connection.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+            if full or not incremental:
+                connection.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                connection.execute('VACUUM')
+            else:
+                while connection.execute('PRAGMA freelist_count').fetchone()[0]:
+                    connection.execute(f'PRAGMA incremental_vacuum({COMPACTION_PAGES_PER_STEP})').fetchall()
+            connection.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+        finally:
+            connection.close()
+        after = self.storage_stats()['database']
+        return {'mode': 'full' if full or not incremental else 'incremental', 'before': before, 'after': after,
+                'reclaimed_bytes': before['file_bytes'] + before['wal_bytes'] - after['file_bytes'] - after['wal_bytes']}
+
+    def storage_stats(self) -> Dict[str, Any]:
+        """File, page and row counts for the database, plus projection sets per season and model."""
+        with _connection(self.database_path) as connection:
+            page_size = connection.execute('PRAGMA page_size').fetchone()[0]
+            page_count = connection.execute('PRAGMA page_count').fetchone()[0]
+            free_pages = connection.execute('PRAGMA freelist_count').fetchone()[0]
+            auto_vacuum = connection.execute('PRAGMA auto_vacuum').fetchone()[0]
+            journal_mode = connection.execute('PRAGMA journal_mode').fetchone()[0]
+            rows = {table: connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in _COUNTED_TABLES}
+            series = [dict(row) for row in connection.execute("""
+                SELECT season, model_version, COUNT(*) AS sets, MIN(generated_at) AS oldest, MAX(generated_at) AS newest
+                FROM projection_sets GROUP BY season, model_version ORDER BY season, model_version
+            """)]
+        wal_path = self.database_path + '-wal'
+        return {'database': {'file_bytes': page_size * page_count, 'free_bytes': page_size * free_pages,
+                             'wal_bytes': os.path.getsize(wal_path) if os.path.exists(wal_path) else 0, 'page_size': page_size,
+                             'journal_mode': journal_mode, 'auto_vacuum': {0: 'none', 1: 'full', 2: 'incremental'}.get(auto_vacuum)},
+                'rows': rows, 'projection_series': series}
+
     def used_chips(self, fpl_team_id: int) -> Optional[List[Dict[str, Any]]]:
         with _connection(self.database_path) as connection:
             team = connection.execute('SELECT id FROM tracked_teams WHERE fpl_team_id = ?', (fpl_team_id,)).fetchone()
@@ -216,79 +470,231 @@ class TrackedTeamStore:
             rows = connection.execute('SELECT chip_name, gameweek FROM chip_usage WHERE tracked_team_id = ? ORDER BY gameweek', (team['id'],)).fetchall()
         return [dict(row) for row in rows]
 
+    def stale_team_ids(self, refreshed_before: str) -> List[int]:
+        """FPL ids of teams never refreshed successfully, or last refreshed before ``refreshed_before``."""
+        with _connection(self.database_path) as connection:
+            rows = connection.execute("""
+                SELECT fpl_team_id FROM tracked_teams WHERE last_successful_refresh_at IS NULL OR last_successful_refresh_at < ?
+                ORDER BY fpl_team_id
+            """, (refreshed_before,)).fetchall()
+        return [row['fpl_team_id'] for row in rows]
+
     def mark_refresh_failed(self, fpl_team_id: int, season: str, message: str) -> None:
+        self.mark_refresh_failures(season, {fpl_team_id: message})
+
+    def mark_refresh_failures(self, season: str, failures: Mapping[int, str]) -> None:
         now = utcnow()
         with _connection(self.database_path) as connection:
-            connection.execute("""
+            connection.executemany("""
                 INSERT INTO tracked_teams (fpl_team_id, season, created_at, last_refresh_at, refresh_status, refresh_error)
                 VALUES (?, ?, ?, ?, 'failed', ?)
                 ON CONFLICT(fpl_team_id) DO UPDATE SET last_refresh_at = excluded.last_refresh_at,
                     refresh_status = 'failed', refresh_error = excluded.refresh_error
-            """, (fpl_team_id, season, now, now, message))
+            """, [(fpl_team_id, season, now, now, message) for fpl_team_id, message in failures.items()])
+
+    def mark_refresh_unchanged(self, fpl_team_ids: Iterable[int]) -> None:
+        """Record a successful refresh for teams whose upstream payload matched the stored snapshot."""
+        now = utcnow()
+        with _connection(self.database_path) as connection:
+            connection.executemany("""
+                UPDATE tracked_teams SET last_refresh_at = ?, last_successful_refresh_at = ?, refresh_status = 'current', refresh_error = NULL
+                WHERE fpl_team_id = ?
+            """, [(now, now, fpl_team_id) for fpl_team_id in fpl_team_ids])
+
+    def current_snapshot_hashes(self, season: str, gameweek: int) -> Dict[int, str]:
+        """``source_payload_hash`` of each team's complete snapshot for one gameweek, by FPL team id."""
+        with _connection(self.database_path) as connection:
+            rows = connection.execute("""
+                SELECT t.fpl_team_id, s.source_payload_hash FROM team_snapshots s JOIN tracked_teams t ON t.id = s.tracked_team_id
+                WHERE s.season = ? AND s.gameweek = ? AND s.import_status = 'complete'
+            """, (season, gameweek)).fetchall()
+        return {row['fpl_team_id']: row['source_payload_hash'] for row in rows}
 
     def import_team(
         self, fpl_team_id: int, season: str, team: Mapping[str, Any], current_gameweek: int,
         picks_payload: Mapping[str, Any], history: Mapping[str, Any],
     ) -> Dict[str, Any]:
-        now = utcnow()
-        first, last = team.get('player_first_name'), team.get('player_last_name')
-        manager = ' '.join(part for part in (first, last) if part) or None
-        with _connection(self.database_path) as connection:
-            connection.execute("""
-                INSERT INTO tracked_teams (fpl_team_id, team_name, manager_name, season, created_at, last_refresh_at,
-                    last_successful_refresh_at, refresh_status, refresh_error)
-                VALUES (?, ?, ?, ?, ?, ?, ?, 'current', NULL)
-                ON CONFLICT(fpl_team_id) DO UPDATE SET team_name = excluded.team_name, manager_name = excluded.manager_name,
-                    season = excluded.season, last_refresh_at = excluded.last_refresh_at,
-                    last_successful_refresh_at = excluded.last_successful_refresh_at, refresh_status = 'current', refresh_error = NULL
-            """, (fpl_team_id, team.get('name'), manager, season, now, now, now))
-            tracked_id = connection.execute("SELECT id FROM tracked_teams WHERE fpl_team_id = ?", (fpl_team_id,)).fetchone()['id']
+        self.import_teams(season, current_gameweek, [(fpl_team_id, team, picks_payload, history)])
+        return self.get_team(fpl_team_id)
+
+    def import_teams(self, season: str, current_gameweek: int, imports: Iterable[tuple], batch_size: int = TEAM_IMPORT_BATCH_SIZE) -> None:
+        """Write ``(fpl_team_id, team, picks_payload, history)`` imports, ``batch_size`` teams per transaction.
+
+        Each batch upserts its teams, snapshots, chips and picks with one
+        ``executemany`` per statement. Earlier gameweeks from the history are
+        stored as partial snapshots; the current gameweek gets the picks.
+        """
+        imports = iter(imports)
+        while True:
+            batch = list(islice(imports, batch_size))
+            if not batch:
+                break
+            now = utcnow()
+            with _connection(self.database_path) as connection:
+                self._import_batch(connection, season, current_gameweek, batch, now)
+
+    def _import_batch(self, connection, season, current_gameweek, batch, now) -> None:
+        team_rows = []
+        for fpl_team_id, team, _, _ in batch:
+            first, last = team.get('player_first_name'), team.get('player_last_name')
+            manager = ' '.join(part for part in (first, last) if part) or None
+            team_rows.append((fpl_team_id, team.get('name'), manager, season, now, now, now))
+        connection.executemany("""
+            INSERT INTO tracked_teams (fpl_team_id, team_name, manager_name, season, created_at, last_refresh_at,
+                last_successful_refresh_at, refresh_status, refresh_error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'current', NULL)
+            ON CONFLICT(fpl_team_id) DO UPDATE SET team_name = excluded.team_name, manager_name = excluded.manager_name,
+                season = excluded.season, last_refresh_at = excluded.last_refresh_at,
+                last_successful_refresh_at = excluded.last_successful_refresh_at, refresh_status = 'current', refresh_error = NULL
+        """, team_rows)
+        fpl_team_ids = [item[0] for item in batch]
+        tracked_ids = {row['fpl_team_id']: row['id'] for row in connection.execute(
+            f"SELECT id, fpl_team_id FROM tracked_teams WHERE fpl_team_id IN ({', '.join('?' for _ in fpl_team_ids)})", fpl_team_ids)}
+        snapshot_rows, chip_rows = [], []
+        for fpl_team_id, team, picks_payload, history in batch:
+            tracked_id = tracked_ids[fpl_team_id]
             for record in history.get('current', []):
                 gameweek = record.get('event')
                 if isinstance(gameweek, int) and gameweek != current_gameweek:
-                    self._upsert_snapshot(connection, tracked_id, season, gameweek, record, now, 'partial', ['Historical picks were not imported.'])
+                    snapshot_rows.append(_snapshot_row(tracked_id, season, gameweek, record, now, 'partial', ['Historical picks were not imported.']))
             for chip in history.get('chips', []):
                 name, gameweek = chip.get('name'), chip.get('event')
                 if isinstance(name, str) and isinstance(gameweek, int):
-                    connection.execute('INSERT OR REPLACE INTO chip_usage (tracked_team_id, chip_name, gameweek) VALUES (?, ?, ?)',
-                                       (tracked_id, name, gameweek))
-            current_record = dict(picks_payload.get('entry_history') or {})
-            current_record.update({
-                'overall_points': team.get('summary_overall_points'),
-                'overall_rank': team.get('summary_overall_rank'),
-                'transfers_available': team.get('transfers_available'),
-            })
-            snapshot_id = self._upsert_snapshot(connection, tracked_id, season, current_gameweek, current_record, now, 'complete', [])
-            connection.execute("DELETE FROM squad_picks WHERE snapshot_id = ?", (snapshot_id,))
+                    chip_rows.append((tracked_id, name, gameweek))
+            snapshot_rows.append(_snapshot_row(tracked_id, season, current_gameweek, current_snapshot_record(team, picks_payload), now, 'complete', []))
+        connection.executemany(_UPSERT_SNAPSHOT, snapshot_rows)
+        connection.executemany('INSERT OR REPLACE INTO chip_usage (tracked_team_id, chip_name, gameweek) VALUES (?, ?, ?)', chip_rows)
+        snapshot_ids = {row['tracked_team_id']: row['id'] for row in connection.execute(
+            f"SELECT id, tracked_team_id FROM team_snapshots WHERE season = ? AND gameweek = ? "
+            f"AND tracked_team_id IN ({', '.join('?' for _ in tracked_ids)})", [season, current_gameweek, *tracked_ids.values()])}
+        connection.executemany("DELETE FROM squad_picks WHERE snapshot_id = ?", [(snapshot_id,) for snapshot_id in snapshot_ids.values()])
+        pick_rows = []
+        for fpl_team_id, _, picks_payload, _ in batch:
+            snapshot_id = snapshot_ids[tracked_ids[fpl_team_id]]
             for pick in picks_payload.get('picks', []):
                 if isinstance(pick.get('element'), int) and isinstance(pick.get('position'), int):
-                    connection.execute("""
-                        INSERT INTO squad_picks (snapshot_id, fpl_player_id, squad_position, multiplier, is_captain, is_vice_captain,
-                            purchase_price_tenths, selling_price_tenths)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (snapshot_id, pick['element'], pick['position'], pick.get('multiplier'), int(bool(pick.get('is_captain'))),
-                          int(bool(pick.get('is_vice_captain'))), pick.get('purchase_price'), pick.get('selling_price')))
-        return self.get_team(fpl_team_id)
+                    pick_rows.append((snapshot_id, pick['element'], pick['position'], pick.get('multiplier'), int(bool(pick.get('is_captain'))),
+                                      int(bool(pick.get('is_vice_captain'))), pick.get('purchase_price'), pick.get('selling_price')))
+        connection.executemany("""
+            INSERT INTO squad_picks (snapshot_id, fpl_player_id, squad_position, multiplier, is_captain, is_vice_captain,
+                purchase_price_tenths, selling_price_tenths)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, pick_rows)
+
+    def save_league(self, fpl_league_id: int, season: str, gameweek: int, name: Optional[str], members: List[Mapping[str, Any]],
+                    truncated: bool = False) -> None:
+        """Replace a league's standings with ``members`` (standings result rows) in one transaction."""
+        now = utcnow()
+        with _connection(self.database_path) as connection:
+            connection.execute("""
+                INSERT INTO leagues (fpl_league_id, name, season, gameweek, member_count, truncated, last_refresh_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(fpl_league_id) DO UPDATE SET name = excluded.name, season = excluded.season, gameweek = excluded.gameweek,
+                    member_count = excluded.member_count, truncated = excluded.truncated, last_refresh_at = excluded.last_refresh_at
+            """, (fpl_league_id, name, season, gameweek, len(members), int(truncated), now))
+            connection.execute('DELETE FROM league_members WHERE fpl_league_id = ?', (fpl_league_id,))
+            connection.executemany("""
+                INSERT INTO league_members (fpl_league_id, fpl_team_id, team_name, manager_name, rank, total_points, gameweek_points)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [(fpl_league_id, member['entry'], member.get('entry_name'), member.get('player_name'), member.get('rank'),
+                   member.get('total'), member.get('event_total')) for member in members])
+
+    def get_league(self, fpl_league_id: int) -> Optional[Dict[str, Any]]:
+        """A stored league with its members in rank order, or None if it was never refreshed."""
+        with _connection(self.database_path) as connection:
+            league = connection.execute('SELECT * FROM leagues WHERE fpl_league_id = ?', (fpl_league_id,)).fetchone()
+            if not league:
+                return None
+            members = [dict(row) for row in connection.execute("""
+                SELECT m.fpl_team_id, m.team_name, m.manager_name, m.rank, m.total_points, m.gameweek_points,
+                    p.fetched_at AS picks_fetched_at
+                FROM league_members m
+                LEFT JOIN league_pick_sets p ON p.fpl_team_id = m.fpl_team_id AND p.season = ? AND p.gameweek = ?
+                WHERE m.fpl_league_id = ? ORDER BY m.rank, m.fpl_team_id
+            """, (league['season'], league['gameweek'], fpl_league_id))]
+        value = dict(league)
+        value['truncated'] = bool(value['truncated'])
+        value['members'] = members
+        return value
+
+    def league_pick_team_ids(self, season: str, gameweek: int) -> set:
+        """FPL ids of the teams whose picks for one gameweek are stored."""
+        with _connection(self.database_path) as connection:
+            rows = connection.execute('SELECT fpl_team_id FROM league_pick_sets WHERE season = ? AND gameweek = ?',
+                                      (season, gameweek)).fetchall()
+        return {row['fpl_team_id'] for row in rows}
 
-    def _upsert_snapshot(self, connection, team_id, season, gameweek, record, observed_at, status, warnings):
-        payload_hash = _payload_hash(record)
-        values = (team_id, season, gameweek, observed_at, record.get('total_points', record.get('overall_points')),
-                  record.get('overall_rank'), record.get('points'), record.get('bank'), record.get('value'),
-                  record.get('transfers_available'), record.get('event_transfers'), record.get('event_transfers_cost'),
-                  record.get('active_chip'), payload_hash, status, json.dumps(warnings), observed_at, observed_at)
-        connection.execute("""
-            INSERT INTO team_snapshots (tracked_team_id, season, gameweek, as_of, overall_points, overall_rank, gameweek_points,
-                bank_tenths, team_value_tenths, free_transfers, gameweek_transfer_count, gameweek_transfer_cost, active_chip,
-                source_payload_hash, import_status, warnings_json, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(tracked_team_id, season, gameweek) DO UPDATE SET as_of=excluded.as_of,
-                overall_points=excluded.overall_points, overall_rank=excluded.overall_rank, gameweek_points=excluded.gameweek_points,
-                bank_tenths=excluded.bank_tenths, team_value_tenths=excluded.team_value_tenths, free_transfers=excluded.free_transfers,
-                gameweek_transfer_count=excluded.gameweek_transfer_count, gameweek_transfer_cost=excluded.gameweek_transfer_cost,
-                active_chip=excluded.active_chip, source_payload_hash=excluded.source_payload_hash,
-                import_status=excluded.import_status, warnings_json=excluded.warnings_json, updated_at=excluded.updated_at
-        """, values)
-        return connection.execute("SELECT id FROM team_snapshots WHERE tracked_team_id = ? AND season = ? AND gameweek = ?", (team_id, season, gameweek)).fetchone()['id']
+    def save_league_picks(self, season: str, gameweek: int, picks: Iterable[tuple], batch_size: int = TEAM_IMPORT_BATCH_SIZE) -> None:
+        """Write ``(fpl_team_id, picks_payload)`` pairs for one gameweek, ``batch_size`` teams per transaction."""
+        picks = iter(picks)
+        while True:
+            batch = list(islice(picks, batch_size))
+            if not batch:
+                break
+            now = utcnow()
+            pick_rows = [(fpl_team_id, season, gameweek, pick['element'], pick['position'], pick.get('multiplier') or 0)
+                         for fpl_team_id, payload in batch for pick in payload.get('picks', [])
+                         if isinstance(pick.get('element'), int) and isinstance(pick.get('position'), int)]
+            with _connection(self.database_path) as connection:
+                connection.executemany('DELETE FROM league_picks WHERE fpl_team_id = ? AND season = ? AND gameweek = ?',
+                                       [(fpl_team_id, season, gameweek) for fpl_team_id, _ in batch])
+                connection.executemany("""
+                    INSERT INTO league_picks (fpl_team_id, season, gameweek, fpl_player_id, squad_position, multiplier)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, pick_rows)
+                connection.executemany("""
+                    INSERT OR REPLACE INTO league_pick_sets (fpl_team_id, season, gameweek, active_chip, fetched_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [(fpl_team_id, season, gameweek, payload.get('active_chip'), now) for fpl_team_id, payload in batch])
+
+    def league_pick_rows(self, fpl_league_id: int, season: str, gameweek: int) -> List[tuple]:
+        """``(fpl_team_id, fpl_player_id, multiplier)`` tuples for every stored pick of the league's members."""
+        with _connection(self.database_path) as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = None
+            return cursor.execute("""
+                SELECT p.fpl_team_id, p.fpl_player_id, p.multiplier FROM league_members m
+                JOIN league_picks p ON p.fpl_team_id = m.fpl_team_id AND p.season = ? AND p.gameweek = ?
+                WHERE m.fpl_league_id = ? ORDER BY p.fpl_team_id, p.squad_position
+            """, (season, gameweek, fpl_league_id)).fetchall()
+
+    def acquire_job_lease(self, name: str, owner: str, ttl_seconds: float, now: Optional[datetime] = None) -> bool:
+        """Take or extend the lease on job ``name`` for ``owner``; False while another owner holds it."""
+        now = now or datetime.now(timezone.utc)
+        with _connection(self.database_path) as connection:
+            connection.execute('INSERT OR IGNORE INTO background_jobs (name) VALUES (?)', (name,))
+            cursor = connection.execute("""
+                UPDATE background_jobs SET lease_owner = ?, lease_expires_at = ?
+                WHERE name = ? AND (lease_owner IS NULL OR lease_owner = ? OR lease_expires_at < ?)
+            """, (owner, (now + timedelta(seconds=ttl_seconds)).isoformat(), name, owner, now.isoformat()))
+            return cursor.rowcount == 1
+
+    def release_job_lease(self, name: str, owner: str) -> None:
+        with _connection(self.database_path) as connection:
+            connection.execute('UPDATE background_jobs SET lease_owner = NULL, lease_expires_at = NULL WHERE name = ? AND lease_owner = ?',
+                               (name, owner))
+
+    def record_job(self, name: str, status: str, started_at: Optional[str] = None, finished_at: Optional[str] = None,
+                   error: Optional[str] = None, result: Optional[Mapping[str, Any]] = None, next_run_at: Optional[str] = None) -> None:
+        """Store the latest run of a background job; ``None`` fields keep their previous value."""
+        with _connection(self.database_path) as connection:
+            connection.execute('INSERT OR IGNORE INTO background_jobs (name) VALUES (?)', (name,))
+            connection.execute("""
+                UPDATE background_jobs SET status = ?, last_started_at = COALESCE(?, last_started_at),
+                    last_finished_at = COALESCE(?, last_finished_at), last_error = ?,
+                    result_json = COALESCE(?, result_json), next_run_at = COALESCE(?, next_run_at)
+                WHERE name = ?
+            """, (status, started_at, finished_at, error, None if result is None else json.dumps(result), next_run_at, name))
+
+    def background_jobs(self) -> List[Dict[str, Any]]:
+        with _connection(self.database_path) as connection:
+            rows = connection.execute('SELECT * FROM background_jobs ORDER BY name').fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job['result'] = json.loads(job.pop('result_json'))
+            jobs.append(job)
+        return jobs
 
     @staticmethod
     def _team(row):
@@ -1,9 +1,34 @@
-"""Deterministic one-transfer planner built on the shared legality validator."""
+"""Deterministic transfer planners built on the shared legality validator."""
 
-from collections import defaultdict
+import bisect
+import heapq
+import time
+from collections import Counter, defaultdict
+from itertools import islice, product
 from typing import Any, Dict, Iterable, List, Mapping
 
-from app.domain import get_ruleset, validate_transfer
+import numpy as np
+
+from app.domain import TransferLegality, get_ruleset
+from app.utils.instrumentation import timed
+from app.utils.process_pool import run_parts
+
+POSITIONS = ('GK', 'DEF', 'MID', 'FWD')
+DEFAULT_SHORTLIST_SIZE = 8
+# The cheapest players per position stay in the shortlist so that downgrades
+# which fund a later upgrade remain reachable.
+SHORTLIST_CHEAPEST = 2
+# So do the best players each owned player can be swapped for without freeing cash elsewhere.
+SHORTLIST_AFFORDABLE = 2
+MAX_PLANNED_TRANSFERS = 5
+DEFAULT_PLAN_COUNT = 4
+# Proving three or more transfers optimal over five gameweeks can take longer than a second on
+# full-size pools; past this the best plans found so far are returned as ``feasible``.
+DEFAULT_PLAN_TIME_LIMIT_MS = 800
+_CHECK_CLOCK_EVERY = 256
+_PROBE_BRANCHING = 3
+# Lineup points are rounded to 0.001 per gameweek, so bounds get that much slack.
+_BOUND_SLACK = 1e-3
 
 
 def _position(player):
@@ -34,8 +59,110 @@ def _best_lineup(players: Iterable[Mapping[str, Any]], values: Mapping[int, floa
     return best
 
 
+class _SwapLineups:
+    """``_best_lineup`` for one-for-one swaps out of a fixed squad, without regrouping it.
+
+    The squad stays grouped and sorted per position. A swap only rebuilds the
+    outgoing player's position list, placing the incoming player where the
+    stable sort of the replacement squad would, and formation sums reuse
+    running prefixes in ``_best_lineup`` summation order, so results match it
+    exactly.
+    """
+
+    def __init__(self, squad: List[Mapping[str, Any]], values: Mapping[int, float]):
+        self.values = values
+        self.slots = {player['id']: slot for slot, player in enumerate(squad)}
+        self.grouped = defaultdict(list)
+        for slot, player in enumerate(squad):
+            self.grouped[_position(player)].append((-values.get(player['id'], 0), slot, player['id']))
+        for entries in self.grouped.values():
+            entries.sort()
+
+    def swap(self, outgoing: Mapping[str, Any], incoming: Mapping[str, Any]):
+        position, slot = _position(outgoing), self.slots[outgoing['id']]
+        grouped = dict(self.grouped)
+        entries = [entry for entry in grouped.get(position, []) if entry[1] != slot]
+        bisect.insort(entries, (-self.values.get(incoming['id'], 0), slot, incoming['id']))
+        grouped[position] = entries
+        return _lineup_from_groups(grouped)
+
+
+def _lineup_from_groups(grouped):
+    """Build the ``_best_lineup`` result from ``(-value, slot, player_id)`` entries sorted per position."""
+    keepers, defenders, midfielders, forwards = (grouped.get(position, []) for position in POSITIONS)
+    if not keepers or len(defenders) < 3 or len(midfielders) < 2 or not forwards:
+        return None
+    # The best player of some position is always the first maximum of the eleven.
+    captain = min((keepers[0], defenders[0], midfielders[0], forwards[0]), key=lambda entry: entry[0])
+    best, best_points, best_score = None, None, None
+    after_defence = 0
+    after_defence -= keepers[0][0]
+    for used, entry in enumerate(defenders[:5], 1):
+        after_defence -= entry[0]
+        if used < 3:
+            continue
+        after_midfield = after_defence
+        for taken, entry in enumerate(midfielders[:5], 1):
+            after_midfield -= entry[0]
+            needed = 10 - used - taken
+            if taken < 2 or not 1 <= needed <= min(3, len(forwards)):
+                continue
+            score = after_midfield
+            for forward in forwards[:needed]:
+                score -= forward[0]
+            score -= captain[0]
+            if best_points is None or score > best_points:
+                best, best_points, best_score = (used, taken, needed), round(score, 3), score
+    if best is None:
+        return None
+    used, taken, needed = best
+    eleven = keepers[:1] + defenders[:used] + midfielders[:taken] + forwards[:needed]
+    return {'projected_points': round(best_score, 3), 'starter_ids': [entry[2] for entry in eleven], 'captain_id': captain[2]}
+
+
+# Fields of a player that one-for-one swap evaluation reads; workers get only these.
+_SWAP_FIELDS = ('id', 'element_type', 'position', 'team', 'club_id', 'now_cost', 'price_tenths')
+# One swap costs roughly a lineup rebuild, so about this many make a process pool worth its overhead.
+PARALLEL_MIN_SWAPS = 1500
+
+
+def _swap_fields(player):
+    return {field: player[field] for field in _SWAP_FIELDS if field in player}
+
+
+def _one_transfer_candidates(shared, outgoing_players):
+    """Improving-or-not candidates for swapping each of ``outgoing_players``, in input order.
+
+    Module-level and fed only plain data, so ``run_parts`` can evaluate slices
+    of the squad in worker processes.
+    """
+    owned, values, available, sale_prices, bank, baseline_points, hit_cost, gameweek, ruleset = shared
+    legality, lineups, candidates = TransferLegality(owned, ruleset), _SwapLineups(owned, values), []
+    for outgoing in outgoing_players:
+        sale_price = sale_prices[outgoing['id']]
+        for incoming in available.get(_position(outgoing), ()):
+            if not legality.allows(outgoing['id'], incoming, bank, sale_price):
+                continue
+            lineup = lineups.swap(outgoing, incoming)
+            if not lineup:
+                continue
+            gross_gain = round(lineup['projected_points'] - baseline_points, 3)
+            net_gain = round(gross_gain - hit_cost, 3)
+            candidates.append({'transfers': [{'gameweek': gameweek, 'out_player_id': outgoing['id'], 'in_player_id': incoming['id'],
+                                               'sell_price_tenths': sale_price, 'buy_price_tenths': incoming.get('now_cost')}],
+                               'projected_points': lineup['projected_points'], 'gross_gain': gross_gain, 'hit_cost': hit_cost,
+                               'net_gain': net_gain, 'lineup': lineup, 'remaining_bank_tenths': bank + sale_price - incoming['now_cost']})
+    return candidates
+
+
+@timed('service')
 def plan_one_transfer(snapshot: Mapping[str, Any], picks: List[Mapping[str, Any]], player_pool: List[Mapping[str, Any]], projection_values, gameweeks: List[int], overrides=None):
-    """Return the no-transfer baseline and all improving legal one-transfer plans."""
+    """Return the no-transfer baseline and all improving legal one-transfer plans.
+
+    Swaps are evaluated per outgoing player, on the shared process pool when
+    there are enough of them; the merged candidates are sorted exactly as an
+    in-process run would sort them.
+    """
     overrides = overrides or {}
     players = {player.get('id'): player for player in player_pool if isinstance(player.get('id'), int)}
     owned = []
@@ -54,25 +181,483 @@ def plan_one_transfer(snapshot: Mapping[str, Any], picks: List[Mapping[str, Any]
     if not baseline:
         return {'status': 'invalid_input', 'warnings': ['The tracked snapshot does not contain a legal squad.']}
     ruleset = get_ruleset()
-    owned_ids, candidates = {player['id'] for player in owned}, []
-    for outgoing in owned:
-        sale_price = overrides.get('selling_prices_tenths', {}).get(str(outgoing['id']), selling_prices[outgoing['id']])
-        for incoming in player_pool:
-            if incoming.get('id') in owned_ids or incoming.get('status') != 'a' or _position(incoming) != _position(outgoing):
-                continue
-            if not validate_transfer(owned, outgoing['id'], incoming, bank, ruleset, sale_price).valid:
-                continue
-            replacement = [incoming if player['id'] == outgoing['id'] else player for player in owned]
-            lineup = _best_lineup(replacement, values)
-            if not lineup:
-                continue
-            hit_cost = max(0, 1 - free_transfers) * ruleset.point_cost_per_extra_transfer
-            gross_gain = round(lineup['projected_points'] - baseline['projected_points'], 3)
-            net_gain = round(gross_gain - hit_cost, 3)
-            candidates.append({'transfers': [{'gameweek': gameweeks[0], 'out_player_id': outgoing['id'], 'in_player_id': incoming['id'],
-                                               'sell_price_tenths': sale_price, 'buy_price_tenths': incoming.get('now_cost')}],
-                               'projected_points': lineup['projected_points'], 'gross_gain': gross_gain, 'hit_cost': hit_cost,
-                               'net_gain': net_gain, 'lineup': lineup, 'remaining_bank_tenths': bank + sale_price - incoming['now_cost']})
+    owned_ids = {player['id'] for player in owned}
+    available = defaultdict(list)
+    for incoming in player_pool:
+        if incoming.get('id') not in owned_ids and incoming.get('status') == 'a':
+            available[_position(incoming)].append(incoming)
+    hit_cost = max(0, 1 - free_transfers) * ruleset.point_cost_per_extra_transfer
+    sale_prices = {player['id']: overrides.get('selling_prices_tenths', {}).get(str(player['id']), selling_prices[player['id']])
+                   for player in owned}
+    swaps = sum(len(available[_position(player)]) for player in owned)
+    if TransferLegality(owned, ruleset).clean:
+        # A valid squad is checked on ids, positions, clubs and prices only, so workers need no other fields.
+        owned, available = [_swap_fields(player) for player in owned], {position: [_swap_fields(player) for player in group]
+                                                                          for position, group in available.items()}
+        needed = {player['id'] for player in owned} | {player['id'] for group in available.values() for player in group}
+        values = {player_id: value for player_id, value in values.items() if player_id in needed}
+    else:
+        swaps = 0
+    shared = (owned, values, dict(available), sale_prices, bank, baseline['projected_points'], hit_cost, gameweeks[0], ruleset)
+    candidates = [candidate for part in run_parts(_one_transfer_candidates, shared, owned, swaps, PARALLEL_MIN_SWAPS) for candidate in part]
     candidates.sort(key=lambda candidate: (candidate['net_gain'], candidate['gross_gain']), reverse=True)
     return {'status': 'optimal', 'baseline': baseline, 'solutions': candidates,
             'warnings': ['Initial planner evaluates no-transfer and one-transfer plans only.']}
+
+
+def _formation_points(grouped):
+    """``_best_lineup`` points from per-position values sorted best first.
+
+    Every formation starts from one keeper, three defenders, two midfielders
+    and one forward; the other four places go to the best remaining outfield
+    players within the position maximums, so no formation loop is needed.
+    """
+    keepers, defenders, midfielders, forwards = grouped
+    if not keepers or len(defenders) < 3 or len(midfielders) < 2 or not forwards:
+        return float('-inf')
+    flexible = defenders[3:5] + midfielders[2:5] + forwards[1:3]
+    if len(flexible) < 4:
+        return float('-inf')
+    flexible.sort(reverse=True)
+    return (keepers[0] + defenders[0] + defenders[1] + defenders[2] + midfielders[0] + midfielders[1] + forwards[0]
+            + flexible[0] + flexible[1] + flexible[2] + flexible[3] + max(keepers[0], defenders[0], midfielders[0], forwards[0]))
+
+
+def _plan_rank(net, moves):
+    """Ranking key of a plan: higher net gain, then fewer moves, then the earliest moves in ``(gameweek, out, in)`` order."""
+    return net, -len(moves), tuple((-index, -out_id, -in_id) for index, out_id, in_id in moves)
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _roll_free_transfers(available: int, made: int, ruleset):
+    """Return the hit points for ``made`` transfers and the free transfers carried into the next gameweek."""
+    paid = max(0, made - available)
+    carried = min(ruleset.max_free_transfers, max(0, available - made) + ruleset.free_transfers_per_gameweek)
+    return paid * ruleset.point_cost_per_extra_transfer, carried
+
+
+def _transfer_shortlist(player_pool, owned, sale_prices, bank, excluded_ids, horizon_values, size):
+    """Incoming candidates in a deterministic order, and whether they are every eligible player.
+
+    With ``size`` None every eligible player is kept. Otherwise each position
+    keeps its ``size`` best projected and its cheapest players, plus the best
+    projected ones each owned player could be swapped for straight from its
+    sale price and the bank.
+    """
+    owned_ids = {player['id'] for player in owned}
+    by_position = defaultdict(list)
+    for player in player_pool:
+        player_id = player.get('id')
+        if (not isinstance(player_id, int) or player_id in owned_ids or player_id in excluded_ids or player.get('status') != 'a'
+                or _position(player) is None or not isinstance(player.get('now_cost'), int)):
+            continue
+        by_position[_position(player)].append(player)
+    eligible = sum(len(candidates) for candidates in by_position.values())
+    if size is None:
+        return [player['id'] for position in POSITIONS for player in by_position[position]], True
+    budgets = defaultdict(set)
+    for player in owned:
+        if isinstance(sale_prices.get(player['id']), int):
+            budgets[_position(player)].add(sale_prices[player['id']] + bank)
+    shortlist = []
+    for position in POSITIONS:
+        candidates = by_position[position]
+        by_value = sorted(candidates, key=lambda player: (-horizon_values[player['id']], player['now_cost'], player['id']))
+        cheapest = heapq.nsmallest(SHORTLIST_CHEAPEST, candidates,
+                                   key=lambda player: (player['now_cost'], -horizon_values[player['id']], player['id']))
+        affordable = [player for budget in sorted(budgets[position])
+                      for player in islice((player for player in by_value if player['now_cost'] <= budget), SHORTLIST_AFFORDABLE)]
+        shortlist.extend(dict.fromkeys(player['id'] for player in by_value[:size] + cheapest + affordable))
+    return shortlist, len(shortlist) == eligible
+
+
+class _HorizonSearch:
+    """Depth-first search over timed transfers with memoized lineups and an optimistic bound.
+
+    A plan is a sequence of ``(gameweek_index, out_id, in_id)`` moves in
+    non-decreasing gameweek order. Moves within one gameweek follow a
+    canonical order, most cash released first, so each set of moves is visited
+    once and its sequential bank check is the most permissive one.
+
+    The bound on a subtree adds, for every remaining gameweek, the best
+    marginal upgrades per position and the largest possible captain upgrade
+    to the current squad's lineup points. This never underestimates what
+    further transfers can add, so pruning does not change the ranked plans.
+    Ties are broken by ``_plan_rank``, so searches over disjoint sets of
+    first moves rank their union exactly as one search would.
+    """
+
+    def __init__(self, players, owned_ids, sale_prices, shortlist, projection_values, gameweeks, bank, free_transfers, ruleset,
+                 max_transfers, max_per_gameweek, max_hit_points, locked_ids, plan_count, deadline, clock):
+        self.players, self.sale_prices, self.ruleset = players, sale_prices, ruleset
+        self.owned_ids, self.shortlist, self.locked_ids = frozenset(owned_ids), shortlist, locked_ids
+        self.bank, self.free_transfers = bank, free_transfers
+        self.max_transfers, self.max_per_gameweek, self.max_hit_points = max_transfers, max_per_gameweek, max_hit_points
+        self.plan_count, self.clock = plan_count, clock
+        self.deadline = deadline
+        self.horizon = len(gameweeks)
+        ids = sorted(self.owned_ids | set(shortlist))
+        self.index = {player_id: position for position, player_id in enumerate(ids)}
+        self.values = np.array([[projection_values.get((player_id, gameweek), 0) for player_id in ids] for gameweek in gameweeks],
+                               dtype=float).reshape(self.horizon, len(ids))
+        self.value_maps = [dict(zip(ids, row.tolist())) for row in self.values]
+        codes = {position: code for code, position in enumerate(POSITIONS)}
+        self.code_of = {player_id: codes.get(_position(players[player_id]), -1) for player_id in ids}
+        self.position_code = np.array([self.code_of[player_id] for player_id in ids], dtype=int)
+        self.cost = np.array([players[player_id].get('now_cost') or 0 for player_id in ids], dtype=int)
+        incoming = np.array([self.index[player_id] for player_id in shortlist], dtype=int)
+        self.top_incoming = [[sorted(row[incoming[self.position_code[incoming] == code]].tolist(), reverse=True)[:max_transfers]
+                              for code in range(len(POSITIONS))] for row in self.values]
+        self.lineups: Dict[Any, Any] = {}
+        self.grouped: Dict[Any, Any] = {}
+        self.points: Dict[Any, float] = {}
+        self.hit_memo: Dict[Any, int] = {}
+        self.ceilings: Dict[Any, float] = {}
+        self.recorded = set()
+        self.branching = self.first_outgoing = None
+        self.plans: List[Any] = []
+        self.worst = float('-inf')
+        self.evaluations = 0
+        self.timed_out = False
+        self.squad = frozenset(self.owned_ids)
+        self.baseline = tuple(self._lineup_points(gameweek_index, self.squad) for gameweek_index in range(self.horizon))
+        self.baseline_points = round(sum(self.baseline), 3)
+
+    def lineup(self, gameweek_index, squad):
+        key = (gameweek_index, squad)
+        lineup = self.lineups.get(key)
+        if lineup is None:
+            lineup = self.lineups[key] = _best_lineup([self.players[player_id] for player_id in squad], self.value_maps[gameweek_index])
+        return lineup
+
+    def _group(self, gameweek_index, squad):
+        """Squad values per position, best first, for one gameweek."""
+        key = (gameweek_index, squad)
+        grouped = self.grouped.get(key)
+        if grouped is None:
+            values, grouped = self.value_maps[gameweek_index], [[] for _ in POSITIONS]
+            for player_id in squad:
+                grouped[self.code_of[player_id]].append(values[player_id])
+            for position_values in grouped:
+                position_values.sort(reverse=True)
+            self.grouped[key] = grouped
+        return grouped
+
+    def _lineup_points(self, gameweek_index, squad):
+        """``_best_lineup`` projected points without building the lineup."""
+        key = (gameweek_index, squad)
+        points = self.points.get(key)
+        if points is None:
+            points = self.points[key] = round(_formation_points(self._group(gameweek_index, squad)), 3)
+        return points
+
+    def _swap_points(self, gameweek_index, squad, child, out_id, in_id):
+        """``_lineup_points`` of ``child``, which is ``squad`` with ``out_id`` swapped for ``in_id``.
+
+        As in ``_SwapLineups``, only the outgoing player's position list is
+        rebuilt from the memoized grouping of ``squad``; the grouping is the
+        same sorted values a full regroup would give, so points are identical.
+        """
+        key = (gameweek_index, child)
+        points = self.points.get(key)
+        if points is None:
+            grouped = self.grouped.get(key)
+            if grouped is None:
+                values, code = self.value_maps[gameweek_index], self.code_of[out_id]
+                grouped = list(self._group(gameweek_index, squad))
+                position_values = list(grouped[code])
+                position_values.remove(values[out_id])
+                position_values.append(values[in_id])
+                position_values.sort(reverse=True)
+                grouped[code] = position_values
+                self.grouped[key] = grouped
+            points = self.points[key] = round(_formation_points(grouped), 3)
+        return points
+
+    def _ceiling(self, gameweek_index, squad, moves):
+        """Best lineup points reachable with ``moves`` swaps in one gameweek, ignoring money and club limits.
+
+        Each position may take its best ``k`` shortlisted players in place of
+        its weakest ``k`` owned ones, for every split of ``moves`` over
+        positions. Lineup points never fall when a position's values rise, so
+        only swaps that raise the value they replace are tried, and only
+        splits that use as many of those as ``moves`` allows.
+        """
+        key = (gameweek_index, squad, moves)
+        best = self.ceilings.get(key)
+        if best is not None:
+            return best
+        grouped, options = self._group(gameweek_index, squad), []
+        for current, incoming in zip(grouped, self.top_incoming[gameweek_index]):
+            useful = 0
+            while useful < min(moves, len(incoming), len(current)) and incoming[useful] > current[-1 - useful]:
+                useful += 1
+            options.append([sorted(incoming[:swaps] + current[:len(current) - swaps], reverse=True) if swaps else current
+                            for swaps in range(useful + 1)])
+        best, used = float('-inf'), min(moves, sum(len(position_options) - 1 for position_options in options))
+        for keepers, defenders, midfielders, forwards in product(*(range(len(position_options)) for position_options in options)):
+            if keepers + defenders + midfielders + forwards == used:
+                best = max(best, _formation_points((options[0][keepers], options[1][defenders], options[2][midfielders], options[3][forwards])))
+        self.ceilings[key] = best
+        return best
+
+    def sale_price(self, player_id):
+        # Players bought inside the plan sell for what they cost; prices are held fixed across the horizon.
+        return self.sale_prices.get(player_id) if player_id in self.owned_ids else self.players[player_id]['now_cost']
+
+    def hits(self, counts):
+        total = self.hit_memo.get(counts)
+        if total is None:
+            total, available = 0, self.free_transfers
+            for made in counts:
+                hit, available = _roll_free_transfers(available, made, self.ruleset)
+                total += hit
+            self.hit_memo[counts] = total
+        return total
+
+    def run(self, first_outgoing=None):
+        """Ranked ``(rank, moves)`` plans, best first; ``first_outgoing`` limits first moves to selling those players."""
+        self.first_outgoing = first_outgoing
+        try:
+            # A narrow pass first finds strong plans cheaply; the full pass then
+            # only has to prove nothing better exists.
+            for branching in (_PROBE_BRANCHING, None):
+                self.branching = branching
+                self._expand(0, None, self.squad, self.bank, (0,) * self.horizon, self.baseline, self.baseline_points, ())
+        except _Timeout:
+            self.timed_out = True
+        return sorted(self.plans, reverse=True)
+
+    def _open(self, bound):
+        """Whether a plan or subtree worth ``bound`` could still be ranked; elementwise for arrays."""
+        return (bound > self.baseline_points) & (bound >= self.worst)
+
+    def _record(self, net, moves):
+        if moves in self.recorded:
+            return
+        self.recorded.add(moves)
+        entry = (_plan_rank(net, moves), moves)
+        if len(self.plans) < self.plan_count:
+            heapq.heappush(self.plans, entry)
+        elif entry > self.plans[0]:
+            heapq.heapreplace(self.plans, entry)
+        if len(self.plans) == self.plan_count:
+            self.worst = self.plans[0][0][0]
+
+    def _extendable(self, start, squad, points, net, parent_ceiling, moves):
+        """Whether ``squad``, reached by a move in gameweek ``start``, could still lead to a ranked plan with ``moves`` more.
+
+        The parent's ceilings, computed with one move more, bound the
+        squad's own from above, so gameweeks are tightened one at a time and
+        the check stops as soon as the bound closes; most squads are pruned
+        before all their ceilings are computed.
+        """
+        horizon = self.horizon
+        bound = net + sum(parent_ceiling[index] - points[index] for index in range(start, horizon)) + _BOUND_SLACK * horizon
+        for index in range(start, horizon):
+            if not self._open(bound):
+                return False
+            bound += self._ceiling(index, squad, moves) - parent_ceiling[index]
+        return self._open(bound)
+
+    def _expand(self, start, last_key, squad, bank, counts, points, net, moves):
+        remaining = self.max_transfers - len(moves)
+        if not remaining:
+            return
+        horizon = self.horizon
+        hits = [self.hits(counts[:index] + (counts[index] + 1,) + counts[index + 1:]) for index in range(horizon)]
+        allowed = [index >= start and counts[index] < self.max_per_gameweek and (self.max_hit_points is None or hits[index] <= self.max_hit_points)
+                   for index in range(horizon)]
+        ceiling = [self._ceiling(index, squad, remaining) if index >= start else 0.0 for index in range(horizon)]
+        before = [sum(points[:index]) for index in range(horizon)]
+        reachable = [before[index] + sum(ceiling[index:]) - hits[index] + _BOUND_SLACK * horizon for index in range(horizon)]
+        incoming_ids = [player_id for player_id in self.shortlist if player_id not in squad]
+        if not incoming_ids or not any(allow and self._open(bound) for allow, bound in zip(allowed, reachable)):
+            return
+
+        ordered = sorted(squad)
+        outs = np.array([self.index[player_id] for player_id in ordered], dtype=int)
+        ins = np.array([self.index[player_id] for player_id in incoming_ids], dtype=int)
+        outgoing, incoming = self.values[:, outs][:, :, None], self.values[:, ins][:, None, :]
+        # One swap gains at most the value difference, plus the captaincy if the
+        # new player outscores everyone who could still be captain.
+        sixth = np.sort(self.values[:, outs], axis=1)[:, -6][:, None, None]
+        single = np.maximum(0.0, incoming - outgoing + np.maximum(0.0, incoming - np.maximum(outgoing, sixth)))
+        single += np.array(points)[:, None, None]
+        if remaining == 1:
+            single = np.minimum(single, np.array(ceiling)[:, None, None])
+        single = np.cumsum(single[::-1], axis=0)[::-1] + (np.array(before) - hits)[:, None, None] + _BOUND_SLACK * horizon
+        optimistic = single if remaining == 1 else np.broadcast_to(np.array(reachable)[:, None, None], single.shape)
+        # Moves are validated in order, so each one must be affordable from the bank it finds.
+        sale = np.array([self.sale_price(player_id) if player_id not in self.locked_ids and isinstance(self.sale_price(player_id), int) else -10 ** 6
+                         for player_id in ordered])
+        pairs = (self.position_code[outs][:, None] == self.position_code[ins][None, :]) & (self.cost[ins][None, :] <= bank + sale[:, None])
+        if not moves and self.first_outgoing is not None:
+            pairs &= np.array([player_id in self.first_outgoing for player_id in ordered])[:, None]
+        mask = np.array(allowed)[:, None, None] & pairs[None]
+        mask &= self._open(optimistic)
+        children = np.argwhere(mask)
+        bounds, promise = optimistic[mask], single[mask]
+        order = np.lexsort((children[:, 2], children[:, 1], children[:, 0], -bounds, -promise))
+        moved_now = [move for move in moves if move[0] == start]
+        legality = None
+        sales, costs = sale.tolist(), self.cost[ins].tolist()
+        explored = 0
+        for (index, out_at, in_at), bound in zip(children[order].tolist(), bounds[order].tolist()):
+            if not self._open(bound):
+                continue
+            if self.branching is not None and explored == self.branching:
+                break
+            out_id, in_id, sale, cost = ordered[out_at], incoming_ids[in_at], sales[out_at], costs[in_at]
+            key = (cost - sale, out_id, in_id)
+            if index == start and (last_key is not None and key <= last_key
+                                   or any(move[2] == out_id or move[1] == in_id for move in moved_now)):
+                continue
+            self.evaluations += 1
+            explored += 1
+            if self.evaluations % _CHECK_CLOCK_EVERY == 0 and self.clock() > self.deadline:
+                raise _Timeout
+            child_squad = (squad - {out_id}) | {in_id}
+            child_points = points[:index] + tuple(self._swap_points(later, squad, child_squad, out_id, in_id) for later in range(index, horizon))
+            child_net = round(sum(child_points) - hits[index], 3)
+            # Each added move must pay for itself, so padded copies of a plan are not ranked separately.
+            improves = child_net > net and self._open(child_net)
+            # The child's own bound, checked here so pruned children cost no validation.
+            extend = remaining > 1 and self._extendable(index, child_squad, child_points, child_net, ceiling, remaining - 1)
+            if not (improves or extend):
+                continue
+            if legality is None:
+                legality = TransferLegality([self.players[player_id] for player_id in ordered], self.ruleset)
+            if not legality.allows(out_id, self.players[in_id], bank, sale):
+                continue
+            child_moves = moves + ((index, out_id, in_id),)
+            if improves:
+                self._record(child_net, child_moves)
+            if extend:
+                self._expand(index, key, child_squad, bank + sale - cost, counts[:index] + (counts[index] + 1,) + counts[index + 1:],
+                             child_points, child_net, child_moves)
+
+    def describe(self, moves, gameweeks):
+        squad, bank, available = set(self.owned_ids), self.bank, self.free_transfers
+        transfers, by_gameweek, lineups, total, hit_total = [], [], [], 0.0, 0
+        for index, gameweek in enumerate(gameweeks):
+            made = [move for move in moves if move[0] == index]
+            for _, out_id, in_id in made:
+                sale, cost = self.sale_price(out_id), self.players[in_id]['now_cost']
+                transfers.append({'gameweek': gameweek, 'out_player_id': out_id, 'in_player_id': in_id,
+                                  'sell_price_tenths': sale, 'buy_price_tenths': cost})
+                squad = (squad - {out_id}) | {in_id}
+                bank += sale - cost
+            hit, carried = _roll_free_transfers(available, len(made), self.ruleset)
+            lineup = self.lineup(index, frozenset(squad))
+            by_gameweek.append({'gameweek': gameweek, 'projected_points': lineup['projected_points'], 'transfer_count': len(made),
+                                'free_transfers': available, 'hit_cost': hit, 'bank_tenths': bank})
+            lineups.append({'gameweek': gameweek, 'starter_ids': lineup['starter_ids'], 'captain_id': lineup['captain_id']})
+            total += lineup['projected_points']
+            hit_total += hit
+            available = carried
+        projected = round(total, 3)
+        gross_gain = round(projected - self.baseline_points, 3)
+        return {'transfers': transfers, 'projected_points': projected, 'gross_gain': gross_gain, 'hit_cost': hit_total,
+                'net_gain': round(gross_gain - hit_total, 3), 'remaining_bank_tenths': bank, 'by_gameweek': by_gameweek, 'lineups': lineups}
+
+
+# Plans are searched on the process pool once (out, in) pairs ** max_transfers reaches this many move sequences.
+PARALLEL_MIN_MOVE_SEQUENCES = 10 ** 6
+
+
+def _horizon_shard(shared, first_outgoing):
+    """Ranked plans whose first move sells one of ``first_outgoing``, with the shard's search counters.
+
+    Module-level and fed only plain data, so ``run_parts`` can search slices
+    of the squad in worker processes.
+    """
+    search = _HorizonSearch(*shared)
+    plans = search.run(frozenset(first_outgoing))
+    return plans, search.evaluations, len(search.points), search.timed_out
+
+
+@timed('service')
+def plan_transfer_horizon(snapshot: Mapping[str, Any], picks: List[Mapping[str, Any]], player_pool: List[Mapping[str, Any]], projection_values,
+                          gameweeks: List[int], overrides=None, max_transfers: int = 2, max_transfers_per_gameweek=None, max_hit_points=None,
+                          locked_player_ids=None, excluded_player_ids=None, plan_count: int = DEFAULT_PLAN_COUNT,
+                          shortlist_size: int = DEFAULT_SHORTLIST_SIZE, time_limit_ms: int = DEFAULT_PLAN_TIME_LIMIT_MS, clock=time.monotonic):
+    """Rank plans of up to ``max_transfers`` transfers spread over the horizon.
+
+    Each gameweek gets its own best lineup and captain, free transfers roll
+    over by the ruleset, and the bank follows selling and buying prices.
+    Single transfers are searched over every eligible incoming player; longer
+    plans take incoming players from a per-position shortlist. The status is
+    ``optimal`` only when the search covered every eligible player and
+    finished within the time limit. Large searches are split by the first
+    player sold across the shared process pool; every part stops at the same
+    deadline, however long it queued, and the merged ranking is the same as
+    one search's.
+    """
+    overrides = overrides or {}
+    players = {player.get('id'): player for player in player_pool if isinstance(player.get('id'), int)}
+    owned, sale_prices = [], {}
+    for pick in picks:
+        player = players.get(pick['fpl_player_id'])
+        if player:
+            owned.append(player)
+            sale_prices[player['id']] = overrides.get('selling_prices_tenths', {}).get(str(player['id']), pick.get('selling_price_tenths'))
+    bank = overrides.get('bank_tenths', snapshot.get('bank_tenths'))
+    free_transfers = overrides.get('free_transfers', snapshot.get('free_transfers'))
+    if not isinstance(bank, int) or not isinstance(free_transfers, int):
+        return {'status': 'invalid_input', 'warnings': ['Bank or free transfers are unknown; provide an override.']}
+    if not isinstance(max_transfers, int) or isinstance(max_transfers, bool) or not 0 <= max_transfers <= MAX_PLANNED_TRANSFERS:
+        return {'status': 'invalid_input', 'warnings': [f'max_transfers must be an integer from 0 to {MAX_PLANNED_TRANSFERS}.']}
+    if max_transfers_per_gameweek is not None and (not isinstance(max_transfers_per_gameweek, int) or max_transfers_per_gameweek < 1):
+        return {'status': 'invalid_input', 'warnings': ['max_transfers_per_gameweek must be a positive integer.']}
+    if max_hit_points is not None and (not isinstance(max_hit_points, int) or max_hit_points < 0):
+        return {'status': 'invalid_input', 'warnings': ['max_hit_points must be a non-negative integer.']}
+    if not isinstance(plan_count, int) or isinstance(plan_count, bool) or plan_count < 1:
+        return {'status': 'invalid_input', 'warnings': ['plan_count must be a positive integer.']}
+    if not isinstance(time_limit_ms, int) or isinstance(time_limit_ms, bool) or time_limit_ms <= 0:
+        return {'status': 'invalid_input', 'warnings': ['time_limit_ms must be a positive integer.']}
+    if not gameweeks or len(owned) != get_ruleset().squad_size or _best_lineup(owned, {}) is None:
+        return {'status': 'invalid_input', 'warnings': ['The tracked snapshot does not contain a legal squad.']}
+    owned_ids = {player['id'] for player in owned}
+    locked_ids, excluded_ids = set(locked_player_ids or []), set(excluded_player_ids or [])
+    if not locked_ids <= owned_ids:
+        return {'status': 'invalid_input', 'warnings': ['Locked players must be in the current squad.']}
+    horizon_values = defaultdict(float)
+    for (player_id, gameweek), value in projection_values.items():
+        if gameweek in gameweeks:
+            horizon_values[player_id] += value
+    shortlist, complete = _transfer_shortlist(player_pool, owned, sale_prices, bank, excluded_ids, horizon_values,
+                                              shortlist_size if max_transfers > 1 else None)
+    started = clock()
+    # One deadline for every shard: the default monotonic clock is system-wide, so workers read the same time.
+    deadline = started + time_limit_ms / 1000
+    # Searches read ids, positions, clubs, prices and the horizon's values only, so shards get no other fields.
+    searched = sorted(owned_ids | set(shortlist))
+    shared = ({player_id: _swap_fields(players[player_id]) for player_id in searched}, owned_ids, sale_prices, shortlist,
+              {(player_id, gameweek): projection_values.get((player_id, gameweek), 0) for player_id in searched for gameweek in gameweeks},
+              gameweeks, bank, free_transfers, get_ruleset(), max_transfers, max_transfers_per_gameweek or max_transfers, max_hit_points,
+              locked_ids, plan_count, deadline, clock)
+    search = _HorizonSearch(*shared)
+    shortlisted = Counter(_position(players[player_id]) for player_id in shortlist)
+    pairs = sum(shortlisted[_position(player)] for player in owned)
+    parts = run_parts(_horizon_shard, shared, sorted(owned_ids), pairs ** max_transfers, PARALLEL_MIN_MOVE_SEQUENCES)
+    plans = [moves for _, moves in heapq.nlargest(plan_count, (plan for part in parts for plan in part[0]))]
+    search.evaluations, timed_out = sum(part[1] for part in parts), any(part[3] for part in parts)
+    baseline = [search.lineup(index, frozenset(owned_ids)) for index in range(len(gameweeks))]
+    warnings = [] if complete else [
+        f'Incoming players are limited to the {shortlist_size} best projected and {SHORTLIST_CHEAPEST} cheapest per position and the '
+        f'{SHORTLIST_AFFORDABLE} best each owned player can be swapped for directly; plans are the best for that shortlist.']
+    if timed_out:
+        warnings.append('The time limit was reached; plans are the best found so far.')
+    proven_optimal = complete and not timed_out
+    return {'status': 'optimal' if proven_optimal else 'feasible',
+            'baseline': {'projected_points': search.baseline_points,
+                         'by_gameweek': [{'gameweek': gameweek, 'projected_points': lineup['projected_points']} for gameweek, lineup in zip(gameweeks, baseline)],
+                         'lineups': [{'gameweek': gameweek, 'starter_ids': lineup['starter_ids'], 'captain_id': lineup['captain_id']}
+                                     for gameweek, lineup in zip(gameweeks, baseline)]},
+            'solutions': [search.describe(moves, gameweeks) for moves in plans], 'warnings': warnings,
+            'solver': {'proven_optimal': proven_optimal, 'evaluations': search.evaluations,
+                       'lineups_evaluated': sum(part[2] for part in parts), 'elapsed_seconds': round(clock() - started, 3)}}
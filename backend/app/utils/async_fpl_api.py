@@ -0,0 +1,54 @@
+"""Awaitable access to the FPL API for the asyncio serving path."""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from app.utils.fpl_api import FPLAPIClient
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class AsyncFPLClient:
+    """``FPLAPIClient`` calls as coroutines, so one event loop can wait on many of them at once.
+
+    Calls still go through the response cache, single-flight and the pooled
+    ``HTTPSession``; they run on a dedicated executor of ``max_in_flight``
+    threads, which bounds concurrent upstream work for the whole process
+    without ever blocking the event loop.
+    """
+
+    def __init__(self, client=FPLAPIClient, max_in_flight: int = None):
+        self.client = client
+        self.max_in_flight = max_in_flight or _env_int('FPL_ASYNC_UPSTREAM_LIMIT', 32)
+        self._executor = ThreadPoolExecutor(self.max_in_flight, thread_name_prefix='fpl-upstream')
+
+    async def _call(self, function: Callable[..., Any], *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def get_bootstrap_static(self) -> Dict:
+        return await self._call(self.client.get_bootstrap_static)
+
+    async def get_fixtures(self) -> List[Dict]:
+        return await self._call(self.client.get_fixtures)
+
+    async def get_current_gameweek(self) -> int:
+        return await self._call(self.client.get_current_gameweek)
+
+    async def get_team_data(self, team_id: int) -> Dict:
+        return await self._call(self.client.get_team_data, team_id)
+
+    async def get_team_picks(self, team_id: int, gameweek: int) -> Dict:
+        return await self._call(self.client.get_team_picks, team_id, gameweek)
+
+    async def get_team_history(self, team_id: int) -> Dict:
+        return await self._call(self.client.get_team_history, team_id)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
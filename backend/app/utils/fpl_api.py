@@ -1,9 +1,17 @@
 import requests
 import os
-from typing import Dict, List, Optional
-from functools import lru_cache
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
 import json
 
+from app.utils.http_session import http_session
+from app.utils.instrumentation import span
+from app.utils.single_flight import SingleFlight
+
 FPL_API_BASE = os.getenv('FPL_API_BASE_URL', 'https://fantasy.premierleague.com/api')
 
 # Headers to avoid 403 Forbidden from FPL API
@@ -20,30 +28,239 @@ class FPLResourceNotFound(FPLAPIError):
     """A public FPL resource (such as a team) does not exist."""
 
 
+def _endpoint(path: str) -> str:
+    if path.startswith('/bootstrap-static/'):
+        return 'bootstrap'
+    if path.startswith('/fixtures/'):
+        return 'fixtures'
+    if path.startswith('/element/'):
+        return 'element'
+    return 'entry'
+
+
+def _span_name(path: str) -> str:
+    """Endpoint family for timing, with entry picks and history split from the entry itself."""
+    endpoint = _endpoint(path)
+    if endpoint != 'entry':
+        return endpoint
+    last = path.split('?')[0].rstrip('/').rsplit('/', 1)[-1]
+    return 'entry' if last.isdigit() else last
+
+
+# Parsed bodies of revalidated responses; a 304 reuses the same payload object.
+_revalidated_payloads: Dict[str, tuple] = {}
+
+
 def _get_json(path: str) -> Dict:
-    """Fetch one official payload with a bounded request time."""
+    """Fetch one official payload with a bounded request time.
+
+    Bootstrap and fixtures are revalidated with ``ETag``/``If-Modified-Since``
+    so an unchanged payload costs a 304 instead of a full download and parse.
+    """
+    conditional = _endpoint(path) in ('bootstrap', 'fixtures')
+    with span('upstream', _span_name(path)):
+        try:
+            response = http_session.get(
+                f"{FPL_API_BASE}{path}", headers=HEADERS, timeout=10, conditional=conditional,
+            )
+            response.raise_for_status()
+            if not conditional:
+                return response.json()
+            previous = _revalidated_payloads.get(path)
+            if previous and previous[0] is response:
+                return previous[1]
+            payload = response.json()
+            _revalidated_payloads[path] = (response, payload)
+            return payload
+        except requests.HTTPError as error:
+            if error.response is not None and error.response.status_code == 404:
+                raise FPLResourceNotFound("The requested FPL resource was not found.") from error
+            raise FPLAPIError("The official FPL API returned an error.") from error
+        except (requests.RequestException, ValueError) as error:
+            raise FPLAPIError("The official FPL API is temporarily unavailable.") from error
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How long one family of upstream payloads may be served from memory.
+
+    ``ttl_seconds`` is the fresh window. During the following
+    ``stale_seconds`` the cached payload is still returned immediately while a
+    background refresh replaces it. Deadline-aware payloads also expire shortly
+    after the next gameweek deadline, when prices and statuses change.
+    """
+
+    ttl_seconds: float
+    stale_seconds: float = 0.0
+    deadline_aware: bool = False
+
+
+def _env_seconds(name: str, default: float) -> float:
     try:
-        response = requests.get(
-            f"{FPL_API_BASE}{path}", headers=HEADERS, timeout=10
-        )
-        response.raise_for_status()
-        return response.json()
-    except requests.HTTPError as error:
-        if error.response is not None and error.response.status_code == 404:
-            raise FPLResourceNotFound("The requested FPL resource was not found.") from error
-        raise FPLAPIError("The official FPL API returned an error.") from error
-    except (requests.RequestException, ValueError) as error:
-        raise FPLAPIError("The official FPL API is temporarily unavailable.") from error
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+CACHE_POLICIES = {
+    'bootstrap': CachePolicy(_env_seconds('FPL_BOOTSTRAP_TTL_SECONDS', 900), 6 * 3600, deadline_aware=True),
+    'fixtures': CachePolicy(_env_seconds('FPL_FIXTURES_TTL_SECONDS', 900), 6 * 3600, deadline_aware=True),
+    'entry': CachePolicy(_env_seconds('FPL_ENTRY_TTL_SECONDS', 60)),
+    'element': CachePolicy(_env_seconds('FPL_ELEMENT_TTL_SECONDS', 300), 600),
+}
+# Official state (prices, statuses, picks) settles shortly after a deadline.
+DEADLINE_GRACE_SECONDS = 120
+
+
+def _parse_deadline(value: Any) -> Optional[float]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+@dataclass
+class _CacheEntry:
+    payload: Any
+    fetched_at: float
+    expires_at: float
+    stale_until: float
+
+
+class ResponseCache:
+    """Thread-safe TTL cache for upstream FPL payloads with stale-while-revalidate."""
+
+    def __init__(self, policies: Dict[str, CachePolicy], max_entries: int = 1024,
+                 clock: Callable[[], float] = time.time, background: bool = True):
+        self.policies = policies
+        self.max_entries = max_entries
+        self.clock = clock
+        self.background = background
+        self._entries: 'OrderedDict[str, _CacheEntry]' = OrderedDict()
+        self._refreshing = set()
+        self._next_deadline: Optional[float] = None
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self._counters = {endpoint: self._empty_counters() for endpoint in policies}
+
+    @staticmethod
+    def _empty_counters():
+        return {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_errors': 0}
+
+    def get(self, path: str, loader: Callable[[str], Any]) -> Any:
+        endpoint = _endpoint(path)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and now < entry.expires_at:
+                self._entries.move_to_end(path)
+                self._counters[endpoint]['hits'] += 1
+                return entry.payload
+            if entry and now < entry.stale_until:
+                self._counters[endpoint]['stale_hits'] += 1
+                schedule = path not in self._refreshing
+                if schedule:
+                    self._refreshing.add(path)
+            else:
+                entry, schedule = None, False
+                self._counters[endpoint]['misses'] += 1
+        if entry is None:
+            # Concurrent cold misses for one path share a single download.
+            return self._flights.do(path, lambda: self.refresh(path, loader))
+        if schedule:
+            self._schedule_refresh(path, loader)
+        return entry.payload
+
+    def put(self, path: str, payload: Any) -> None:
+        endpoint = _endpoint(path)
+        policy = self.policies[endpoint]
+        now = self.clock()
+        with self._lock:
+            if endpoint == 'bootstrap':
+                self._next_deadline = self._deadline_after(payload, now)
+            expires_at = now + policy.ttl_seconds
+            if policy.deadline_aware and self._next_deadline is not None:
+                expires_at = min(expires_at, self._next_deadline + DEADLINE_GRACE_SECONDS)
+            self._entries[path] = _CacheEntry(payload, now, expires_at, expires_at + policy.stale_seconds)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refresh(self, path: str, loader: Callable[[str], Any]) -> Any:
+        """Load and store a payload now, replacing any cached copy without a cold gap."""
+        payload = loader(path)
+        self.put(path, payload)
+        return payload
+
+    def invalidate(self, endpoint: Optional[str] = None, path: Optional[str] = None) -> int:
+        """Drop one path, one endpoint family, or everything; returns the number removed."""
+        with self._lock:
+            doomed = [key for key in self._entries
+                      if (path is None or key == path) and (endpoint is None or _endpoint(key) == endpoint)]
+            for key in doomed:
+                del self._entries[key]
+        return len(doomed)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            stats = {endpoint: dict(counters) for endpoint, counters in self._counters.items()}
+            for key in self._entries:
+                stats[_endpoint(key)]['entries'] = stats[_endpoint(key)].get('entries', 0) + 1
+        for counters in stats.values():
+            counters.setdefault('entries', 0)
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._counters = {endpoint: self._empty_counters() for endpoint in self.policies}
+
+    def _schedule_refresh(self, path: str, loader: Callable[[str], Any]) -> None:
+        if not self.background:
+            self._refresh(path, loader)
+            return
+        threading.Thread(target=self._refresh, args=(path, loader), name=f'fpl-refresh{path}', daemon=True).start()
+
+    def _refresh(self, path: str, loader: Callable[[str], Any]) -> None:
+        endpoint = _endpoint(path)
+        try:
+            payload = loader(path)
+        except FPLAPIError:
+            # Keep serving the stale payload; the next stale hit retries.
+            with self._lock:
+                self._counters[endpoint]['refresh_errors'] += 1
+        else:
+            self.put(path, payload)
+            with self._lock:
+                self._counters[endpoint]['refreshes'] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(path)
+
+    @staticmethod
+    def _deadline_after(bootstrap: Any, now: float) -> Optional[float]:
+        events = bootstrap.get('events', []) if isinstance(bootstrap, dict) else []
+        deadlines = [_parse_deadline(event.get('deadline_time')) for event in events]
+        upcoming = [deadline for deadline in deadlines if deadline is not None and deadline > now]
+        return min(upcoming) if upcoming else None
+
+
+response_cache = ResponseCache(CACHE_POLICIES)
+
+
+def _cached_json(path: str) -> Any:
+    return response_cache.get(path, _get_json)
+
 
 class FPLAPIClient:
     """Client for interacting with FPL API"""
-    
+
     @staticmethod
-    @lru_cache(maxsize=128)
     def get_bootstrap_static() -> Dict:
         """Fetch static bootstrap data (teams, players, positions, etc.)"""
-        return _get_json("/bootstrap-static/")
-    
+        return _cached_json("/bootstrap-static/")
+
     @staticmethod
     def get_current_gameweek() -> int:
         """Dynamically fetch current gameweek"""
@@ -57,33 +274,53 @@ class FPLAPIClient:
             return current_gw
         except Exception as e:
             raise Exception(f"Failed to fetch current gameweek: {str(e)}")
-    
+
     @staticmethod
     def get_team_data(team_id: int) -> Dict:
         """Fetch team data by team ID"""
-        return _get_json(f"/entry/{team_id}/")
-    
+        return _cached_json(f"/entry/{team_id}/")
+
     @staticmethod
     def get_team_picks(team_id: int, gameweek: int) -> Dict:
         """Fetch team picks for a specific gameweek"""
-        return _get_json(f"/entry/{team_id}/event/{gameweek}/picks/")
+        return _cached_json(f"/entry/{team_id}/event/{gameweek}/picks/")
 
     @staticmethod
     def get_team_history(team_id: int) -> Dict:
         """Fetch season and chip history for a public FPL team."""
-        return _get_json(f"/entry/{team_id}/history/")
-    
+        return _cached_json(f"/entry/{team_id}/history/")
+
+    @staticmethod
+    def get_league_standings(league_id: int, page: int = 1) -> Dict:
+        """Fetch one page of a classic league's standings (50 entries per page)."""
+        return _cached_json(f"/leagues-classic/{league_id}/standings/?page_standings={page}")
+
     @staticmethod
     def get_player_data(player_id: int) -> Dict:
         """Fetch detailed player data"""
-        return _get_json(f"/element/{player_id}/")
-    
+        return _cached_json(f"/element/{player_id}/")
+
     @staticmethod
     def get_fixtures() -> List[Dict]:
         """Fetch all fixtures"""
-        return _get_json("/fixtures/")
-    
+        return _cached_json("/fixtures/")
+
     @staticmethod
     def get_team_fixtures(team_id: int) -> List[Dict]:
         """Fetch fixtures for a specific team"""
-        return _get_json(f"/fixtures/?team={team_id}")
+        return _cached_json(f"/fixtures/?team={team_id}")
+
+    @staticmethod
+    def warm_cache() -> None:
+        """Load bootstrap and fixtures ahead of requests so no request pays for them."""
+        response_cache.refresh("/bootstrap-static/", _get_json)
+        response_cache.refresh("/fixtures/", _get_json)
+
+    @staticmethod
+    def invalidate_cache(endpoint: Optional[str] = None) -> int:
+        """Forget cached upstream payloads, for example after a known data change."""
+        return response_cache.invalidate(endpoint)
+
+    @staticmethod
+    def cache_stats() -> Dict[str, Dict[str, int]]:
+        return response_cache.stats()
@@ -0,0 +1,153 @@
+"""Shared keep-alive HTTP layer for upstream FPL and photo requests."""
+
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class HTTPSession:
+    """Thread-safe pooled GET client with bounded retries and conditional revalidation.
+
+    Every thread gets its own ``requests.Session`` but all of them mount one
+    shared adapter, so keep-alive connections are pooled process-wide. Retries
+    use full-jitter exponential backoff and honour a numeric ``Retry-After``.
+    With ``conditional=True`` the last ``ETag``/``Last-Modified`` for a URL is
+    replayed, and a ``304 Not Modified`` returns the previously stored response.
+    """
+
+    def __init__(self, pool_size: int = 16, max_retries: int = 3, backoff_base: float = 0.25,
+                 backoff_cap: float = 4.0, per_host_limit: int = 8,
+                 sleep: Callable[[float], None] = time.sleep, jitter: Callable[[], float] = random.random):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.per_host_limit = per_host_limit
+        self.sleep = sleep
+        self.jitter = jitter
+        self._adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._validated: Dict[str, requests.Response] = {}
+        self._counters = {'requests': 0, 'retries': 0, 'not_modified': 0}
+        # An ``UpstreamArchive`` to record responses to or replay them from; see ``app/utils/upstream_archive.py``.
+        self.archive = None
+
+    def get(self, url: str, headers: Optional[Mapping[str, str]] = None, timeout: float = 10,
+            conditional: bool = False) -> requests.Response:
+        """Return the final response; connection errors propagate after the last retry.
+
+        With an archive in replay mode the response comes from the archive and
+        the network is never used; in record mode every returned response is
+        also written to it.
+        """
+        archive = self.archive
+        if archive is not None and archive.mode == 'replay':
+            return archive.replay(url)
+        started = time.perf_counter()
+        response = self._get(url, headers, timeout, conditional)
+        if archive is not None:
+            archive.record(url, response, time.perf_counter() - started)
+        return response
+
+    def _get(self, url: str, headers: Optional[Mapping[str, str]], timeout: float, conditional: bool) -> requests.Response:
+        request_headers = dict(headers or {})
+        previous = self._validated.get(url) if conditional else None
+        if previous is not None:
+            if previous.headers.get('ETag'):
+                request_headers['If-None-Match'] = previous.headers['ETag']
+            if previous.headers.get('Last-Modified'):
+                request_headers['If-Modified-Since'] = previous.headers['Last-Modified']
+        response = self._send(url, request_headers, timeout)
+        if response.status_code == 304 and previous is not None:
+            self._count('not_modified')
+            return previous
+        if conditional and response.status_code == 200 and (
+                response.headers.get('ETag') or response.headers.get('Last-Modified')):
+            response.content  # Read the body now so the stored response can be replayed.
+            with self._lock:
+                self._validated[url] = response
+        return response
+
+    def forget(self, url: Optional[str] = None) -> None:
+        """Drop stored validators so the next conditional request downloads in full."""
+        with self._lock:
+            if url is None:
+                self._validated.clear()
+            else:
+                self._validated.pop(url, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def _send(self, url: str, headers: Dict[str, str], timeout: float) -> requests.Response:
+        limit = self._host_limit(urlsplit(url).netloc)
+        for attempt in range(self.max_retries + 1):
+            final = attempt == self.max_retries
+            self._count('requests')
+            try:
+                with limit:
+                    response = self._session().get(url, headers=headers, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if final:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRYABLE_STATUSES or final:
+                    return response
+                delay = self._retry_after(response) or self._backoff(attempt)
+                response.close()
+            self._count('retries')
+            self.sleep(delay)
+        raise AssertionError('unreachable')
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.backoff_cap, self.backoff_base * 2 ** attempt) * self.jitter()
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        try:
+            return min(self.backoff_cap, max(0.0, float(response.headers.get('Retry-After', ''))))
+        except ValueError:
+            return None
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self._adapter)
+            session.mount('https://', self._adapter)
+            self._local.session = session
+        return session
+
+    def _host_limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+
+http_session = HTTPSession(
+    pool_size=_env_int('FPL_HTTP_POOL_SIZE', 16),
+    max_retries=_env_int('FPL_HTTP_MAX_RETRIES', 3),
+    per_host_limit=_env_int('FPL_HTTP_HOST_CONCURRENCY', 8),
+)
@@ -0,0 +1,229 @@
+"""Timing spans, latency histograms and Prometheus text exposition for the Flask app."""
+
+import contextvars
+import functools
+import os
+import threading
+import time
+import types
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds; spans range from sub-millisecond SQLite reads to multi-second optimizer runs.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REQUEST_METRIC = 'fpl_request_duration_seconds'
+REQUEST_COUNT_METRIC = 'fpl_requests_total'
+SPAN_METRIC = 'fpl_span_duration_seconds'
+
+Labels = Tuple[Tuple[str, str], ...]
+# (name, type, labels, value) for metrics read from other components at scrape time.
+Sample = Tuple[str, str, Labels, float]
+
+
+class _Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """Histograms and counters keyed by metric name and label values.
+
+    Recording takes one lock and a bisect over the bucket bounds; rendering
+    produces the Prometheus text exposition format with cumulative buckets.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[Tuple[str, Labels], _Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, labels: Labels, seconds: float) -> None:
+        bucket = bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[(name, labels)] = _Histogram(len(self.buckets) + 1)
+            histogram.counts[bucket] += 1
+            histogram.total += seconds
+            histogram.count += 1
+
+    def increment(self, name: str, labels: Labels, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[(name, labels)] = self._counters.get((name, labels), 0) + amount
+
+    def histogram(self, name: str, labels: Labels) -> Optional[Dict[str, Any]]:
+        """Count, sum and per-bucket counts of one series, or None if nothing was recorded."""
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                return None
+            return {'count': histogram.count, 'sum': histogram.total, 'buckets': list(histogram.counts)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self, samples: Iterable[Sample] = ()) -> str:
+        """Everything recorded plus ``samples``, in the Prometheus text format."""
+        with self._lock:
+            histograms = {key: (list(value.counts), value.total, value.count) for key, value in self._histograms.items()}
+            counters = dict(self._counters)
+        families: Dict[str, Tuple[str, List[str]]] = {}
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            lines = families.setdefault(name, ('histogram', []))[1]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+            lines.append(f'{name}_sum{_labels(labels)} {_number(total)}')
+            lines.append(f'{name}_count{_labels(labels)} {count}')
+        for (name, labels), value in sorted(counters.items()):
+            families.setdefault(name, ('counter', []))[1].append(f'{name}{_labels(labels)} {_number(value)}')
+        for name, kind, labels, value in samples:
+            families.setdefault(name, (kind, []))[1].append(f'{name}{_labels(labels)} {_number(value)}')
+        output = []
+        for name, (kind, lines) in families.items():
+            output.append(f'# TYPE {name} {kind}')
+            output.extend(lines)
+        return '\n'.join(output) + '\n' if output else ''
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = MetricsRegistry()
+_enabled = os.getenv('FPL_METRICS_ENABLED', '1') != '0'
+# Per-request totals by span kind; None outside an instrumented request.
+_request_timings: 'contextvars.ContextVar[Optional[Dict[str, float]]]' = contextvars.ContextVar('fpl_request_timings', default=None)
+_active = threading.local()
+
+
+def configure(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+class _Span:
+    """Time one block. Only the outermost span of each kind in a thread is recorded, so totals never double count."""
+
+    __slots__ = ('kind', 'name', 'started')
+
+    def __init__(self, kind: str, name: str):
+        self.kind, self.name, self.started = kind, name, None
+
+    def __enter__(self):
+        kinds = getattr(_active, 'kinds', None)
+        if kinds is None:
+            kinds = _active.kinds = set()
+        if self.kind not in kinds:
+            kinds.add(self.kind)
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.started is None:
+            return False
+        elapsed = time.perf_counter() - self.started
+        _active.kinds.discard(self.kind)
+        registry.observe(SPAN_METRIC, (('kind', self.kind), ('name', self.name)), elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[self.kind] = timings.get(self.kind, 0.0) + elapsed
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(kind: str, name: str):
+    """Context manager timing a block as ``kind`` (upstream, db, service); a shared no-op when disabled."""
+    return _Span(kind, name) if _enabled else _NULL_SPAN
+
+
+def timed(kind: str, name: Optional[str] = None) -> Callable:
+    """Decorator form of ``span``; the span is named after the function unless ``name`` is given."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(kind, label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def timed_methods(kind: str) -> Callable:
+    """Class decorator applying ``timed(kind)`` to every public plain method."""
+    def decorate(cls):
+        for attribute, value in list(vars(cls).items()):
+            if not attribute.startswith('_') and isinstance(value, types.FunctionType):
+                setattr(cls, attribute, timed(kind, f'{cls.__name__}.{attribute}')(value))
+        return cls
+    return decorate
+
+
+def server_timing(timings: Dict[str, float], total_seconds: float) -> str:
+    entries = [f'{kind};dur={seconds * 1000:.1f}' for kind, seconds in sorted(timings.items())]
+    return ', '.join(entries + [f'total;dur={total_seconds * 1000:.1f}'])
+
+
+def init_app(app) -> None:
+    """Record route latency and add ``Server-Timing`` to every response when ``METRICS_ENABLED`` is set."""
+    configure(app.config['METRICS_ENABLED'])
+    if not app.config['METRICS_ENABLED']:
+        return
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_timing():
+        g.fpl_request_timing = (time.perf_counter(), _request_timings.set({}))
+
+    @app.after_request
+    def _finish_request_timing(response):
+        started, token = g.pop('fpl_request_timing', (None, None))
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        timings = _request_timings.get() or {}
+        _request_timings.reset(token)
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        registry.observe(REQUEST_METRIC, (('route', route), ('method', request.method)), elapsed)
+        registry.increment(REQUEST_COUNT_METRIC, (('route', route), ('method', request.method), ('status', str(response.status_code))))
+        response.headers['Server-Timing'] = server_timing(timings, elapsed)
+        return response
+
+    @app.teardown_request
+    def _discard_request_timing(error=None):
+        # after_request does not run when a handler raises; drop the request's totals here instead.
+        pending = g.pop('fpl_request_timing', None)
+        if pending is not None:
+            _request_timings.reset(pending[1])
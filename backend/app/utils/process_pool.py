@@ -0,0 +1,142 @@
+"""Reusable process pool for splitting CPU-bound candidate evaluation across cores."""
+
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence
+
+# Workers are started by a fork server: forking the threaded app process itself could copy a held lock.
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def _default_workers() -> int:
+    try:
+        return int(os.getenv('FPL_PLANNER_WORKERS', min(4, os.cpu_count() or 1)))
+    except ValueError:
+        return 1
+
+
+_lock = threading.Lock()
+_workers = _default_workers()
+_executor: Optional[ProcessPoolExecutor] = None
+_counters = {'pooled': 0, 'inline': 0, 'fallbacks': 0}
+
+
+def configure(workers: int) -> None:
+    """Set the pool size; 0 or 1 evaluates everything in-process. A running pool of another size is shut down."""
+    global _workers, _executor
+    with _lock:
+        if workers == _workers:
+            return
+        _workers, executor, _executor = workers, _executor, None
+    if executor is not None:
+        # Parts already queued by other requests still finish; the old workers exit once they have.
+        executor.shutdown(wait=False)
+
+
+def worker_count() -> int:
+    return _workers
+
+
+def partition(items: Sequence[Any], parts: int) -> List[Sequence[Any]]:
+    """Split ``items`` into at most ``parts`` contiguous, non-empty slices of near-equal length, in order."""
+    parts = max(1, min(parts, len(items)))
+    size, extra = divmod(len(items), parts)
+    slices, start = [], 0
+    for index in range(parts):
+        end = start + size + (index < extra)
+        slices.append(items[start:end])
+        start = end
+    return slices
+
+
+def _pool() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if multiprocessing.parent_process() is not None:
+        # Work that itself calls run_parts inside a worker runs in that worker rather than starting a nested pool.
+        return None
+    with _lock:
+        if _workers > 1 and _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=_workers, mp_context=multiprocessing.get_context(_START_METHOD))
+        return _executor
+
+
+def _discard(executor: ProcessPoolExecutor) -> None:
+    global _executor
+    with _lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def _picklable(fn: Callable[[Any, Any], Any], shared: Any, items: Sequence[Any]) -> bool:
+    """Whether ``fn``, ``shared`` and ``items`` can cross to a worker; functions pickle by module-level name."""
+    try:
+        pickle.dumps((fn, shared, items))
+    except (pickle.PicklingError, AttributeError, TypeError):
+        # Local functions, lambdas and locks fail with any of these, depending on the Python version.
+        return False
+    return True
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counters[name] += 1
+
+
+def run_parts(fn: Callable[[Any, Any], Any], shared: Any, items: Sequence[Any], work: int, min_work: int) -> List[Any]:
+    """``fn(shared, part)`` for contiguous parts of ``items``, results in part order.
+
+    With more than one worker and at least ``min_work`` estimated units of
+    work, ``items`` is split into one part per worker and the parts run on
+    the shared pool. ``fn`` must be a module-level function, and ``shared``
+    is read-only input sent once with each part. Otherwise, or if the input
+    cannot be pickled or the pool cannot take the parts, the whole input is
+    one part evaluated in this process. Exceptions raised by ``fn`` propagate
+    to the caller. Results come back in part order whichever worker finishes
+    first, so callers that merge them get the same output as a single
+    in-process call.
+    """
+    executor = _pool() if work >= min_work and len(items) > 1 else None
+    if executor is not None and not _picklable(fn, shared, items):
+        executor = None
+        _count('fallbacks')
+    if executor is not None:
+        futures = []
+        try:
+            for part in partition(items, _workers):
+                futures.append(executor.submit(fn, shared, part))
+        except (BrokenProcessPool, OSError, RuntimeError) as error:
+            # No worker could be started, or the pool broke or was replaced by ``configure`` before every part was queued.
+            for future in futures:
+                future.cancel()
+            if isinstance(error, BrokenProcessPool):
+                _discard(executor)
+            _count('fallbacks')
+        else:
+            try:
+                results = [future.result() for future in futures]
+            except BrokenProcessPool:
+                # A worker died; start a new pool next time and answer in-process now. Other errors come from ``fn``.
+                _discard(executor)
+                _count('fallbacks')
+            else:
+                _count('pooled')
+                return results
+    _count('inline')
+    return [fn(shared, items)]
+
+
+def stats() -> dict:
+    with _lock:
+        return dict(_counters, workers=_workers, running=_executor is not None)
+
+
+def shutdown() -> None:
+    with _lock:
+        executor = _executor
+    if executor is not None:
+        _discard(executor)
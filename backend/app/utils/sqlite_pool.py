@@ -0,0 +1,138 @@
+"""Per-thread pooled SQLite connections with tuned PRAGMAs for the local tracker database."""
+
+import atexit
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class ConnectionPool:
+    """Keep one open connection per thread for one database file.
+
+    Opening a connection re-reads the schema and loses the page cache, so
+    each thread keeps its connection across calls. Connections are set up
+    once with WAL, ``synchronous = NORMAL`` (durable at each checkpoint, not
+    each commit), a page cache of ``cache_kib``, memory-mapped reads up to
+    ``mmap_bytes`` and ``cached_statements`` prepared statements.
+    Connections of finished threads are closed when the next one is opened,
+    and ``close`` closes the rest. ``persistent=False`` opens and closes a
+    connection per use, as before pooling.
+    """
+
+    def __init__(self, database_path: str, cache_kib: int = 16384, mmap_bytes: int = 64 * 1024 * 1024,
+                 cached_statements: int = 256, busy_timeout_ms: int = 5000, persistent: bool = True):
+        self.database_path = database_path
+        self.cache_kib = cache_kib
+        self.mmap_bytes = mmap_bytes
+        self.cached_statements = cached_statements
+        self.busy_timeout_ms = busy_timeout_ms
+        self.persistent = persistent
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._counters = {'opened': 0, 'reused': 0, 'closed': 0}
+        self._pid = os.getpid()
+
+    def _open(self) -> sqlite3.Connection:
+        # Threads only use their own connection; the flag lets ``close`` run from any thread.
+        connection = sqlite3.connect(self.database_path, cached_statements=self.cached_statements, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+        connection.execute(f'PRAGMA cache_size = {-int(self.cache_kib)}')
+        connection.execute(f'PRAGMA mmap_size = {int(self.mmap_bytes)}')
+        return connection
+
+    def _acquire(self) -> sqlite3.Connection:
+        ident = threading.get_ident()
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked worker must not share the parent's file handles; drop them without closing.
+                self._connections, self._pid = {}, os.getpid()
+            connection = self._connections.get(ident)
+            if connection is not None:
+                self._counters['reused'] += 1
+                return connection
+            alive = {thread.ident for thread in threading.enumerate()}
+            finished = [key for key in self._connections if key not in alive]
+            stale = [self._connections.pop(key) for key in finished]
+            self._counters['closed'] += len(stale)
+            self._counters['opened'] += 1
+        for old in stale:
+            old.close()
+        connection = self._open()
+        with self._lock:
+            self._connections[ident] = connection
+        return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Yield this thread's connection, committing on success and rolling back on error."""
+        if not self.persistent:
+            connection = self._open()
+            with self._lock:
+                self._counters['opened'] += 1
+            try:
+                yield connection
+                connection.commit()
+            finally:
+                connection.close()
+            return
+        connection = self._acquire()
+        try:
+            yield connection
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = list(self._connections.values()), {}
+            self._counters['closed'] += len(connections)
+        for connection in connections:
+            connection.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters, open=len(self._connections))
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def configure_pool(database_path: str, **options) -> ConnectionPool:
+    """Replace the pool for ``database_path`` with one using ``options``, closing the old one."""
+    pool = ConnectionPool(database_path, **options)
+    with _pools_lock:
+        previous, _pools[database_path] = _pools.get(database_path), pool
+    if previous is not None:
+        previous.close()
+    return pool
+
+
+def get_pool(database_path: str) -> ConnectionPool:
+    """Return the pool for ``database_path``, creating one with default settings on first use."""
+    with _pools_lock:
+        pool = _pools.get(database_path)
+        if pool is None:
+            pool = _pools[database_path] = ConnectionPool(database_path)
+        return pool
+
+
+def close_pools(database_path: Optional[str] = None) -> None:
+    """Close pooled connections for one database, or for all of them at shutdown."""
+    with _pools_lock:
+        if database_path is None:
+            pools = list(_pools.values())
+            _pools.clear()
+        else:
+            pools = [pool for pool in [_pools.pop(database_path, None)] if pool is not None]
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_pools)
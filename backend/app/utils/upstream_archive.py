@@ -0,0 +1,153 @@
+"""Record upstream HTTP responses to a local archive and replay them without the network."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+ARCHIVE_MODES = ('record', 'replay')
+# Only what callers read back; cookies and transport headers are not archived.
+ARCHIVED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def archive_key(url: str) -> str:
+    """Path and query of ``url``; the host is left out so a stub or mirror base URL replays the same entries."""
+    parts = urlsplit(url)
+    return f'{parts.path}?{parts.query}' if parts.query else parts.path
+
+
+def _timestamp(value: Union[str, datetime, None]) -> Optional[str]:
+    """UTC ISO-8601 with microseconds, so recorded times compare correctly as strings."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec='microseconds')
+
+
+class UpstreamArchive:
+    """Upstream responses keyed by URL path and the time they were recorded.
+
+    ``index.jsonl`` holds one line per recorded response (path, timestamp,
+    status, headers, upstream latency and body digest). Bodies are stored
+    once under ``bodies/`` by their SHA-256, so repeated recordings of an
+    unchanged bootstrap cost one index line. Replay serves the newest
+    recording of each path, or the newest at or before ``replay_at``, to
+    reproduce the upstream state of a given moment. ``latency`` adds a delay
+    to every replayed response: a fixed number of seconds, or ``'recorded'``
+    to wait as long as the original request took.
+    """
+
+    def __init__(self, directory: str, mode: str, latency: Union[None, float, str] = None,
+                 replay_at: Union[str, datetime, None] = None, sleep=time.sleep):
+        if mode not in ARCHIVE_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(ARCHIVE_MODES)}.")
+        if latency is not None and latency != 'recorded' and not isinstance(latency, (int, float)):
+            raise ValueError("latency must be a number of seconds or 'recorded'.")
+        self.directory = directory
+        self.mode = mode
+        self.latency = latency
+        self.replay_at = _timestamp(replay_at)
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._counters = {'recorded': 0, 'replayed': 0, 'missing': 0}
+        self._load_index()
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, 'index.jsonl')
+
+    def _load_index(self) -> None:
+        try:
+            with open(self._index_path) as handle:
+                for line in handle:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry['path'], []).append(entry)
+        except FileNotFoundError:
+            return
+        for entries in self._entries.values():
+            entries.sort(key=lambda entry: entry['recorded_at'])
+
+    def record(self, url: str, response: requests.Response, elapsed_seconds: float) -> None:
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        entry = {'path': archive_key(url), 'recorded_at': _timestamp(datetime.now(timezone.utc)), 'status': response.status_code,
+                 'headers': {name: response.headers[name] for name in ARCHIVED_HEADERS if name in response.headers},
+                 'elapsed_ms': round(elapsed_seconds * 1000, 1), 'body': digest}
+        body_path = self._body_path(digest)
+        if not os.path.exists(body_path):
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            handle, temporary = tempfile.mkstemp(dir=os.path.dirname(body_path), prefix='.tmp-')
+            with os.fdopen(handle, 'wb') as stream:
+                stream.write(content)
+            os.replace(temporary, body_path)
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._lock:
+            with open(self._index_path, 'a') as handle:
+                handle.write(line)
+            self._entries.setdefault(entry['path'], []).append(entry)
+            self._counters['recorded'] += 1
+
+    def replay(self, url: str) -> requests.Response:
+        """The archived response for ``url``; raises ``requests.ConnectionError`` when none was recorded."""
+        entry = self._select(archive_key(url))
+        if entry is None:
+            with self._lock:
+                self._counters['missing'] += 1
+            raise requests.ConnectionError(f'No archived response for {archive_key(url)}.')
+        with open(self._body_path(entry['body']), 'rb') as handle:
+            content = handle.read()
+        delay = entry['elapsed_ms'] / 1000 if self.latency == 'recorded' else self.latency
+        if delay:
+            self.sleep(delay)
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = content
+        response.url = url
+        response.reason = 'Archived'
+        with self._lock:
+            self._counters['replayed'] += 1
+        return response
+
+    def _select(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entries = self._entries.get(path)
+            if not entries:
+                return None
+            if self.replay_at is None:
+                return entries[-1]
+            position = bisect_right([entry['recorded_at'] for entry in entries], self.replay_at)
+            return entries[position - 1] if position else None
+
+    def _body_path(self, digest: str) -> str:
+        return os.path.join(self.directory, 'bodies', digest[:2], digest)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters, paths=len(self._entries), responses=sum(len(entries) for entries in self._entries.values()))
+
+
+def archive_from_config(config) -> Optional[UpstreamArchive]:
+    """The archive selected by ``UPSTREAM_MODE``, or None to use the network as usual."""
+    mode = config['UPSTREAM_MODE']
+    if mode in ('', 'off'):
+        return None
+    latency = config['REPLAY_LATENCY']
+    if latency not in (None, '', 'recorded'):
+        latency = float(latency)
+    os.makedirs(config['UPSTREAM_ARCHIVE'], exist_ok=True)
+    return UpstreamArchive(config['UPSTREAM_ARCHIVE'], mode, latency or None, config['REPLAY_AT'] or None)
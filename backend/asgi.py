@@ -0,0 +1,8 @@
+from app import create_app
+from app.asgi import ASGIApplication
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Serve with any ASGI server, e.g. ``uvicorn asgi:application``.
+application = ASGIApplication(create_app())
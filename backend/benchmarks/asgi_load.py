@@ -0,0 +1,139 @@
+"""Load-test team endpoints through the sync WSGI path and the ASGI path against a local FPL API stub.
+
+The stub answers every request after ``latency`` seconds. Each simulated
+request asks for a different team, so entry and picks always go upstream
+while bootstrap and fixtures come from the response cache, as they would in
+production. The sync path is one worker with a fixed number of threads; the
+ASGI path is one event loop with many requests in flight.
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from benchmarks.payloads import synthetic_season
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, delayed ACKs add ~40 ms per response.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        payloads = server.payloads
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        if parts == ['bootstrap-static']:
+            payload = payloads['bootstrap']
+        elif parts == ['fixtures']:
+            payload = payloads['fixtures']
+        elif parts[:1] == ['entry'] and len(parts) == 2:
+            payload = {**payloads['entry'], 'id': int(parts[1])}
+        elif parts[:1] == ['entry'] and parts[2:3] == ['event']:
+            payload = payloads['picks']
+        elif parts[:1] == ['entry'] and parts[2:3] == ['history']:
+            payload = payloads['history']
+        else:
+            payload = None
+        time.sleep(server.latency)
+        body = json.dumps(payload).encode() if payload is not None else b'{}'
+        self.send_response(200 if payload is not None else 404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _stub_server(latency):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    server.daemon_threads = True
+    server.payloads, server.latency = synthetic_season(), latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _summary(mode, latencies, elapsed):
+    latencies = sorted(latencies)
+    return {'mode': mode, 'requests': len(latencies), 'rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(statistics.median(latencies) * 1000, 1),
+            'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1)}
+
+
+def _sync(app, team_ids, threads):
+    def one(team_id):
+        started = time.perf_counter()
+        response = app.test_client().get(f'/api/team/{team_id}/summary')
+        assert response.status_code == 200, response.get_json()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        latencies = list(executor.map(one, team_ids))
+    return _summary(f'sync, {threads} threads', latencies, time.perf_counter() - started)
+
+
+def _asgi(application, team_ids, in_flight):
+    async def one(team_id, limit):
+        async with limit:
+            started = time.perf_counter()
+            sent = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(message):
+                sent.append(message)
+
+            scope = {'type': 'http', 'method': 'GET', 'path': f'/api/team/{team_id}/summary', 'query_string': b'',
+                     'headers': [], 'http_version': '1.1', 'scheme': 'http', 'server': ('bench', 80), 'client': ('127.0.0.1', 0)}
+            await application(scope, receive, send)
+            assert sent[0]['status'] == 200, sent[1]['body'][:200]
+            return time.perf_counter() - started
+
+    async def run_all():
+        limit = asyncio.Semaphore(in_flight)
+        return await asyncio.gather(*(one(team_id, limit) for team_id in team_ids))
+
+    started = time.perf_counter()
+    latencies = asyncio.run(run_all())
+    return _summary(f'asgi, {in_flight} in flight', latencies, time.perf_counter() - started)
+
+
+def run(requests=400, latency=0.05, sync_threads=(1, 8), async_in_flight=(8, 64)):
+    server = _stub_server(latency)
+    # Configure the upstream layer before the app modules read their settings.
+    os.environ['FPL_API_BASE_URL'] = f'http://127.0.0.1:{server.server_address[1]}'
+    os.environ.setdefault('FPL_HTTP_HOST_CONCURRENCY', '64')
+    os.environ.setdefault('FPL_HTTP_POOL_SIZE', '64')
+    from app import create_app
+    from app.asgi import ASGIApplication
+    from app.utils.fpl_api import FPLAPIClient
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app({'TESTING': True, 'DATABASE': str(Path(directory) / 'bench.sqlite3')})
+        FPLAPIClient.warm_cache()
+        next_id = iter(range(1, 10 ** 6))
+        for threads in sync_threads:
+            rows.append(_sync(app, [next(next_id) for _ in range(requests)], threads))
+        for in_flight in async_in_flight:
+            application = ASGIApplication(app)
+            rows.append(_asgi(application, [next(next_id) for _ in range(requests)], in_flight))
+            application.close()
+    server.shutdown()
+    return rows
+
+
+if __name__ == '__main__':
+    for row in run():
+        print(row)
@@ -0,0 +1,54 @@
+"""Time the derived analysis endpoints rendered fresh, served from the derived-result cache, and revalidated with a 304."""
+
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from app import create_app
+from app.services.derived_cache import derived_cache
+from benchmarks.payloads import PayloadClient, synthetic_season
+
+PATHS = [
+    '/api/team/{team}/detailed-analysis',
+    '/api/team/{team}/transfer-analysis',
+    '/api/recommendations/{team}/transfers',
+    '/api/recommendations/{team}/differentials',
+    '/api/recommendations/{team}/all',
+]
+
+
+def _median_ms(client, path, repeats, expected_status, headers=None, before=None):
+    timings = []
+    for _ in range(repeats):
+        if before:
+            before()
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == expected_status, response.get_json()
+    return round(statistics.median(timings), 2), response
+
+
+def run(seed=2026, repeats=30):
+    payloads = synthetic_season(seed=seed)
+    fake = PayloadClient(payloads)
+    upstream = {name: getattr(fake, name) for name in ('get_bootstrap_static', 'get_fixtures', 'get_current_gameweek',
+                                                         'get_team_data', 'get_team_picks', 'get_team_history')}
+    rows = []
+    with tempfile.TemporaryDirectory() as directory, patch.multiple('app.utils.fpl_api.FPLAPIClient', **upstream):
+        client = create_app({'TESTING': True, 'DATABASE': str(Path(directory) / 'bench.sqlite3')}).test_client()
+        for path in PATHS:
+            path = path.format(team=payloads['team_id'])
+            uncached, _ = _median_ms(client, path, repeats, 200, before=derived_cache.invalidate)
+            cached, response = _median_ms(client, path, repeats, 200)
+            revalidated, _ = _median_ms(client, path, repeats, 304, headers={'If-None-Match': response.headers['ETag']})
+            rows.append({'endpoint': path, 'uncached_ms': uncached, 'cached_ms': cached, 'not_modified_ms': revalidated,
+                         'body_kib': round(len(response.data) / 1024, 1)})
+    return rows
+
+
+if __name__ == '__main__':
+    for row in run():
+        print(row)
@@ -0,0 +1,58 @@
+"""Measure instrumentation overhead: per span, and per request on team endpoints with it enabled and disabled."""
+
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from app import create_app
+from app.utils import instrumentation
+from benchmarks.payloads import PayloadClient, synthetic_season
+
+PATHS = ['/api/team/{team}/summary', '/api/team/{team}/detailed-analysis', '/api/recommendations/{team}/all']
+
+
+def _span_ns(enabled, calls=200000):
+    instrumentation.configure(enabled)
+    started = time.perf_counter()
+    for _ in range(calls):
+        with instrumentation.span('service', 'benchmark'):
+            pass
+    return round((time.perf_counter() - started) / calls * 1e9)
+
+
+def _median_ms(client, path, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.get_json()
+    return round(statistics.median(timings), 3)
+
+
+def run(repeats=200):
+    payloads = synthetic_season()
+    fake = PayloadClient(payloads)
+    upstream = {name: getattr(fake, name) for name in ('get_bootstrap_static', 'get_fixtures', 'get_current_gameweek',
+                                                         'get_team_data', 'get_team_picks', 'get_team_history')}
+    rows = [{'span': 'disabled', 'ns_per_span': _span_ns(False)}, {'span': 'enabled', 'ns_per_span': _span_ns(True)}]
+    with tempfile.TemporaryDirectory() as directory, patch.multiple('app.utils.fpl_api.FPLAPIClient', **upstream):
+        clients = {enabled: create_app({'TESTING': True, 'METRICS_ENABLED': enabled,
+                                        'DATABASE': str(Path(directory) / 'bench.sqlite3')}).test_client()
+                   for enabled in (False, True)}
+        for path in PATHS:
+            path = path.format(team=payloads['team_id'])
+            row = {'endpoint': path}
+            for enabled, client in clients.items():
+                # Each app switches the process-wide flag when created; set it for the client being timed.
+                instrumentation.configure(enabled)
+                row['enabled_ms' if enabled else 'disabled_ms'] = _median_ms(client, path, repeats)
+            rows.append(row)
+    return rows
+
+
+if __name__ == '__main__':
+    for row in run():
+        print(row)
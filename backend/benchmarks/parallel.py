@@ -0,0 +1,66 @@
+"""Time the transfer planners and the beam squad builder on 1, 2, 4 and 8 pool workers.
+
+Each row reports the median wall time after a warm-up call that also starts
+the pool, the speed-up over one worker, and whether the result matched the
+in-process one. Speed-up is bounded by the cores actually available, which
+the first row reports. Horizon plans are compared on their solutions, since
+shards count their own search work.
+"""
+
+import os
+import statistics
+import time
+
+from app.services.projection_engine import build_baseline_projections
+from app.services.squad_optimizer import optimize_squad
+from app.services.transfer_planner import plan_one_transfer, plan_transfer_horizon
+from app.utils import process_pool
+from benchmarks.payloads import DEFAULT_PAYLOADS, load_payloads
+
+WORKER_COUNTS = (1, 2, 4, 8)
+HORIZON = 5
+# The synthetic season's beam only finds a squad with a generous budget; the search size is the same either way.
+SQUAD_BUDGET = 2000
+
+
+def _scenarios():
+    payloads = load_payloads(DEFAULT_PAYLOADS)
+    players, current = payloads['bootstrap']['elements'], payloads['current_gameweek']
+    gameweeks = list(range(current, current + HORIZON))
+    projections, _ = build_baseline_projections(players, payloads['fixtures'], gameweeks)
+    values = {(row['fpl_player_id'], row['gameweek']): row['expected_points'] for row in projections}
+    picks = [{'fpl_player_id': pick['element'], 'selling_price_tenths': pick['selling_price']} for pick in payloads['picks']['picks']]
+    snapshot = {'bank_tenths': payloads['entry']['last_deadline_bank'], 'free_transfers': 1}
+    return {
+        'plan_one_transfer': lambda: plan_one_transfer(snapshot, picks, players, values, gameweeks),
+        'plan_transfer_horizon_3': lambda: plan_transfer_horizon(snapshot, picks, players, values, gameweeks, max_transfers=3)['solutions'],
+        'optimize_squad_beam_alternatives': lambda: optimize_squad(players, values, gameweeks[:3], SQUAD_BUDGET, alternative_count=3),
+    }
+
+
+def run(repeats=3):
+    previous = process_pool.worker_count()
+    rows = [{'cpus': os.cpu_count()}]
+    try:
+        for name, fn in _scenarios().items():
+            expected, single = None, None
+            for workers in WORKER_COUNTS:
+                process_pool.configure(workers)
+                result = fn()
+                timings = []
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    fn()
+                    timings.append((time.perf_counter() - started) * 1000)
+                median = statistics.median(timings)
+                expected, single = (result, median) if workers == 1 else (expected, single)
+                rows.append({'scenario': name, 'workers': workers, 'median_ms': round(median, 3),
+                             'speedup': round(single / median, 2), 'matches_in_process': result == expected})
+    finally:
+        process_pool.configure(previous)
+    return rows
+
+
+if __name__ == '__main__':
+    for row in run():
+        print(row)
@@ -0,0 +1,160 @@
+"""Full-size FPL-shaped payloads and an offline client for benchmarks."""
+
+import gzip
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+CLUB_NAMES = ['ARS', 'AVL', 'BOU', 'BRE', 'BHA', 'BUR', 'CHE', 'CRY', 'EVE', 'FUL',
+              'LEE', 'LIV', 'MCI', 'MUN', 'NEW', 'NFO', 'SUN', 'TOT', 'WHU', 'WOL']
+# Squad shape per club: 4 GK, 11 DEF, 13 MID, 7 FWD -> 700 players in total.
+CLUB_SQUAD = [1] * 4 + [2] * 11 + [3] * 13 + [4] * 7
+BASE_PRICE = {1: 40, 2: 40, 3: 45, 4: 45}
+SEASON_START = datetime(2026, 8, 14, 17, 30, tzinfo=timezone.utc)
+# Checked-in snapshot of ``synthetic_season()``, so suite results do not move when the generator changes.
+DEFAULT_PAYLOADS = Path(__file__).resolve().parent / 'data' / 'season-2026-gw10.json.gz'
+
+
+def _round_robin(clubs):
+    """Circle-method schedule: each club meets every other club home and away."""
+    clubs = list(clubs)
+    rounds = []
+    for _ in range(len(clubs) - 1):
+        rounds.append([(clubs[i], clubs[-1 - i]) for i in range(len(clubs) // 2)])
+        clubs = [clubs[0], clubs[-1]] + clubs[1:-1]
+    return rounds + [[(away, home) for home, away in round_] for round_ in rounds]
+
+
+def synthetic_season(seed: int = 2026, current_gameweek: int = 10, team_id: int = 1) -> Dict[str, Any]:
+    """Deterministic bootstrap, fixtures, entry, picks and history in the official shape.
+
+    Sizes match a real season (20 clubs, ~700 players, 380 fixtures, 38
+    gameweeks) and the fixture list contains postponed (``event`` = None),
+    blank and double gameweeks.
+    """
+    rng = random.Random(seed)
+    strength = {club: rng.randint(1, 5) for club in range(1, 21)}
+    teams = [{'id': club, 'code': 100 + club, 'name': name, 'short_name': name, 'strength': strength[club]}
+             for club, name in enumerate(CLUB_NAMES, 1)]
+    events = []
+    for gameweek in range(1, 39):
+        deadline = SEASON_START + timedelta(days=7 * (gameweek - 1))
+        events.append({'id': gameweek, 'name': f'Gameweek {gameweek}', 'deadline_time': deadline.isoformat().replace('+00:00', 'Z'),
+                       'is_current': gameweek == current_gameweek, 'is_next': gameweek == current_gameweek + 1,
+                       'finished': gameweek < current_gameweek})
+    elements, player_id = [], 0
+    for club in range(1, 21):
+        for position in CLUB_SQUAD:
+            player_id += 1
+            quality = rng.random() ** 2
+            status = rng.choices(['a', 'd', 'i', 'u', 's'], weights=[86, 5, 5, 3, 1])[0]
+            minutes = int(rng.random() ** 0.7 * 90 * (current_gameweek - 1))
+            form = round(max(0.0, rng.gauss(2.5 + 5 * quality, 1.5)), 1)
+            elements.append({
+                'id': player_id, 'code': 200000 + player_id * 7, 'web_name': f'Player{player_id}',
+                'first_name': 'Synthetic', 'second_name': f'Player {player_id}', 'element_type': position, 'team': club,
+                'now_cost': BASE_PRICE[position] + 5 * int(quality * 18) + rng.randint(0, 4),
+                'form': f'{form:.1f}', 'points_per_game': f'{form * 0.9:.1f}',
+                'selected_by_percent': f'{min(80.0, rng.random() ** 3 * 100 * (0.3 + quality)):.1f}',
+                'minutes': minutes, 'total_points': int(minutes / 90 * (1 + 5 * quality)),
+                'goals_scored': int(quality * 15 * (position / 4)), 'assists': int(quality * 10), 'clean_sheets': int(minutes / 400),
+                'status': status, 'news': '' if status == 'a' else 'Knock - 75% chance of playing',
+                'chance_of_playing_next_round': None if status == 'a' else rng.choice([0, 25, 50, 75]),
+                'chance_of_playing_this_round': None if status == 'a' else rng.choice([0, 25, 50, 75]),
+            })
+    fixtures, fixture_id = [], 0
+    for gameweek, round_ in enumerate(_round_robin(range(1, 21)), 1):
+        for home, away in round_:
+            fixture_id += 1
+            event = gameweek
+            roll = rng.random()
+            if roll < 0.015:
+                event = None
+            elif roll < 0.03 and gameweek < 38:
+                event = gameweek + 1
+            kickoff = SEASON_START + timedelta(days=7 * ((event or gameweek) - 1) + 1, hours=rng.choice([12, 14, 16]))
+            fixtures.append({'id': fixture_id, 'code': 5000000 + fixture_id, 'event': event, 'team_h': home, 'team_a': away,
+                             'team_h_difficulty': max(2, min(5, strength[away] + 1)), 'team_a_difficulty': max(2, min(5, strength[home] + 1)),
+                             'kickoff_time': kickoff.isoformat().replace('+00:00', 'Z'), 'finished': (event or 99) < current_gameweek,
+                             'team_h_score': None, 'team_a_score': None})
+    fixtures.sort(key=lambda fixture: (fixture['event'] is None, fixture['event'] or 0, fixture['kickoff_time'], fixture['id']))
+    picks = _legal_picks(rng, elements)
+    bank = 1000 - sum(pick['selling_price'] for pick in picks)
+    entry = {'id': team_id, 'name': 'Synthetic XI', 'player_first_name': 'Bench', 'player_last_name': 'Mark',
+             'favourite_team': 1, 'summary_overall_points': 480, 'summary_overall_rank': 123456,
+             'last_deadline_bank': bank, 'transfers_available': 1, 'current_event': current_gameweek}
+    history = {'current': [{'event': gameweek, 'points': 40 + gameweek % 20, 'total_points': 50 * gameweek, 'overall_rank': 100000 + gameweek,
+                            'bank': 5, 'value': 1000 + gameweek, 'event_transfers': gameweek % 2, 'event_transfers_cost': 0}
+                           for gameweek in range(1, current_gameweek)],
+               'chips': [{'name': 'wildcard', 'event': 4}]}
+    picks_payload = {'active_chip': None, 'picks': picks,
+                     'entry_history': {'event': current_gameweek, 'points': 55, 'total_points': 480, 'bank': bank, 'value': 1000,
+                                       'event_transfers': 1, 'event_transfers_cost': 0}}
+    return {'bootstrap': {'events': events, 'teams': teams, 'elements': elements,
+                          'element_types': [{'id': 1, 'singular_name_short': 'GKP'}, {'id': 2, 'singular_name_short': 'DEF'},
+                                            {'id': 3, 'singular_name_short': 'MID'}, {'id': 4, 'singular_name_short': 'FWD'}]},
+            'fixtures': fixtures, 'entry': entry, 'picks': picks_payload, 'history': history,
+            'team_id': team_id, 'current_gameweek': current_gameweek}
+
+
+def _legal_picks(rng, elements):
+    need, clubs, chosen = {1: 2, 2: 5, 3: 5, 4: 3}, {}, []
+    pool = [player for player in elements if player['status'] == 'a' and player['now_cost'] <= 70]
+    rng.shuffle(pool)
+    for player in pool:
+        position, club = player['element_type'], player['team']
+        if need[position] and clubs.get(club, 0) < 3:
+            need[position] -= 1
+            clubs[club] = clubs.get(club, 0) + 1
+            chosen.append(player)
+    chosen.sort(key=lambda player: player['element_type'])
+    return [{'element': player['id'], 'position': index, 'multiplier': 2 if index == 1 else (1 if index <= 11 else 0),
+             'is_captain': index == 1, 'is_vice_captain': index == 2,
+             'purchase_price': player['now_cost'], 'selling_price': player['now_cost']}
+            for index, player in enumerate(chosen, 1)]
+
+
+def load_payloads(path=DEFAULT_PAYLOADS) -> Dict[str, Any]:
+    """Read a payload set written by ``save_payloads``; ``.gz`` files are decompressed."""
+    path = Path(path)
+    raw = path.read_bytes()
+    return json.loads(gzip.decompress(raw) if path.suffix == '.gz' else raw)
+
+
+def save_payloads(payloads: Dict[str, Any], path=DEFAULT_PAYLOADS) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    raw = json.dumps(payloads, sort_keys=True, separators=(',', ':')).encode()
+    path.write_bytes(gzip.compress(raw, 9, mtime=0) if path.suffix == '.gz' else raw)
+
+
+class PayloadClient:
+    """Offline stand-in for ``FPLAPIClient`` that serves one payload set."""
+
+    def __init__(self, payloads: Dict[str, Any]):
+        self.payloads = payloads
+
+    def get_bootstrap_static(self):
+        return self.payloads['bootstrap']
+
+    def get_fixtures(self):
+        return self.payloads['fixtures']
+
+    def get_current_gameweek(self):
+        return next((event['id'] for event in self.payloads['bootstrap']['events'] if event['is_current']), 1)
+
+    def get_team_data(self, team_id):
+        return self.payloads['entry']
+
+    def get_team_picks(self, team_id, gameweek):
+        return self.payloads['picks']
+
+    def get_team_history(self, team_id):
+        return self.payloads['history']
+
+
+if __name__ == '__main__':
+    save_payloads(synthetic_season())
+    print(DEFAULT_PAYLOADS)
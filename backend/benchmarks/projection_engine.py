@@ -0,0 +1,37 @@
+"""Compare the scalar and columnar baseline projection models on full-season horizons."""
+
+import time
+
+from app.services.projection_engine import _scalar_baseline_projections, build_projection_matrix
+from benchmarks.payloads import synthetic_season
+
+
+def _ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def run(seeds=(2026, 1), horizons=(1, 5, 38)):
+    rows = []
+    for seed in seeds:
+        payloads = synthetic_season(seed=seed)
+        players, fixtures = payloads['bootstrap']['elements'], payloads['fixtures']
+        for horizon in horizons:
+            gameweeks = list(range(1, horizon + 1))
+            started = time.perf_counter()
+            scalar, _ = _scalar_baseline_projections(players, fixtures, gameweeks)
+            scalar_ms = _ms(started)
+            started = time.perf_counter()
+            projection = build_projection_matrix(players, fixtures, gameweeks)
+            projection.expected_points
+            matrix_ms = _ms(started)
+            started = time.perf_counter()
+            streamed = list(projection.rows())
+            rows_ms = _ms(started) + matrix_ms
+            rows.append({'seed': seed, 'gameweeks': horizon, 'rows': len(streamed), 'identical': streamed == scalar,
+                         'scalar_ms': scalar_ms, 'matrix_ms': matrix_ms, 'matrix_and_rows_ms': round(rows_ms, 1)})
+    return rows
+
+
+if __name__ == '__main__':
+    for row in run():
+        print(row)
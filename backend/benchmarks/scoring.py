@@ -0,0 +1,35 @@
+"""Compare the columnar and scalar recommendation rankings on a full-size season."""
+
+import time
+
+from app.services.data_context import FPLDataContext
+from app.services.recommendation_engine import RecommendationEngine
+from benchmarks.payloads import PayloadClient, synthetic_season
+
+
+def _best_of(repeats, fn):
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run(repeats: int = 20):
+    payloads = synthetic_season()
+    engine = RecommendationEngine(payloads['team_id'], FPLDataContext(PayloadClient(payloads)))
+    timings = {}
+    for vectorized in (False, True):
+        engine.vectorized = vectorized
+        timings[vectorized] = _best_of(repeats, lambda: (engine.get_best_transfers_per_position(),
+                                                          engine.get_high_upside_differentials()))
+    if timings[True][1] != timings[False][1]:
+        raise AssertionError('Vectorized rankings differ from the scalar reference.')
+    scalar, vectorized = timings[False][0], timings[True][0]
+    return {'players': len(payloads['bootstrap']['elements']), 'scalar_ms': round(scalar * 1000, 2),
+            'vectorized_ms': round(vectorized * 1000, 2), 'speedup': round(scalar / vectorized, 1)}
+
+
+if __name__ == '__main__':
+    print(run())
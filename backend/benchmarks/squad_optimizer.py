@@ -0,0 +1,40 @@
+"""Compare the bounded-beam and exact squad optimizers on full-size seasons."""
+
+import time
+
+from app.services.projection_engine import build_baseline_projections
+from app.services.squad_optimizer import optimize_squad
+from benchmarks.payloads import synthetic_season
+
+
+def _projection_values(payloads, gameweeks):
+    projections, _ = build_baseline_projections(payloads['bootstrap']['elements'], payloads['fixtures'], gameweeks)
+    return {(row['fpl_player_id'], row['gameweek']): row['expected_points'] for row in projections}
+
+
+def _timed(players, values, gameweeks, budget, mode):
+    started = time.perf_counter()
+    result = optimize_squad(players, values, gameweeks, budget, mode=mode)
+    points = result['solutions'][0]['projected_points'] if result.get('solutions') else None
+    return {'status': result['status'], 'points': points, 'ms': round((time.perf_counter() - started) * 1000, 1),
+            'gap': result['solver']['optimality_gap']}
+
+
+def run(seeds=(2026, 1), budgets=(900, 1000), horizons=(1, 3)):
+    rows = []
+    for seed in seeds:
+        payloads = synthetic_season(seed=seed)
+        players, current = payloads['bootstrap']['elements'], payloads['current_gameweek']
+        for horizon in horizons:
+            gameweeks = list(range(current, current + horizon))
+            values = _projection_values(payloads, gameweeks)
+            for budget in budgets:
+                rows.append({'seed': seed, 'gameweeks': horizon, 'budget': budget,
+                             'beam': _timed(players, values, gameweeks, budget, 'beam'),
+                             'exact': _timed(players, values, gameweeks, budget, 'exact')})
+    return rows
+
+
+if __name__ == '__main__':
+    for row in run():
+        print(row)
@@ -0,0 +1,53 @@
+"""Time tracked-team and planning endpoints with pooled and per-call SQLite connections."""
+
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from app import create_app
+from benchmarks.payloads import PayloadClient, synthetic_season
+
+REQUESTS = [
+    ('GET', '/api/tracked-teams/{team}', None),
+    ('GET', '/api/tracked-teams/{team}/snapshots', None),
+    ('GET', '/api/v1/tracked-teams/{team}/strategy', None),
+    ('GET', '/api/v1/projections/latest', None),
+    ('POST', '/api/v1/tracked-teams/{team}/optimizations/transfers', {'gameweeks': [10, 11, 12]}),
+]
+
+
+def _client(directory, payloads, pooled):
+    app = create_app({'TESTING': True, 'DATABASE': str(Path(directory) / f'pool-{pooled}.sqlite3'), 'SQLITE_POOL': pooled})
+    client = app.test_client()
+    client.post(f"/api/tracked-teams/{payloads['team_id']}/refresh")
+    client.post('/api/v1/projections/refresh', json={'gameweeks': list(range(10, 16))})
+    return client
+
+
+def run(seed=2026, repeats=50):
+    payloads = synthetic_season(seed=seed)
+    fake = PayloadClient(payloads)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory, \
+            patch('app.routes.tracked_team_routes.FPLAPIClient', fake), patch('app.routes.planning_routes.FPLAPIClient', fake):
+        clients = {pooled: _client(directory, payloads, pooled) for pooled in (False, True)}
+        for method, path, body in REQUESTS:
+            path = path.format(team=payloads['team_id'])
+            row = {'endpoint': f'{method} {path}'}
+            for pooled, client in clients.items():
+                timings = []
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    response = client.open(path, method=method, json=body)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    assert response.status_code == 200, response.get_json()
+                row['pooled_ms' if pooled else 'per_call_ms'] = round(statistics.median(timings), 2)
+            rows.append(row)
+    return rows
+
+
+if __name__ == '__main__':
+    for row in run():
+        print(row)
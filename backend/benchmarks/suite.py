@@ -0,0 +1,161 @@
+"""Benchmark the planning and analysis hot paths on a full-size payload set and compare against a saved baseline.
+
+Run ``python -m benchmarks.suite --output results.json`` to record a run, then
+``python -m benchmarks.suite --baseline results.json`` to compare a later run
+against it; the command exits with status 1 when any scenario regressed by
+more than ``--threshold``. Payloads default to the checked-in snapshot, and
+``--payloads`` accepts any file written by ``benchmarks.payloads.save_payloads``.
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.data_context import FPLDataContext
+from app.services.projection_engine import build_baseline_projections
+from app.services.recommendation_engine import RecommendationEngine
+from app.services.squad_optimizer import optimize_squad
+from app.services.squad_transfer_analyzer import SquadTransferAnalyzer
+from app.services.transfer_planner import plan_one_transfer, plan_transfer_horizon
+from benchmarks.payloads import DEFAULT_PAYLOADS, PayloadClient, load_payloads
+
+DEFAULT_THRESHOLD = 0.15
+COMPARED_METRICS = ('median_ms', 'peak_kib')
+# Differences below these are timer or allocator noise, whatever the ratio.
+NOISE_FLOOR = {'median_ms': 1.0, 'peak_kib': 64.0}
+HORIZON = 5
+
+
+def _scenarios(payloads) -> Dict[str, Callable[[], Any]]:
+    """Zero-argument callables over shared inputs; building the inputs is not timed."""
+    players, fixtures, team_id = payloads['bootstrap']['elements'], payloads['fixtures'], payloads['team_id']
+    current = payloads['current_gameweek']
+    gameweeks = list(range(current, current + HORIZON))
+    projections, _ = build_baseline_projections(players, fixtures, gameweeks)
+    values = {(row['fpl_player_id'], row['gameweek']): row['expected_points'] for row in projections}
+    picks = [{'fpl_player_id': pick['element'], 'selling_price_tenths': pick['selling_price']} for pick in payloads['picks']['picks']]
+    snapshot = {'bank_tenths': payloads['entry']['last_deadline_bank'], 'free_transfers': 1}
+    client = PayloadClient(payloads)
+    return {
+        'build_baseline_projections': lambda: build_baseline_projections(players, fixtures, gameweeks),
+        'optimize_squad_beam': lambda: optimize_squad(players, values, gameweeks[:3], 1000),
+        'optimize_squad_exact': lambda: optimize_squad(players, values, gameweeks[:3], 1000, mode='exact'),
+        'plan_one_transfer': lambda: plan_one_transfer(snapshot, picks, players, values, gameweeks),
+        'plan_transfer_horizon': lambda: plan_transfer_horizon(snapshot, picks, players, values, gameweeks, max_transfers=2),
+        'smart_recommendations': lambda: RecommendationEngine(team_id, FPLDataContext(client)).get_smart_recommendations(),
+        'squad_transfer_analysis': lambda: SquadTransferAnalyzer(team_id, FPLDataContext(client)).analyze_squad_for_transfers(),
+    }
+
+
+def measure(fn: Callable[[], Any], repeats: int) -> Dict[str, Any]:
+    """Wall time over ``repeats`` calls after a warm-up, then memory from one traced call.
+
+    Tracing slows allocation-heavy code, so it gets its own call instead of
+    skewing the timed ones. ``peak_kib`` is the largest traced heap growth
+    during the call; ``allocated_blocks`` is the net change in live heap
+    blocks, i.e. what the call leaves allocated, caches included. CPython
+    keeps no cumulative allocation count to report instead. A
+    result's ``status`` is kept so a fast failure cannot pass for a speed-up.
+    """
+    result = fn()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        blocks_after = sys.getallocatedblocks()
+    finally:
+        tracemalloc.stop()
+    status = result.get('status') if isinstance(result, dict) else None
+    return {'status': status, 'repeats': repeats, 'median_ms': round(statistics.median(timings), 3), 'min_ms': round(min(timings), 3),
+            'max_ms': round(max(timings), 3), 'peak_kib': round(peak / 1024, 1), 'allocated_blocks': blocks_after - blocks_before}
+
+
+def _digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+def run(payloads_path=DEFAULT_PAYLOADS, repeats: int = 5, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    payloads_path = Path(payloads_path)
+    scenarios = _scenarios(load_payloads(payloads_path))
+    unknown = sorted(set(only or []) - set(scenarios))
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(unknown)}. Available: {', '.join(scenarios)}.")
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': f'{platform.system()} {platform.machine()}',
+        'payloads': {'name': payloads_path.name, 'sha256': _digest(payloads_path)},
+        'scenarios': {name: measure(fn, repeats) for name, fn in scenarios.items() if not only or name in only},
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """One row per scenario and metric present in both runs, flagged when it grew by more than ``threshold``.
+
+    A scenario whose result status changed is flagged as well.
+    """
+    rows = []
+    for name, result in current['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = previous.get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            ratio = after / before if before else float('inf')
+            regressed = ratio > 1 + threshold and after - before > NOISE_FLOOR[metric]
+            rows.append({'scenario': name, 'metric': metric, 'baseline': before, 'current': after,
+                         'change': round(ratio - 1, 3), 'regressed': regressed})
+        if previous.get('status') != result.get('status'):
+            rows.append({'scenario': name, 'metric': 'status', 'baseline': previous.get('status'), 'current': result.get('status'),
+                         'change': None, 'regressed': True})
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--payloads', default=str(DEFAULT_PAYLOADS), help='Payload set to benchmark against.')
+    parser.add_argument('--repeats', type=int, default=5, help='Timed calls per scenario after one warm-up call.')
+    parser.add_argument('--scenario', action='append', dest='scenarios', help='Run only this scenario; repeat for several.')
+    parser.add_argument('--output', help='Write the results as JSON to this path.')
+    parser.add_argument('--baseline', help='Compare against results previously written with --output.')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Allowed growth before a metric counts as regressed.')
+    args = parser.parse_args(argv)
+
+    results = run(args.payloads, args.repeats, args.scenarios)
+    for name, result in results['scenarios'].items():
+        print({'scenario': name, **result})
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + '\n')
+    if not args.baseline:
+        return 0
+    baseline = json.loads(Path(args.baseline).read_text())
+    if baseline.get('payloads', {}).get('sha256') != results['payloads']['sha256']:
+        print('warning: the baseline was recorded against different payloads')
+    rows = compare(results, baseline, args.threshold)
+    for row in rows:
+        print(row)
+    regressions = [row for row in rows if row['regressed']]
+    print(f'{len(regressions)} regression(s) above {args.threshold:.0%}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
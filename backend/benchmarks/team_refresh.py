@@ -0,0 +1,62 @@
+"""Time refreshing many tracked teams one by one and as a concurrent batch, with simulated upstream latency."""
+
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.team_refresh import refresh_tracked_teams
+from app.services.tracked_team_store import TrackedTeamStore, initialize_database
+from benchmarks.payloads import PayloadClient, synthetic_season
+
+
+class SlowClient(PayloadClient):
+    """``PayloadClient`` that waits ``latency`` seconds per team request, like a remote API."""
+
+    def __init__(self, payloads, latency):
+        super().__init__(payloads)
+        self.latency = latency
+
+    def get_team_data(self, team_id):
+        time.sleep(self.latency)
+        return {**super().get_team_data(team_id), 'id': team_id}
+
+    def get_team_picks(self, team_id, gameweek):
+        time.sleep(self.latency)
+        return super().get_team_picks(team_id, gameweek)
+
+    def get_team_history(self, team_id):
+        time.sleep(self.latency)
+        return super().get_team_history(team_id)
+
+
+def _sequential(store, client, team_ids):
+    started = time.perf_counter()
+    gameweek = client.get_current_gameweek()
+    for team_id in team_ids:
+        store.import_team(team_id, 'current', client.get_team_data(team_id), gameweek,
+                          client.get_team_picks(team_id, gameweek), client.get_team_history(team_id))
+    return round(time.perf_counter() - started, 3)
+
+
+def run(team_count=200, latency=0.02, workers=(8, 16)):
+    client = SlowClient(synthetic_season(), latency)
+    team_ids = list(range(1, team_count + 1))
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / 'sequential.sqlite3')
+        initialize_database(path)
+        rows.append({'mode': 'sequential', 'teams': team_count, 'seconds': _sequential(TrackedTeamStore(path), client, team_ids)})
+        for max_workers in workers:
+            path = str(Path(directory) / f'batch-{max_workers}.sqlite3')
+            initialize_database(path)
+            store = TrackedTeamStore(path)
+            for label in ('batch', 'batch unchanged'):
+                result = refresh_tracked_teams(store, client, 'current', team_ids, max_workers)
+                rows.append({'mode': label, 'workers': max_workers, 'teams': team_count,
+                             'seconds': result['elapsed_seconds'], 'summary': result['summary']})
+    return rows
+
+
+if __name__ == '__main__':
+    for row in run():
+        print(row)
@@ -0,0 +1,35 @@
+"""Time the rolling transfer planner on full-size seasons for growing transfer counts.
+
+Rows run with the planner's default time limit and say when it was reached,
+that is when the plans were not proven best for the shortlist.
+"""
+
+import time
+
+from app.services.transfer_planner import plan_transfer_horizon
+from benchmarks.payloads import synthetic_season
+from benchmarks.squad_optimizer import _projection_values
+
+
+def run(seeds=(2026, 1), horizon=5, transfer_counts=(1, 2, 3)):
+    rows = []
+    for seed in seeds:
+        payloads = synthetic_season(seed=seed)
+        current = payloads['current_gameweek']
+        gameweeks = list(range(current, current + horizon))
+        values = _projection_values(payloads, gameweeks)
+        picks = [{'fpl_player_id': pick['element'], 'selling_price_tenths': pick['selling_price']} for pick in payloads['picks']['picks']]
+        snapshot = {'bank_tenths': payloads['entry']['last_deadline_bank'], 'free_transfers': 1}
+        for max_transfers in transfer_counts:
+            started = time.perf_counter()
+            result = plan_transfer_horizon(snapshot, picks, payloads['bootstrap']['elements'], values, gameweeks, max_transfers=max_transfers)
+            best = result['solutions'][0]['net_gain'] if result['solutions'] else None
+            rows.append({'seed': seed, 'max_transfers': max_transfers, 'status': result['status'], 'net_gain': best,
+                         'ms': round((time.perf_counter() - started) * 1000, 1), 'evaluations': result['solver']['evaluations'],
+                         'time_limit_reached': any('time limit' in warning for warning in result['warnings'])})
+    return rows
+
+
+if __name__ == '__main__':
+    for row in run():
+        print(row)
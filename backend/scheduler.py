@@ -0,0 +1,15 @@
+from app import create_app
+from app.services.background_refresh import scheduler_from_config
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# A dedicated refresh process, for servers started without FPL_SCHEDULER_ENABLED.
+app = create_app({'SCHEDULER_ENABLED': False})
+
+if __name__ == '__main__':
+    scheduler = scheduler_from_config(app.config)
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
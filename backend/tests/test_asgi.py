@@ -0,0 +1,121 @@
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import patch
+
+from app import create_app
+from app.asgi import ASGIApplication
+from app.utils.fpl_api import FPLResourceNotFound
+
+BOOTSTRAP = {
+    "events": [{"id": 3, "is_current": True, "finished": False, "deadline_time": "2026-09-01T17:30:00Z"}],
+    "teams": [{"id": 1, "name": "Arsenal", "short_name": "ARS"}],
+    "element_types": [{"id": 1, "singular_name_short": "GKP"}],
+    "elements": [{"id": 10, "web_name": "Keeper", "team": 1, "element_type": 1, "now_cost": 45, "form": "3.0",
+                  "total_points": 20, "minutes": 180, "status": "a", "selected_by_percent": "5.0", "points_per_game": "3.0"}],
+}
+ENTRY = {"name": "Async XI", "player_first_name": "Ada", "player_last_name": "Lovelace", "summary_overall_points": 300,
+         "summary_overall_rank": 1000, "summary_event_points": 60, "last_deadline_bank": 5, "last_deadline_value": 1000}
+PICKS = {"active_chip": None, "entry_history": {"bank": 5, "value": 1000, "points": 60},
+         "picks": [{"element": 10, "position": 1, "multiplier": 1, "is_captain": True, "is_vice_captain": False}]}
+
+
+class SlowUpstream:
+    """Each team call takes ``delay`` seconds; tracks how many ran at the same time."""
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def _slow(self, payload):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return payload
+
+    def team_data(self, team_id):
+        if team_id == 404:
+            raise FPLResourceNotFound("Team 404 was not found.")
+        return self._slow(ENTRY)
+
+    def team_picks(self, team_id, gameweek):
+        return self._slow(PICKS)
+
+
+def _patched(upstream):
+    return [patch("app.utils.fpl_api.FPLAPIClient.get_bootstrap_static", return_value=BOOTSTRAP),
+            patch("app.utils.fpl_api.FPLAPIClient.get_fixtures", return_value=[]),
+            patch("app.utils.fpl_api.FPLAPIClient.get_team_data", side_effect=upstream.team_data),
+            patch("app.utils.fpl_api.FPLAPIClient.get_team_picks", side_effect=upstream.team_picks)]
+
+
+async def _request(application, method, path, body=b""):
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    path, _, query = path.partition("?")
+    scope = {"type": "http", "method": method, "path": path, "query_string": query.encode(), "headers": [(b"content-type", b"application/json")],
+             "http_version": "1.1", "scheme": "http", "server": ("testserver", 80), "client": ("127.0.0.1", 5000), "root_path": ""}
+    await application(scope, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def test_team_endpoints_match_the_sync_path_and_fetch_concurrently(tmp_path):
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "tracker.sqlite3")})
+    upstream = SlowUpstream()
+    patches = _patched(upstream)
+    for active in patches:
+        active.start()
+    try:
+        expected = app.test_client().get("/api/team/7/summary")
+        application = ASGIApplication(app)
+        started = time.perf_counter()
+        status, body = asyncio.run(_request(application, "GET", "/api/team/7/summary"))
+        elapsed = time.perf_counter() - started
+        missing = asyncio.run(_request(application, "GET", "/api/team/404/summary"))
+        application.close()
+    finally:
+        for active in patches:
+            active.stop()
+
+    assert (status, body) == (expected.status_code, expected.get_json())
+    assert elapsed < 0.18
+    assert upstream.peak == 2
+    assert missing[0] == 404 and missing[1]["error"]["code"] == "not_found"
+
+
+def test_other_routes_and_lifespan_pass_through(tmp_path):
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "tracker.sqlite3")})
+    application = ASGIApplication(app)
+
+    async def scenario():
+        rejected = await _request(application, "POST", "/api/tracked-teams/refresh", json.dumps({"team_ids": "7"}).encode())
+        listed = await _request(application, "GET", "/api/tracked-teams")
+        events = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return events.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        await application({"type": "lifespan"}, receive, send)
+        return rejected, listed, sent
+
+    rejected, listed, lifespan = asyncio.run(scenario())
+
+    assert rejected[0] == 400 and rejected[1]["error"]["code"] == "invalid_input"
+    assert listed == (200, {"teams": []})
+    assert lifespan == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
@@ -0,0 +1,168 @@
+import random
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+from app import create_app
+from app.services.background_refresh import RefreshScheduler
+from app.services.tracked_team_store import initialize_database
+
+START = time.time()
+
+
+def _deadline(offset_seconds):
+    return datetime.fromtimestamp(START + offset_seconds, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class FakeClient:
+    def __init__(self):
+        self.warmed = 0
+        self.form = "4.0"
+        self.team_requests = []
+
+    def warm_cache(self):
+        self.warmed += 1
+
+    def get_bootstrap_static(self):
+        return {
+            "events": [
+                {"id": 1, "deadline_time": _deadline(-8 * 86400), "is_current": False, "finished": True},
+                {"id": 2, "deadline_time": _deadline(-3600), "is_current": True, "finished": False},
+                {"id": 3, "deadline_time": _deadline(600), "is_current": False, "finished": False},
+            ],
+            "elements": [{"id": player_id, "team": player_id % 2 + 1, "form": self.form, "status": "a"} for player_id in range(1, 5)],
+        }
+
+    def get_fixtures(self):
+        return [{"event": 3, "team_h": 1, "team_a": 2, "team_h_difficulty": 3, "team_a_difficulty": 3}]
+
+    def get_current_gameweek(self):
+        return 2
+
+    def get_team_data(self, team_id):
+        self.team_requests.append(team_id)
+        return {"name": f"Team {team_id}", "summary_overall_points": 100, "summary_overall_rank": 5000, "transfers_available": 1}
+
+    def get_team_picks(self, team_id, gameweek):
+        return {"entry_history": {"points": 50, "bank": 5}, "picks": [{"element": 1, "position": 1, "multiplier": 2, "is_captain": True}]}
+
+    def get_team_history(self, team_id):
+        return {"current": [], "chips": []}
+
+
+def _scheduler(tmp_path, client, offset=0.0, **options):
+    path = str(tmp_path / "tracker.sqlite3")
+    initialize_database(path)
+    return RefreshScheduler(path, client, clock=lambda: time.time() + offset, rng=random.Random(1), jitter_seconds=0, **options)
+
+
+def test_cycle_regenerates_changed_projections_and_refreshes_stale_teams(tmp_path):
+    client = FakeClient()
+    scheduler = _scheduler(tmp_path, client)
+    scheduler.store.mark_refresh_failed(41, "current", "never imported")
+
+    first = scheduler.run_once()["jobs"]
+    second = scheduler.run_once()["jobs"]
+    client.form = "6.5"
+    third = scheduler.run_once()["jobs"]
+
+    assert client.warmed == 3
+    assert first["upstream"] == {"current_gameweek": 2, "next_deadline": datetime.fromtimestamp(START + 600, timezone.utc).isoformat()}
+    assert first["projections"]["status"] == "regenerated" and first["projections"]["gameweeks"] == [2, 3]
+    assert first["tracked_teams"]["stale"] == 1 and first["tracked_teams"]["refreshed"] == 1
+    assert second["projections"] == {"status": "unchanged", "projection_set_id": first["projections"]["projection_set_id"]}
+    assert second["tracked_teams"] == {"stale": 0}
+    assert third["projections"]["status"] == "regenerated"
+    assert client.team_requests == [41]
+
+
+def test_teams_refreshed_before_the_latest_deadline_are_stale(tmp_path):
+    client = FakeClient()
+    scheduler = _scheduler(tmp_path, client)
+    scheduler.store.mark_refresh_failed(41, "current", "never imported")
+    scheduler.run_once()
+    client.team_requests.clear()
+
+    assert scheduler.run_once()["jobs"]["tracked_teams"] == {"stale": 0}
+    result = _scheduler(tmp_path, client, offset=900).run_once()["jobs"]["tracked_teams"]
+
+    assert result == {"stale": 1, "refreshed": 0, "unchanged": 1, "failed": 0, "elapsed_seconds": result["elapsed_seconds"]}
+    assert client.team_requests == [41]
+
+
+def test_cadence_lands_after_deadlines_and_one_process_holds_the_lease(tmp_path):
+    client = FakeClient()
+    scheduler = _scheduler(tmp_path, client)
+    other = _scheduler(tmp_path, client)
+    other.owner = "other-host:1"
+
+    scheduler.run_once()
+    skipped = other.run_once()
+    delay = scheduler.next_delay()
+    scheduler.stop()
+
+    assert skipped == {"status": "skipped", "reason": "Another scheduler holds the lease."}
+    assert 600 < delay <= 720
+    assert _scheduler(tmp_path, client, offset=700).next_delay() == 60
+    assert _scheduler(tmp_path, client, offset=900).next_delay() == 1800
+    assert other.run_once()["status"] == "complete"
+
+
+def test_status_endpoint_reports_stored_job_outcomes(tmp_path):
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "tracker.sqlite3")})
+    client = FakeClient()
+    scheduler = _scheduler(tmp_path, client)
+    scheduler.run_once()
+    scheduler.next_delay()
+
+    status = app.test_client().get("/api/v1/scheduler/status").get_json()
+
+    assert status["enabled"] is False and status["running_here"] is False
+    assert status["lease_owner"] == scheduler.owner and status["next_run_at"] is not None
+    assert [(job["name"], job["status"]) for job in status["jobs"]] == [("projections", "ok"), ("tracked_teams", "ok"), ("upstream", "ok")]
+    assert status["jobs"][0]["result"]["status"] == "regenerated"
+
+
+def test_photo_prefetch_job_runs_only_with_a_photo_store(tmp_path):
+    class PhotoClient(FakeClient):
+        def get_bootstrap_static(self):
+            bootstrap = super().get_bootstrap_static()
+            for element in bootstrap["elements"]:
+                element["code"] = 1000 + element["id"]
+            return bootstrap
+
+    class RecordingPhotoStore:
+        def prefetch(self, codes, max_workers):
+            self.codes = codes
+            return {"codes": len(codes), "downloads": len(codes), "not_found": 0, "errors": 0}
+
+    photos = RecordingPhotoStore()
+    without = _scheduler(tmp_path, PhotoClient()).run_once()["jobs"]
+    jobs = _scheduler(tmp_path, PhotoClient(), photo_store=photos).run_once()["jobs"]
+
+    assert "photos" not in without
+    assert jobs["photos"]["downloads"] == 4 and photos.codes == [1001, 1002, 1003, 1004]
+
+
+def test_loop_survives_database_errors_and_keeps_its_cadence(tmp_path, monkeypatch):
+    scheduler = _scheduler(tmp_path, FakeClient())
+    calls = []
+
+    def locked():
+        calls.append("cycle")
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        scheduler.stop()
+
+    def delay():
+        calls.append("delay")
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(scheduler, "run_once", locked)
+    monkeypatch.setattr(scheduler, "next_delay", delay)
+    monkeypatch.setattr(scheduler, "interval_seconds", 0)
+    scheduler.run_forever()
+
+    scheduler_job = next(job for job in scheduler.store.background_jobs() if job["name"] == "scheduler")
+    assert calls == ["cycle", "delay", "cycle", "delay"]
+    assert scheduler_job["status"] == "failed" and scheduler_job["last_error"] == "delay: database is locked"
@@ -0,0 +1,29 @@
+from benchmarks.payloads import load_payloads, save_payloads
+from benchmarks.suite import compare, measure
+
+
+def _run(**scenarios):
+    return {"scenarios": {name: {"status": status, "median_ms": ms, "peak_kib": kib} for name, (status, ms, kib) in scenarios.items()}}
+
+
+def test_compare_flags_growth_above_threshold_and_noise_floor_and_status_changes():
+    baseline = _run(planner=("ok", 100.0, 1000.0), tiny=("ok", 0.2, 10.0), optimizer=("optimal", 50.0, 500.0))
+    current = _run(planner=("ok", 130.0, 1100.0), tiny=("ok", 0.6, 40.0), optimizer=("infeasible", 10.0, 500.0), new=("ok", 1.0, 1.0))
+
+    rows = {(row["scenario"], row["metric"]): row for row in compare(current, baseline, threshold=0.2)}
+
+    assert rows[("planner", "median_ms")]["regressed"] and rows[("planner", "median_ms")]["change"] == 0.3
+    assert not rows[("planner", "peak_kib")]["regressed"]
+    assert not rows[("tiny", "median_ms")]["regressed"] and not rows[("tiny", "peak_kib")]["regressed"]
+    assert rows[("optimizer", "status")]["regressed"] and not rows[("optimizer", "median_ms")]["regressed"]
+    assert not any(scenario == "new" for scenario, _ in rows)
+
+
+def test_measure_reports_timing_memory_and_status(tmp_path):
+    result = measure(lambda: {"status": "ok", "data": [0] * 100000}, repeats=2)
+    save_payloads({"bootstrap": {"elements": []}}, tmp_path / "payloads.json.gz")
+
+    assert result["status"] == "ok" and result["repeats"] == 2
+    assert result["min_ms"] <= result["median_ms"] <= result["max_ms"]
+    assert result["peak_kib"] >= 700
+    assert load_payloads(tmp_path / "payloads.json.gz") == {"bootstrap": {"elements": []}}
@@ -0,0 +1,38 @@
+import copy
+
+from app.services.bootstrap_index import get_bootstrap_index, get_fixture_index
+
+BOOTSTRAP = {
+    'elements': [{'id': 3, 'element_type': 2, 'team': 1}, {'id': 1, 'element_type': 4, 'team': 2},
+                 {'id': 2, 'element_type': 2, 'team': 2}],
+    'teams': [{'id': 1, 'short_name': 'ARS'}, {'id': 2, 'short_name': 'BHA'}],
+}
+
+
+def test_index_resolves_players_and_clubs_without_scanning():
+    index = get_bootstrap_index(BOOTSTRAP)
+
+    assert index.player(1)['element_type'] == 4
+    assert index.player(99) == {}
+    assert index.team_short_name(2) == 'BHA'
+    assert index.team_short_name(None) == 'Unknown'
+    assert [player['id'] for player in index.players_by_position['DEF']] == [3, 2]
+
+
+def test_index_is_built_once_per_payload_version():
+    first = get_bootstrap_index(BOOTSTRAP)
+
+    assert get_bootstrap_index(copy.deepcopy(BOOTSTRAP)) is first
+    changed = copy.deepcopy(BOOTSTRAP)
+    changed['elements'][0]['team'] = 2
+    assert get_bootstrap_index(changed) is not first
+
+
+def test_fixture_index_keeps_payload_order_per_club_and_gameweek():
+    fixtures = [{'id': 1, 'event': 2, 'team_h': 1, 'team_a': 2}, {'id': 2, 'event': 1, 'team_h': 3, 'team_a': 1},
+                {'id': 3, 'event': 2, 'team_h': 1, 'team_a': 3}]
+    index = get_fixture_index(fixtures)
+
+    assert [fixture['id'] for fixture in index.for_team(1)] == [1, 2, 3]
+    assert [fixture['id'] for fixture in index.for_team_gameweek(1, 2)] == [1, 3]
+    assert index.for_team(9) == []
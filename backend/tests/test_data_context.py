@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import Counter
+
+from app.services.data_context import FPLDataContext
+from app.services.squad_transfer_analyzer import SquadTransferAnalyzer
+
+
+def _players():
+    positions = [1, 1] + [2] * 5 + [3] * 5 + [4] * 3 + [1, 2, 3, 4]
+    return [{'id': index + 1, 'code': 1000 + index, 'web_name': f'P{index + 1}', 'element_type': position,
+             'team': index % 4 + 1, 'now_cost': 50, 'form': '2.0', 'selected_by_percent': '5.0', 'minutes': 45,
+             'status': 'a', 'total_points': 10, 'points_per_game': '2.0'}
+            for index, position in enumerate(positions)]
+
+
+class CountingClient:
+    calls = Counter()
+
+    @classmethod
+    def reset(cls):
+        cls.calls = Counter()
+
+    @classmethod
+    def get_bootstrap_static(cls):
+        cls.calls['bootstrap'] += 1
+        return {'events': [{'id': 3, 'is_current': True}], 'elements': _players(),
+                'teams': [{'id': team, 'short_name': f'T{team}'} for team in range(1, 5)]}
+
+    @classmethod
+    def get_current_gameweek(cls):
+        cls.calls['gameweek'] += 1
+        return 3
+
+    @classmethod
+    def get_fixtures(cls):
+        cls.calls['fixtures'] += 1
+        time.sleep(0.01)
+        return [{'event': 3, 'team_h': 1, 'team_a': 2, 'team_h_difficulty': 2, 'team_a_difficulty': 4}]
+
+    @classmethod
+    def get_team_data(cls, team_id):
+        cls.calls['entry'] += 1
+        return {'name': 'Example', 'last_deadline_bank': 5, 'favourite_team': 1}
+
+    @classmethod
+    def get_team_picks(cls, team_id, gameweek):
+        cls.calls['picks'] += 1
+        return {'picks': [{'element': player_id, 'multiplier': 1} for player_id in range(1, 16)]}
+
+
+def test_composite_analysis_fetches_each_payload_once():
+    CountingClient.reset()
+
+    analysis = SquadTransferAnalyzer(7, FPLDataContext(CountingClient)).analyze_squad_for_transfers()
+
+    assert len(analysis['current_squad']) == 15
+    assert CountingClient.calls == {'bootstrap': 1, 'gameweek': 1, 'fixtures': 1, 'entry': 1, 'picks': 1}
+
+
+def test_concurrent_loads_share_one_in_flight_fetch():
+    CountingClient.reset()
+    context = FPLDataContext(CountingClient)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(context.fixtures)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert CountingClient.calls['fixtures'] == 1
+    assert all(result is results[0] for result in results)
@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+from app import create_app
+from app.services.derived_cache import derived_cache
+
+BOOTSTRAP = {
+    "events": [{"id": 3, "is_current": True, "finished": False}],
+    "teams": [{"id": 1, "name": "Arsenal", "short_name": "ARS"}],
+    "element_types": [{"id": 1, "singular_name_short": "GKP"}],
+    "elements": [{"id": 10, "web_name": "Keeper", "team": 1, "element_type": 1, "now_cost": 45, "form": "3.0"}],
+}
+ENTRY = {"name": "Cached XI", "last_deadline_bank": 5}
+
+
+def _patched(picks):
+    return [patch("app.utils.fpl_api.FPLAPIClient.get_bootstrap_static", return_value=BOOTSTRAP),
+            patch("app.utils.fpl_api.FPLAPIClient.get_fixtures", return_value=[]),
+            patch("app.utils.fpl_api.FPLAPIClient.get_current_gameweek", return_value=3),
+            patch("app.utils.fpl_api.FPLAPIClient.get_team_data", return_value=ENTRY),
+            patch("app.utils.fpl_api.FPLAPIClient.get_team_picks", side_effect=lambda team_id, gameweek: picks[-1])]
+
+
+def test_analysis_is_reused_until_an_input_changes_and_supports_if_none_match(tmp_path):
+    derived_cache.invalidate()
+    client = create_app({"TESTING": True, "DATABASE": str(tmp_path / "tracker.sqlite3")}).test_client()
+    picks = [{"picks": [{"element": 10, "position": 1}]}]
+    patches = _patched(picks)
+    for active in patches:
+        active.start()
+    try:
+        with patch("app.services.team_analyzer.TeamAnalyzer.get_detailed_analysis", side_effect=lambda: {"picks": len(picks)}) as analysis:
+            first = client.get("/api/team/7/detailed-analysis")
+            repeat = client.get("/api/team/7/detailed-analysis")
+            revalidated = client.get("/api/team/7/detailed-analysis", headers={"If-None-Match": first.headers["ETag"]})
+            picks.append({"picks": [{"element": 10, "position": 2}]})
+            changed = client.get("/api/team/7/detailed-analysis", headers={"If-None-Match": first.headers["ETag"]})
+        stats = client.get("/api/v1/cache/stats").get_json()["derived_results"]
+    finally:
+        for active in patches:
+            active.stop()
+
+    assert analysis.call_count == 2
+    assert first.get_json() == repeat.get_json() == {"picks": 1}
+    assert repeat.headers["ETag"] == first.headers["ETag"]
+    assert revalidated.status_code == 304 and revalidated.data == b""
+    assert changed.status_code == 200 and changed.get_json() == {"picks": 2}
+    assert changed.headers["ETag"] != first.headers["ETag"]
+    assert (stats["hits"], stats["misses"], stats["not_modified"], stats["entries"]) == (2, 2, 1, 2)
+
+
+def test_each_endpoint_has_its_own_entry_and_errors_are_not_cached(tmp_path):
+    derived_cache.invalidate()
+    client = create_app({"TESTING": True, "DATABASE": str(tmp_path / "tracker.sqlite3")}).test_client()
+    patches = _patched([{"picks": []}])
+    for active in patches:
+        active.start()
+    try:
+        with patch("app.services.recommendation_engine.RecommendationEngine.get_smart_recommendations",
+                   side_effect=[RuntimeError("boom"), {"transfers": []}]):
+            failed = client.get("/api/recommendations/7/all")
+            recovered = client.get("/api/recommendations/7/all")
+        with patch("app.services.recommendation_engine.RecommendationEngine.get_high_upside_differentials", return_value=[]):
+            differentials = client.get("/api/recommendations/7/differentials")
+    finally:
+        for active in patches:
+            active.stop()
+
+    assert failed.status_code == 500
+    assert recovered.get_json() == {"team_id": 7, "data": {"transfers": []}}
+    assert differentials.get_json() == {"team_id": 7, "differentials": []}
+    assert derived_cache.stats()["entries"] == 2
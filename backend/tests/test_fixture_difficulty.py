@@ -0,0 +1,54 @@
+import random
+
+from app.services.fixture_difficulty import FixtureDifficultyTable
+
+
+def _reference_upcoming_fdr(fixtures, current_gameweek, team_id, weeks):
+    """The per-player fixture scan the recommendation engine used before the table existed."""
+    if not team_id:
+        return 3.0
+    values, count = [], 0
+    for fixture in fixtures:
+        event = fixture.get('event', 0) or 0
+        if event >= current_gameweek and count < weeks:
+            if fixture['team_a'] == team_id:
+                values.append(fixture.get('team_a_difficulty', 3))
+                count += 1
+            elif fixture['team_h'] == team_id:
+                values.append(fixture.get('team_h_difficulty', 3))
+                count += 1
+    return sum(values) / len(values) if values else 3.0
+
+
+def _season(seed):
+    rng, fixtures = random.Random(seed), []
+    for gameweek in range(1, 39):
+        clubs = list(range(1, 21))
+        rng.shuffle(clubs)
+        for home, away in zip(clubs[::2], clubs[1::2]):
+            event = None if rng.random() < 0.03 else gameweek
+            fixtures.append({'event': event, 'team_h': home, 'team_a': away,
+                             'team_h_difficulty': rng.randint(1, 5), 'team_a_difficulty': rng.randint(1, 5)})
+    return fixtures
+
+
+def test_fixture_averages_match_the_reference_scan():
+    for seed in range(5):
+        fixtures = _season(seed)
+        for current_gameweek in (1, 17, 36, 39):
+            table = FixtureDifficultyTable(fixtures, current_gameweek)
+            for team_id in [None, 0, 99] + list(range(1, 21)):
+                for weeks in (1, 3, 5, 8):
+                    assert table.average_fdr(team_id, weeks) == _reference_upcoming_fdr(fixtures, current_gameweek, team_id, weeks)
+
+
+def test_gameweek_horizon_represents_blanks_and_doubles():
+    fixtures = [{'event': 5, 'team_h': 1, 'team_a': 2, 'team_h_difficulty': 2, 'team_a_difficulty': 4},
+                {'event': 5, 'team_h': 3, 'team_a': 1, 'team_h_difficulty': 3, 'team_a_difficulty': 5},
+                {'event': 7, 'team_h': 1, 'team_a': 3, 'team_h_difficulty': 1, 'team_a_difficulty': 4}]
+    table = FixtureDifficultyTable(fixtures, 5, horizons=(3,))
+
+    assert table.gameweek_difficulties(1, 3) == [[2, 5], [], [1]]
+    assert table.fixture_counts(1, 3) == [2, 0, 1]
+    assert table.horizon_fdr(1, 3) == 8 / 3
+    assert table.horizon_fdr(4, 3) == 3.0
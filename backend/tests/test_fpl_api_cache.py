@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+
+from app.utils.fpl_api import CachePolicy, FPLAPIError, ResponseCache
+
+
+POLICIES = {
+    'bootstrap': CachePolicy(100, 1000, deadline_aware=True),
+    'fixtures': CachePolicy(100, 1000, deadline_aware=True),
+    'entry': CachePolicy(10),
+    'element': CachePolicy(10),
+}
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Loader:
+    def __init__(self, payloads=None, error=None):
+        self.calls, self.payloads, self.error = [], payloads or {}, error
+
+    def __call__(self, path):
+        self.calls.append(path)
+        if self.error:
+            raise self.error
+        return self.payloads.get(path, {'path': path, 'call': len(self.calls)})
+
+
+def _cache(clock):
+    return ResponseCache(POLICIES, clock=clock, background=False)
+
+
+def test_fresh_entries_are_served_without_refetching():
+    clock, loader = Clock(), Loader()
+    cache = _cache(clock)
+
+    first = cache.get('/entry/1/', loader)
+    clock.now += 5
+    second = cache.get('/entry/1/', loader)
+
+    assert first is second
+    assert loader.calls == ['/entry/1/']
+    assert cache.stats()['entry'] == {'hits': 1, 'stale_hits': 0, 'misses': 1, 'refreshes': 0, 'refresh_errors': 0, 'entries': 1}
+
+
+def test_short_lived_entry_data_is_refetched_after_ttl():
+    clock, loader = Clock(), Loader()
+    cache = _cache(clock)
+
+    cache.get('/entry/1/', loader)
+    clock.now += 11
+    cache.get('/entry/1/', loader)
+
+    assert loader.calls == ['/entry/1/', '/entry/1/']
+
+
+def test_stale_bootstrap_is_served_while_it_revalidates():
+    clock, loader = Clock(), Loader()
+    cache = _cache(clock)
+    first = cache.get('/bootstrap-static/', loader)
+    clock.now += 150
+
+    stale = cache.get('/bootstrap-static/', loader)
+    refreshed = cache.get('/bootstrap-static/', loader)
+
+    assert stale is first
+    assert refreshed['call'] == 2
+    assert cache.stats()['bootstrap']['stale_hits'] == 1
+    assert cache.stats()['bootstrap']['refreshes'] == 1
+
+
+def test_failed_revalidation_keeps_the_stale_payload():
+    clock = Clock()
+    cache = _cache(clock)
+    first = cache.get('/fixtures/', Loader())
+    clock.now += 150
+
+    assert cache.get('/fixtures/', Loader(error=FPLAPIError('down'))) is first
+    assert cache.stats()['fixtures']['refresh_errors'] == 1
+
+
+def test_bootstrap_and_fixtures_expire_after_the_next_deadline():
+    clock, loader = Clock(), Loader()
+    deadline = datetime.fromtimestamp(clock.now + 30, timezone.utc).isoformat().replace('+00:00', 'Z')
+    loader.payloads['/bootstrap-static/'] = {'events': [{'id': 1, 'deadline_time': deadline}]}
+    cache = _cache(clock)
+    cache.get('/bootstrap-static/', loader)
+    cache.get('/fixtures/', loader)
+
+    clock.now += 30 + 121
+    cache.get('/fixtures/', loader)
+
+    assert loader.calls.count('/fixtures/') == 2
+
+
+def test_invalidation_forces_a_fresh_fetch():
+    clock, loader = Clock(), Loader()
+    cache = _cache(clock)
+    cache.get('/entry/1/', loader)
+    cache.get('/fixtures/', loader)
+
+    assert cache.invalidate('entry') == 1
+    cache.get('/entry/1/', loader)
+    cache.get('/fixtures/', loader)
+
+    assert loader.calls == ['/entry/1/', '/fixtures/', '/entry/1/']
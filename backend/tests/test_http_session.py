@@ -0,0 +1,113 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.utils.http_session import HTTPSession
+
+
+class StubFPLHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            server.peers.add(self.client_address)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            script = server.scripts.get(self.path, [])
+            status = script.pop(0) if len(script) > 1 else (script[0] if script else 200)
+        try:
+            if self.path == '/slow':
+                time.sleep(0.05)
+            if status == 200 and self.path == '/bootstrap-static/' and self.headers.get('If-None-Match') == '"v1"':
+                status = 304
+            body = b'' if status == 304 else b'{"ok": true}'
+            self.send_response(status)
+            self.send_header('ETag', '"v1"')
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubFPLHandler)
+    server.lock, server.hits, server.peers, server.scripts = threading.Lock(), {}, set(), {}
+    server.active = server.max_active = 0
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server, f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def _session(**options):
+    return HTTPSession(sleep=lambda seconds: None, **options)
+
+
+def test_transient_errors_are_retried_with_backoff(stub):
+    server, base = stub
+    server.scripts['/fixtures/'] = [503, 429, 200]
+    session = _session(max_retries=3)
+
+    response = session.get(f'{base}/fixtures/')
+
+    assert response.status_code == 200
+    assert server.hits['/fixtures/'] == 3
+    assert session.stats()['retries'] == 2
+
+
+def test_retries_are_bounded(stub):
+    server, base = stub
+    server.scripts['/fixtures/'] = [502]
+    session = _session(max_retries=2)
+
+    assert session.get(f'{base}/fixtures/').status_code == 502
+    assert server.hits['/fixtures/'] == 3
+
+
+def test_conditional_requests_replay_the_stored_body_on_304(stub):
+    server, base = stub
+    session = _session()
+
+    first = session.get(f'{base}/bootstrap-static/', conditional=True)
+    second = session.get(f'{base}/bootstrap-static/', conditional=True)
+
+    assert second is first
+    assert second.json() == {'ok': True}
+    assert server.hits['/bootstrap-static/'] == 2
+    assert session.stats()['not_modified'] == 1
+
+
+def test_connections_are_kept_alive_and_reused(stub):
+    server, base = stub
+    session = _session()
+
+    for _ in range(5):
+        session.get(f'{base}/entry/1/')
+
+    assert server.hits['/entry/1/'] == 5
+    assert len(server.peers) == 1
+
+
+def test_per_host_concurrency_is_limited(stub):
+    server, base = stub
+    session = _session(per_host_limit=2)
+    threads = [threading.Thread(target=session.get, args=(f'{base}/slow',)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.hits['/slow'] == 6
+    assert server.max_active <= 2
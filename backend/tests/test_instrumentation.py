@@ -0,0 +1,63 @@
+from unittest.mock import Mock, patch
+
+from app import create_app
+from app.utils import fpl_api, instrumentation
+from app.utils.instrumentation import MetricsRegistry, registry, span
+
+
+def test_requests_get_server_timing_and_prometheus_metrics(tmp_path):
+    registry.reset()
+    client = create_app({"TESTING": True, "DATABASE": str(tmp_path / "tracker.sqlite3")}).test_client()
+    response = client.get("/api/tracked-teams")
+    upstream = Mock(status_code=200)
+    upstream.json.return_value = {"picks": []}
+    with patch("app.utils.fpl_api.http_session.get", return_value=upstream):
+        fpl_api._get_json("/entry/7/event/3/picks/")
+
+    metrics = client.get("/metrics")
+    text = metrics.get_data(as_text=True)
+
+    timing = dict(entry.split(";dur=") for entry in response.headers["Server-Timing"].split(", "))
+    assert set(timing) == {"db", "total"} and float(timing["db"]) <= float(timing["total"])
+    assert metrics.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert 'fpl_request_duration_seconds_count{route="/api/tracked-teams",method="GET"} 1' in text
+    assert 'fpl_requests_total{route="/api/tracked-teams",method="GET",status="200"} 1' in text
+    assert 'fpl_span_duration_seconds_count{kind="db",name="TrackedTeamStore.list_teams"} 1' in text
+    assert 'fpl_span_duration_seconds_count{kind="upstream",name="picks"} 1' in text
+    assert 'fpl_cache_hit_ratio{cache="sqlite_connections"}' in text
+    assert 'fpl_cache_misses_total{cache="upstream_bootstrap"}' in text
+
+
+def test_nested_spans_of_one_kind_are_recorded_once_and_buckets_are_cumulative():
+    registry.reset()
+    with span("service", "outer"):
+        with span("service", "inner"):
+            pass
+    local = MetricsRegistry(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 5.0):
+        local.observe("latency_seconds", (("route", 'a"b'),), seconds)
+
+    assert registry.histogram("fpl_span_duration_seconds", (("kind", "service"), ("name", "outer")))["count"] == 1
+    assert registry.histogram("fpl_span_duration_seconds", (("kind", "service"), ("name", "inner"))) is None
+    assert local.render().splitlines() == [
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="a\\"b",le="0.1"} 1',
+        'latency_seconds_bucket{route="a\\"b",le="1.0"} 2',
+        'latency_seconds_bucket{route="a\\"b",le="+Inf"} 3',
+        'latency_seconds_sum{route="a\\"b"} 5.55',
+        'latency_seconds_count{route="a\\"b"} 3',
+    ]
+
+
+def test_disabled_instrumentation_records_nothing(tmp_path):
+    registry.reset()
+    try:
+        client = create_app({"TESTING": True, "DATABASE": str(tmp_path / "tracker.sqlite3"), "METRICS_ENABLED": False}).test_client()
+        response = client.get("/api/tracked-teams")
+        with span("service", "ignored"):
+            pass
+    finally:
+        instrumentation.configure(True)
+
+    assert "Server-Timing" not in response.headers
+    assert registry.render() == ""
@@ -0,0 +1,146 @@
+import json
+import threading
+from unittest.mock import patch
+
+import numpy as np
+
+from app import create_app
+from app.services.mini_league import OwnershipMatrix, RateLimiter, refresh_league
+from app.services.tracked_team_store import TrackedTeamStore, initialize_database
+from app.utils.fpl_api import FPLResourceNotFound
+
+
+def _picks(team_id, captain_multiplier=2):
+    # Every team owns player 1 and captains it; players 2-15 rotate so ownership varies by team.
+    elements = [1] + [2 + (team_id + offset) % 20 for offset in range(14)]
+    return {'active_chip': '3xc' if captain_multiplier == 3 else None,
+            'picks': [{'element': element, 'position': position, 'multiplier': captain_multiplier if position == 1 else int(position <= 11)}
+                      for position, element in enumerate(elements, start=1)]}
+
+
+class FakeLeagueClient:
+    def __init__(self, members, gameweek=5, missing=()):
+        self.members, self.gameweek, self.missing = members, gameweek, set(missing)
+        self.pages, self.picks = [], []
+        self.lock = threading.Lock()
+
+    def get_current_gameweek(self):
+        return self.gameweek
+
+    def get_league_standings(self, league_id, page):
+        with self.lock:
+            self.pages.append(page)
+        rows = [{'entry': team_id, 'entry_name': f'Team {team_id}', 'player_name': f'Manager {team_id}', 'rank': rank,
+                 'total': 1000 - rank, 'event_total': 50}
+                for rank, team_id in enumerate(self.members, start=1)][(page - 1) * 50:page * 50]
+        return {'league': {'id': league_id, 'name': 'Office League'}, 'standings': {'page': page, 'has_next': page * 50 < len(self.members),
+                                                                                   'results': rows}}
+
+    def get_team_picks(self, team_id, gameweek):
+        with self.lock:
+            self.picks.append((team_id, gameweek))
+        if team_id in self.missing:
+            raise FPLResourceNotFound('The requested FPL resource was not found.')
+        return _picks(team_id)
+
+
+def _store(tmp_path):
+    path = str(tmp_path / 'tracker.sqlite3')
+    initialize_database(path)
+    return TrackedTeamStore(path)
+
+
+def test_refresh_fetches_every_page_and_only_picks_not_yet_stored(tmp_path):
+    store, client = _store(tmp_path), FakeLeagueClient(list(range(101, 221)), missing={150})
+
+    first = refresh_league(store, client, '2026-27', 77, max_workers=4, requests_per_second=None)
+    repeat = refresh_league(store, client, '2026-27', 77, max_workers=4, requests_per_second=None)
+    client.gameweek = 6
+    after_deadline = refresh_league(store, client, '2026-27', 77, max_workers=4, requests_per_second=None)
+
+    # Pages after the last one may be requested speculatively within one window of max_workers.
+    assert {1, 2, 3} <= set(client.pages) and max(client.pages) <= 5
+    assert first['members'] == 120 and first['truncated'] is False
+    assert first['summary'] == {'fetched': 119, 'already_stored': 0, 'failed': 1}
+    assert first['failures'] == [{'fpl_team_id': 150, 'error': 'The requested FPL resource was not found.'}]
+    assert repeat['summary'] == {'fetched': 0, 'already_stored': 119, 'failed': 1}
+    assert after_deadline['summary'] == {'fetched': 119, 'already_stored': 0, 'failed': 1}
+    assert len(client.picks) == 120 + 1 + 120
+    league = store.get_league(77)
+    assert league['name'] == 'Office League' and league['gameweek'] == 6
+    assert [member['fpl_team_id'] for member in league['members'][:2]] == [101, 102]
+    assert store.storage_stats()['rows']['league_picks'] == 2 * 119 * 15
+
+
+def test_large_leagues_are_truncated_to_max_members(tmp_path):
+    store, client = _store(tmp_path), FakeLeagueClient(list(range(1, 400)))
+
+    result = refresh_league(store, client, '2026-27', 1, max_workers=2, requests_per_second=None, max_members=75)
+
+    assert result['members'] == 75 and result['truncated'] is True
+    assert max(client.pages) == 2
+    assert len(client.picks) == 75
+
+
+def test_effective_ownership_counts_captaincy_and_bench():
+    rows = [(team_id, pick['element'], pick['multiplier']) for team_id in (1, 2, 3, 4)
+            for pick in _picks(team_id, 3 if team_id == 4 else 2)['picks']]
+
+    matrix = OwnershipMatrix(rows)
+    players = {row['fpl_player_id']: row for row in matrix.players({1: 1, 99: 1})}
+
+    assert matrix.multipliers.shape == (len(matrix.player_ids), 4)
+    assert players[1]['ownership'] == 100.0 and players[1]['captaincy'] == 100.0
+    assert players[1]['effective_ownership'] == 225.0
+    assert players[1]['exposure'] == -125.0
+    assert players[99] == {'fpl_player_id': 99, 'ownership': 0.0, 'starting': 0.0, 'captaincy': 0.0, 'effective_ownership': 0.0,
+                           'our_multiplier': 1, 'exposure': 100.0}
+    # Team 1's bench (positions 12-15) counts towards ownership but not effective ownership.
+    bench_only = [row for row in players.values() if row['ownership'] and not row['starting']]
+    assert bench_only and all(row['effective_ownership'] == 0 for row in bench_only)
+    expected = np.array([sum(multiplier for _, player, multiplier in rows if player == player_id) for player_id in matrix.player_ids]) * 25
+    assert np.allclose(matrix.effective_ownership, expected)
+    assert OwnershipMatrix([]).players() == []
+
+
+def test_rate_limiter_spaces_calls():
+    now, delays = [0.0], []
+    limiter = RateLimiter(4, clock=lambda: now[0], sleep=delays.append)
+
+    for _ in range(3):
+        limiter.wait()
+
+    assert delays == [0.25, 0.5]
+    RateLimiter(None, sleep=delays.append).wait()
+    assert delays == [0.25, 0.5]
+
+
+def test_league_routes_refresh_and_compare_a_team(tmp_path):
+    app = create_app({'TESTING': True, 'DATABASE': str(tmp_path / 'tracker.sqlite3'), 'LEAGUE_REQUESTS_PER_SECOND': 0})
+    client, fake = app.test_client(), FakeLeagueClient([11, 12, 13])
+    with patch('app.routes.league_routes.FPLAPIClient', fake):
+        assert client.get('/api/leagues/9/effective-ownership').status_code == 404
+        assert client.post('/api/leagues/9/refresh', json={'max_workers': 0}).status_code == 400
+        refreshed = client.post('/api/leagues/9/refresh', json={'max_workers': 2}).get_json()
+        member = client.get('/api/leagues/9/effective-ownership?team_id=12').get_json()
+        outsider = client.get('/api/leagues/9/effective-ownership?team_id=40').get_json()
+
+    assert refreshed['summary'] == {'fetched': 3, 'already_stored': 0, 'failed': 0}
+    assert member['fpl_team_id'] == 12 and member['members_with_picks'] == 3
+    assert member['players'][0] == {'fpl_player_id': 1, 'ownership': 100.0, 'starting': 100.0, 'captaincy': 100.0,
+                                    'effective_ownership': 200.0, 'our_multiplier': 2, 'exposure': 0.0}
+    assert (40, 5) in fake.picks and outsider['fpl_team_id'] == 40
+    assert client.get('/api/leagues/9').get_json()['members'][2]['picks_fetched_at']
+
+    with patch('app.commands.FPLAPIClient', fake):
+        output = app.test_cli_runner().invoke(args=['refresh-league', '--league-id', '9']).output
+    assert json.loads(output)['summary'] == {'fetched': 0, 'already_stored': 3, 'failed': 0}
+
+
+def test_league_refresh_caps_workers_and_members_at_the_configured_limits(tmp_path):
+    app = create_app({'TESTING': True, 'DATABASE': str(tmp_path / 'tracker.sqlite3'), 'REFRESH_WORKERS': 2, 'LEAGUE_MAX_MEMBERS': 50})
+    with patch('app.routes.league_routes.refresh_league', return_value={}) as refresh:
+        app.test_client().post('/api/leagues/9/refresh', json={'max_workers': 500, 'max_members': 10 ** 6})
+        app.test_client().post('/api/leagues/9/refresh', json={'max_workers': 1, 'max_members': 20})
+
+    assert [(call.args[4], call.args[6]) for call in refresh.call_args_list] == [(2, 50), (1, 20)]
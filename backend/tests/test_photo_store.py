@@ -0,0 +1,129 @@
+import threading
+import time
+
+import requests
+
+from app import create_app
+from app.routes.photo_routes import PLACEHOLDER_SVG
+from app.services.photo_store import PhotoStore
+
+PNG = b"\x89PNG\r\n\x1a\nplayer"
+
+
+class FakeUpstream:
+    """Serves PNG bytes for known codes, 404 for the rest; counts calls per code."""
+
+    def __init__(self, photos=None, delay=0.0):
+        self.photos = photos if photos is not None else {101: PNG}
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, code):
+        with self.lock:
+            self.calls.append(code)
+        time.sleep(self.delay)
+        if code in self.photos:
+            photo = self.photos[code]
+            if isinstance(photo, Exception):
+                raise photo
+            return 200, photo
+        return 404, b""
+
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_misses_share_one_download_and_later_stores_read_from_disk(tmp_path):
+    upstream = FakeUpstream(delay=0.05)
+    store = PhotoStore(str(tmp_path), fetch=upstream)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.get(101))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    restarted = PhotoStore(str(tmp_path), fetch=upstream)
+    from_disk = restarted.get(101)
+
+    assert upstream.calls == [101]
+    assert {photo.content for photo in results} == {PNG}
+    assert from_disk == results[0]
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_missing_photos_are_cached_until_the_ttl_and_failures_fall_back_to_stale_files(tmp_path):
+    clock = Clock()
+    upstream = FakeUpstream()
+    store = PhotoStore(str(tmp_path), max_age_seconds=100, missing_ttl_seconds=60, fetch=upstream, clock=clock)
+
+    assert store.get(404) is None and store.get(404) is None
+    clock.now += 61
+    assert store.get(404) is None
+    assert upstream.calls == [404, 404]
+
+    stored = store.get(101)
+    upstream.photos[101] = requests.ConnectionError("offline")
+    clock.now += 101
+    assert store.get(101) == stored
+    assert store.stats()["errors"] == 1
+
+
+def test_missing_codes_are_pruned_when_expired_and_capped(tmp_path):
+    clock = Clock()
+    store = PhotoStore(str(tmp_path), missing_ttl_seconds=60, missing_entries=3, fetch=FakeUpstream(), clock=clock)
+
+    for code in (1, 2, 3, 4):
+        store.get(code)
+    assert list(store._missing) == [2, 3, 4]
+    clock.now += 61
+    store.get(5)
+
+    assert list(store._missing) == [5]
+    assert store.stats()["missing"] == 1
+
+
+def test_prefetch_downloads_each_new_code_once(tmp_path):
+    upstream = FakeUpstream({101: PNG, 102: PNG + b"2"})
+    store = PhotoStore(str(tmp_path), fetch=upstream)
+
+    first = store.prefetch([101, 102, 103, 101], max_workers=4)
+    second = store.prefetch([101, 102])
+
+    assert first == {"codes": 3, "downloads": 2, "not_found": 1, "errors": 0}
+    assert second == {"codes": 2, "downloads": 0, "not_found": 0, "errors": 0}
+    assert sorted(upstream.calls) == [101, 102, 103]
+
+
+def test_photo_route_supports_conditional_requests_and_placeholder(tmp_path):
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "tracker.sqlite3")})
+    app.extensions["photo_store"] = PhotoStore(str(tmp_path / "photos"), fetch=FakeUpstream())
+    client = app.test_client()
+
+    photo = client.get("/api/photos/101.png")
+    revalidated = client.get("/api/photos/101.png", headers={"If-None-Match": photo.headers["ETag"]})
+    placeholder = client.get("/api/photos/999.png")
+
+    assert photo.status_code == 200 and photo.data == PNG and photo.mimetype == "image/png"
+    assert revalidated.status_code == 304 and revalidated.data == b""
+    assert placeholder.status_code == 200 and placeholder.data == PLACEHOLDER_SVG
+    assert placeholder.mimetype == "image/svg+xml" and placeholder.headers["ETag"]
+
+
+def test_downloads_that_cannot_be_stored_are_still_served(tmp_path):
+    blocked = tmp_path / "photos"
+    blocked.write_text("not a directory")
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "tracker.sqlite3")})
+    store = app.extensions["photo_store"] = PhotoStore(str(blocked), fetch=FakeUpstream())
+
+    response = app.test_client().get("/api/photos/101.png")
+
+    assert response.status_code == 200 and response.data == PNG
+    assert store.stats()["write_errors"] == 1 and store.get(101).content == PNG
+    assert store.stats()["memory_hits"] == 1
@@ -0,0 +1,56 @@
+import random
+
+import numpy as np
+
+from app.services.data_context import FPLDataContext
+from app.services.player_scoring import top_k_candidates
+from app.services.recommendation_engine import RecommendationEngine
+
+
+class SeasonClient:
+    def __init__(self, seed):
+        rng = random.Random(seed)
+        # Coarse values produce many equal rounded scores, exercising tie order.
+        self.elements = [{'id': player_id, 'code': player_id, 'web_name': f'P{player_id}', 'element_type': rng.randint(1, 4),
+                          'team': rng.randint(0, 6), 'now_cost': rng.choice([0, 40, 45, 50, 100]), 'status': rng.choice('aaad'),
+                          'form': rng.choice(['0.0', '-0.5', '2.5', '5.0', '7.5']), 'selected_by_percent': rng.choice(['0.0', '10.0', '45.5']),
+                          'minutes': rng.choice([0, 45, 90, 900])}
+                         for player_id in range(1, 301)]
+        self.fixtures = [{'event': rng.choice([None, 1, 2, 3, 4]), 'team_h': rng.randint(1, 6), 'team_a': rng.randint(1, 6),
+                          'team_h_difficulty': rng.randint(1, 5), 'team_a_difficulty': rng.randint(1, 5)} for _ in range(40)]
+
+    def get_bootstrap_static(self):
+        return {'events': [{'id': 2, 'is_current': True}], 'elements': self.elements,
+                'teams': [{'id': team, 'short_name': f'T{team}'} for team in range(1, 7)]}
+
+    def get_fixtures(self):
+        return self.fixtures
+
+    def get_current_gameweek(self):
+        return 2
+
+    def get_team_data(self, team_id):
+        return {'name': 'Example', 'last_deadline_bank': 0}
+
+    def get_team_picks(self, team_id, gameweek):
+        return {'picks': [{'element': player_id, 'multiplier': 1} for player_id in range(1, 16)]}
+
+
+def test_vectorized_rankings_match_the_scalar_reference():
+    for seed in range(10):
+        engine = RecommendationEngine(1, FPLDataContext(SeasonClient(seed)))
+        vectorized = (engine.get_best_transfers_per_position(), engine.get_high_upside_differentials(count=5),
+                      engine.get_high_upside_differentials(count=1))
+        engine.vectorized = False
+        scalar = (engine.get_best_transfers_per_position(), engine.get_high_upside_differentials(count=5),
+                  engine.get_high_upside_differentials(count=1))
+
+        assert vectorized == scalar
+
+
+def test_top_k_candidates_keep_boundary_ties_in_bootstrap_order():
+    scores = np.array([1.0, 3.0, 2.0, 2.0, 0.5])
+
+    assert top_k_candidates(np.arange(5), scores, 2) == [1, 2, 3]
+    assert top_k_candidates(np.array([4, 0]), scores, 5) == [4, 0]
+    assert top_k_candidates(np.array([], dtype=int), scores, 5) == []
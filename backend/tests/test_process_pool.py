@@ -0,0 +1,140 @@
+import operator
+
+import pytest
+
+from app.services import squad_optimizer, transfer_planner
+from app.services.projection_engine import build_baseline_projections
+from app.utils import process_pool
+from benchmarks.payloads import DEFAULT_PAYLOADS, load_payloads
+
+
+@pytest.fixture(scope='module')
+def season():
+    payloads = load_payloads(DEFAULT_PAYLOADS)
+    players, current = payloads['bootstrap']['elements'], payloads['current_gameweek']
+    gameweeks = list(range(current, current + 3))
+    projections, _ = build_baseline_projections(players, payloads['fixtures'], gameweeks)
+    values = {(row['fpl_player_id'], row['gameweek']): row['expected_points'] for row in projections}
+    picks = [{'fpl_player_id': pick['element'], 'selling_price_tenths': pick['selling_price']} for pick in payloads['picks']['picks']]
+    snapshot = {'bank_tenths': payloads['entry']['last_deadline_bank'], 'free_transfers': 1}
+    return players, values, gameweeks, picks, snapshot
+
+
+@pytest.fixture
+def workers():
+    previous = process_pool.worker_count()
+
+    def use(count):
+        process_pool.configure(count)
+        return process_pool.stats()
+
+    yield use
+    process_pool.configure(previous)
+
+
+def test_partition_keeps_order_and_balances_parts():
+    assert process_pool.partition(list(range(7)), 3) == [[0, 1, 2], [3, 4], [5, 6]]
+    assert process_pool.partition([1, 2], 8) == [[1], [2]]
+    assert process_pool.partition([], 4) == [[]]
+
+
+def test_pooled_one_transfer_plans_match_in_process(season, workers, monkeypatch):
+    players, values, gameweeks, picks, snapshot = season
+    workers(1)
+    expected = transfer_planner.plan_one_transfer(snapshot, picks, players, values, gameweeks)
+    before = workers(2)
+
+    monkeypatch.setattr(transfer_planner, 'PARALLEL_MIN_SWAPS', 0)
+    pooled = transfer_planner.plan_one_transfer(snapshot, picks, players, values, gameweeks)
+
+    assert pooled == expected
+    assert process_pool.stats()['pooled'] == before['pooled'] + 1
+
+
+def test_sharded_horizon_plans_match_in_process(season, workers, monkeypatch):
+    players, values, gameweeks, picks, snapshot = season
+    workers(1)
+    expected = transfer_planner.plan_transfer_horizon(snapshot, picks, players, values, gameweeks, max_transfers=2)
+    before = workers(2)
+
+    monkeypatch.setattr(transfer_planner, 'PARALLEL_MIN_MOVE_SEQUENCES', 0)
+    sharded = transfer_planner.plan_transfer_horizon(snapshot, picks, players, values, gameweeks, max_transfers=2)
+
+    for result in (expected, sharded):
+        result['solver'].pop('elapsed_seconds')
+        # Shards search their first moves with a local threshold, so they count more work.
+        result['solver'].pop('evaluations')
+        result['solver'].pop('lineups_evaluated')
+    assert expected['solutions'] and sharded == expected
+    assert process_pool.stats()['pooled'] == before['pooled'] + 1
+
+
+class LateClock:
+    """Reads 0 when the plan starts and 60 seconds on once any shard runs, as if the shard had queued behind other work."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return 0.0 if self.calls == 1 else 60.0
+
+
+def test_horizon_shards_share_the_deadline_set_when_planning_starts(season, workers):
+    players, values, gameweeks, picks, snapshot = season
+    workers(1)
+
+    result = transfer_planner.plan_transfer_horizon(snapshot, picks, players, values, gameweeks, max_transfers=2,
+                                                    time_limit_ms=1000, clock=LateClock())
+
+    assert result['status'] == 'feasible' and not result['solver']['proven_optimal']
+    assert 'The time limit was reached; plans are the best found so far.' in result['warnings']
+
+
+def test_sharded_beam_matches_in_process(season, workers, monkeypatch):
+    players, projection_values, gameweeks, _, _ = season
+    values = {player['id']: round(sum(projection_values.get((player['id'], gameweek), 0) for gameweek in gameweeks), 3) for player in players}
+    workers(1)
+    expected = squad_optimizer._build_squad(players, values, 2000, set(), set(), width=60)
+    before = workers(2)
+
+    monkeypatch.setattr(squad_optimizer, 'PARALLEL_MIN_EXPANSIONS', 0)
+    sharded = squad_optimizer._build_squad(players, values, 2000, set(), set(), width=60)
+
+    assert expected[0] and sharded == expected
+    assert process_pool.stats()['pooled'] > before['pooled']
+
+
+def test_pooled_squad_alternatives_match_in_process(season, workers):
+    players, values, gameweeks, _, _ = season
+    workers(1)
+    expected = squad_optimizer.optimize_squad(players, values, gameweeks, 2000, alternative_count=2)
+    before = workers(2)
+
+    pooled = squad_optimizer.optimize_squad(players, values, gameweeks, 2000, alternative_count=2)
+
+    assert len(expected['solutions']) == 3 and pooled == expected
+    assert process_pool.stats()['pooled'] > before['pooled'] and process_pool.stats()['fallbacks'] == before['fallbacks']
+
+
+def test_unpicklable_work_falls_back_in_process(workers):
+    before = workers(2)
+
+    assert process_pool.run_parts(lambda shared, part: [shared + item for item in part], 10, [1, 2, 3], 1, 0) == [[11, 12, 13]]
+    assert process_pool.stats()['fallbacks'] == before['fallbacks'] + 1
+    # Below ``min_work`` the whole input is one in-process part.
+    assert process_pool.run_parts(operator.add, [0], [1, 2], 0, 1) == [[0, 1, 2]]
+    assert process_pool.stats()['inline'] == before['inline'] + 2
+
+
+def test_worker_errors_propagate_and_keep_the_shared_pool(workers):
+    before = workers(2)
+
+    with pytest.raises(TypeError):
+        # ``0 + [1]`` fails inside a worker: an ordinary bug, not a reason to fall back or drop the pool.
+        process_pool.run_parts(operator.add, 0, [1, 2], 1, 0)
+    after = process_pool.stats()
+
+    assert after['running'] and after['fallbacks'] == before['fallbacks']
+    assert process_pool.run_parts(operator.add, [0], [1, 2], 1, 0) == [[0, 1], [0, 2]]
+    assert process_pool.stats()['pooled'] == before['pooled'] + 1
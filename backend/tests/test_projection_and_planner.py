@@ -1,5 +1,10 @@
-from app.services.projection_engine import build_baseline_projections
-from app.services.transfer_planner import plan_one_transfer
+import json
+import random
+from itertools import permutations
+
+from app.domain import get_ruleset, validate_transfer
+from app.services.projection_engine import _scalar_baseline_projections, build_baseline_projections, build_projection_matrix
+from app.services.transfer_planner import _best_lineup, _formation_points, _SwapLineups, plan_one_transfer, plan_transfer_horizon
 
 
 def _player(player_id, position, team, form=2.0, cost=50):
@@ -26,6 +31,32 @@ def test_baseline_projection_represents_blank_and_double_gameweeks():
     assert warnings == []
 
 
+
+def test_columnar_projections_are_byte_identical_to_the_scalar_model():
+    rng = random.Random(5)
+    for _ in range(50):
+        players = [{'id': rng.choice([index, index, None]), 'team': rng.choice([1, 2, 3, None]), 'form': rng.choice(['-0.5', '3.3', '12.35', None, 'n/a']),
+                    'status': rng.choice('adi'), 'chance_of_playing_next_round': rng.choice([None, 0, 25, 75])} for index in range(20)]
+        fixtures = [{'event': rng.choice([None, 1, 2, 3]), 'team_h': rng.choice([1, 2, 3, None]), 'team_a': rng.choice([1, 2, 3]),
+                     'team_h_difficulty': rng.choice([2, 3, 5, None]), 'team_a_difficulty': rng.choice([1, 4])} for _ in range(8)]
+        gameweeks = rng.choice([[1, 2, 3], [3, 1], [2], []])
+
+        columnar = build_baseline_projections(players, fixtures, gameweeks)
+
+        assert json.dumps(columnar) == json.dumps(_scalar_baseline_projections(players, fixtures, gameweeks))
+
+
+def test_projection_matrix_exposes_club_gameweek_arrays():
+    fixtures = [{'event': 1, 'team_h': 10, 'team_a': 20, 'team_h_difficulty': 2, 'team_a_difficulty': 4},
+                {'event': 1, 'team_h': 30, 'team_a': 10, 'team_h_difficulty': 3, 'team_a_difficulty': 2}]
+
+    projection = build_projection_matrix([_player(1, 3, 10, form=5), _player(2, 4, 20, form=4)], fixtures, [1, 2])
+
+    assert projection.player_ids == [1, 2]
+    assert projection.fixture_count.tolist() == [[2, 0], [1, 0]]
+    assert projection.expected_points.tolist() == [[11.0, 0.0], [3.6, 0.0]]
+    assert len(list(projection.rows())) == len(projection) == 4
+
 def test_planner_reports_no_transfer_baseline_and_net_gain():
     squad = _squad()
     incoming = _player(99, 1, 6, form=10, cost=51)
@@ -41,3 +72,136 @@ def test_planner_reports_no_transfer_baseline_and_net_gain():
     assert best['hit_cost'] == 0
     assert best['gross_gain'] == best['net_gain']
     assert best['transfers'][0]['in_player_id'] == 99
+
+
+def _picks(squad):
+    return [{'fpl_player_id': player['id'], 'selling_price_tenths': player['now_cost'], 'squad_position': index + 1}
+            for index, player in enumerate(squad)]
+
+
+def test_horizon_planner_rolls_a_free_transfer_into_a_later_double_move():
+    squad = _squad()
+    pool = squad + [_player(90, 2, 6), _player(91, 3, 7)]
+    values = {(player['id'], gameweek): 2.0 for player in squad for gameweek in (1, 2)}
+    values.update({(3, 1): 5.0, (8, 1): 5.0, (90, 2): 12.0, (91, 2): 12.0})
+    locked = [player['id'] for player in squad if player['id'] not in (3, 8)]
+
+    result = plan_transfer_horizon({'bank_tenths': 0, 'free_transfers': 1}, _picks(squad), pool, values, [1, 2], locked_player_ids=locked)
+
+    best = result['solutions'][0]
+    assert result['status'] == 'optimal'
+    assert [(move['gameweek'], move['in_player_id']) for move in best['transfers']] == [(2, 90), (2, 91)]
+    assert best['hit_cost'] == 0
+    assert best['by_gameweek'][1]['free_transfers'] == 2
+    assert best['net_gain'] == best['gross_gain'] == 30.0
+
+
+def test_horizon_planner_charges_hits_and_respects_limits():
+    squad = _squad()
+    pool = squad + [_player(90, 2, 6), _player(91, 3, 7)]
+    values = {(player['id'], 1): 2.0 for player in squad}
+    values.update({(90, 1): 12.0, (91, 1): 12.0})
+    snapshot = {'bank_tenths': 0, 'free_transfers': 1}
+
+    result = plan_transfer_horizon(snapshot, _picks(squad), pool, values, [1])
+    capped = plan_transfer_horizon(snapshot, _picks(squad), pool, values, [1], max_hit_points=0, locked_player_ids=[3])
+
+    assert result['solutions'][0]['hit_cost'] == 4
+    assert result['solutions'][0]['net_gain'] == 26.0
+    assert all(len(plan['transfers']) == 1 and plan['transfers'][0]['out_player_id'] != 3 for plan in capped['solutions'])
+    assert plan_transfer_horizon(snapshot, _picks(squad), pool, values, [1], max_transfers=6)['status'] == 'invalid_input'
+    assert plan_transfer_horizon(snapshot, _picks(squad), pool, values, [1], locked_player_ids=[90])['status'] == 'invalid_input'
+
+
+def _brute_force_best(squad, pool, values, gameweeks, bank, free_transfers, max_transfers):
+    ruleset, players = get_ruleset(), {player['id']: player for player in pool}
+    baseline = sum(_best_lineup(squad, {pid: values.get((pid, gw), 0) for pid in players})['projected_points'] for gw in gameweeks)
+    swaps = [(gw, out['id'], incoming['id']) for gw in range(len(gameweeks)) for out in pool for incoming in pool
+             if out['element_type'] == incoming['element_type'] and out['id'] != incoming['id']]
+    best = 0.0
+    for count in range(1, max_transfers + 1):
+        for plan in permutations(swaps, count):
+            if list(plan) != sorted(plan, key=lambda move: move[0]):
+                continue
+            owned, cash, available, total, hits, legal = list(squad), bank, free_transfers, 0.0, 0, True
+            for index, gameweek in enumerate(gameweeks):
+                made = [move for move in plan if move[0] == index]
+                if {move[1] for move in made} & {move[2] for move in made}:
+                    legal = False
+                for _, out_id, in_id in made:
+                    owned_ids = [player['id'] for player in owned]
+                    if out_id not in owned_ids or not validate_transfer(owned, out_id, players[in_id], cash, ruleset, players[out_id]['now_cost']).valid:
+                        legal = False
+                        break
+                    cash += players[out_id]['now_cost'] - players[in_id]['now_cost']
+                    owned = [players[in_id] if player['id'] == out_id else player for player in owned]
+                if not legal:
+                    break
+                hits += max(0, len(made) - available) * ruleset.point_cost_per_extra_transfer
+                available = min(ruleset.max_free_transfers, max(0, available - len(made)) + ruleset.free_transfers_per_gameweek)
+                total += _best_lineup(owned, {pid: values.get((pid, gameweek), 0) for pid in players})['projected_points']
+            if legal:
+                best = max(best, round(total - baseline - hits, 3))
+    return best
+
+
+def test_horizon_planner_matches_brute_force_on_a_small_pool():
+    for seed in range(3):
+        rng = random.Random(seed)
+        squad = _squad()
+        candidates = [_player(50 + index, position, rng.randint(1, 7), cost=rng.choice([45, 50, 55]))
+                      for index, position in enumerate([1, 2, 2, 3, 3, 4])]
+        pool = squad + candidates
+        values = {(player['id'], gameweek): rng.randint(0, 80) / 10 for player in pool for gameweek in (1, 2)}
+
+        result = plan_transfer_horizon({'bank_tenths': 5, 'free_transfers': 1}, _picks(squad), pool, values, [1, 2],
+                                       shortlist_size=20)
+
+        best = result['solutions'][0]['net_gain'] if result['solutions'] else 0.0
+        assert best == _brute_force_best(squad, pool, values, [1, 2], 5, 1, 2)
+
+
+def test_single_transfers_search_every_player_and_shortlists_are_not_reported_optimal():
+    squad = _squad()
+    stars = [_player(60 + index, 3, 6, cost=120) for index in range(10)]
+    fillers = [_player(75 + index, 3, 7, cost=40) for index in range(2)]
+    pool = squad + stars + fillers + [_player(80, 3, 7)]
+    values = {(player['id'], 1): 2.0 for player in squad}
+    values.update({(player['id'], 1): 9.0 for player in stars})
+    values[(80, 1)] = 6.0
+    snapshot = {'bank_tenths': 0, 'free_transfers': 1}
+
+    single = plan_transfer_horizon(snapshot, _picks(squad), pool, values, [1], max_transfers=1, shortlist_size=3)
+    double = plan_transfer_horizon(snapshot, _picks(squad), pool, values, [1], max_transfers=2, shortlist_size=3)
+
+    assert single['status'] == 'optimal' and single['solver']['proven_optimal'] and single['warnings'] == []
+    assert single['solutions'][0]['transfers'][0]['in_player_id'] == 80
+    # Player 80 is neither a top-3 nor a cheapest midfielder, but every owned midfielder can afford it directly.
+    assert double['status'] == 'feasible' and not double['solver']['proven_optimal']
+    assert 'shortlist' in double['warnings'][0]
+    assert 80 in [move['in_player_id'] for move in double['solutions'][0]['transfers']]
+
+
+def test_formation_points_match_best_lineup():
+    rng = random.Random(7)
+    for _ in range(200):
+        squad = _squad()
+        values = {player['id']: rng.randint(0, 100) / 10 for player in squad}
+        grouped = [sorted((values[player['id']] for player in squad if player['element_type'] == position), reverse=True)
+                   for position in (1, 2, 3, 4)]
+        assert round(_formation_points(grouped), 3) == _best_lineup(squad, values)['projected_points']
+
+
+def test_swap_lineups_match_best_lineup_of_the_replacement_squad():
+    rng = random.Random(11)
+    for _ in range(100):
+        squad = _squad()
+        pool = squad + [_player(50 + index, position, 6) for index, position in enumerate([1, 2, 3, 4, 2, 3])]
+        # Coarse values create ties, so starter order and captain follow the stable sort.
+        values = {player['id']: rng.choice([0.0, 1.5, 2.0, 2.1, 4.0]) for player in pool}
+        lineups = _SwapLineups(squad, values)
+        for outgoing in squad:
+            for incoming in pool[15:]:
+                if incoming['element_type'] == outgoing['element_type']:
+                    replacement = [incoming if player is outgoing else player for player in squad]
+                    assert lineups.swap(outgoing, incoming) == _best_lineup(replacement, values)
@@ -0,0 +1,69 @@
+import threading
+
+from app.services.projection_cache import ProjectionCache, ProjectionValues
+
+
+class CountingStore:
+    def __init__(self, database_path, rows):
+        self.database_path = database_path
+        self.rows = rows
+        self.reads = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def projection_value_rows(self, projection_set_id):
+        self.reads += 1
+        self.release.wait(5)
+        return [(player_id, gameweek, value + len(projection_set_id)) for player_id, gameweek, value in self.rows]
+
+
+ROWS = [(7, 1, 2.5), (7, 2, 0.0), (9, 2, 4.25), (12, 1, 1.0)]
+
+
+def test_projection_values_behave_like_the_tuple_keyed_dict():
+    values = ProjectionValues.from_rows(ROWS)
+    expected = {(player_id, gameweek): value for player_id, gameweek, value in ROWS}
+
+    assert values == expected
+    assert list(values.items()) == list(expected.items())
+    assert values.get((9, 1), 0) == 0
+    assert values[(7, 2)] == 0.0 and type(values[(7, 2)]) is float
+    assert (9, 1) not in values and len(values) == 4
+    assert ProjectionValues.from_rows([]) == {}
+
+
+def test_cache_shares_one_read_per_set_until_invalidated():
+    cache, store = ProjectionCache(), CountingStore("a.sqlite3", ROWS)
+    store.release.clear()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(store, "set"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    store.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert store.reads == 1
+    assert all(result is results[0] for result in results)
+    cache.invalidate("other.sqlite3")
+    assert cache.get(store, "set") is results[0]
+    cache.invalidate("a.sqlite3")
+    assert cache.get(store, "set") is not results[0]
+    assert store.reads == 2
+
+
+def test_cache_evicts_least_recently_used_sets_by_memory_budget():
+    store = CountingStore("a.sqlite3", ROWS)
+    entry_bytes = ProjectionValues.from_rows(ROWS).nbytes
+    cache = ProjectionCache(max_bytes=2 * entry_bytes)
+
+    first = cache.get(store, "s1")
+    cache.get(store, "s2")
+    cache.get(store, "s1")
+    cache.get(store, "s3")
+
+    assert cache.get(store, "s1") is first
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+    cache.get(store, "s2")
+    assert store.reads == 4
@@ -1,4 +1,6 @@
-from app.domain import get_ruleset, validate_squad, validate_transfer
+import random
+
+from app.domain import TransferLegality, get_ruleset, validate_squad, validate_transfer
 
 
 RULESET = get_ruleset()
@@ -59,3 +61,18 @@ def test_transfer_rejects_unknown_rules_critical_state_and_club_limit():
     assert "bank_unknown" in result.errors
     assert "selling_price_unknown" in result.errors
     assert "club_limit_exceeded" in result.errors
+
+
+def test_transfer_legality_matches_validate_transfer():
+    rng = random.Random(3)
+    for case in range(50):
+        squad = legal_squad()
+        for member in squad:
+            member["team"] = rng.randint(1, 7)
+        legality = TransferLegality(squad, RULESET)
+        bank, sale = rng.choice([0, 5, None]), rng.choice([50, None])
+        for incoming in [player(100 + index, rng.choice(["GK", "DEF", "MID", "FWD"]), rng.choice([1, 2, 8, None]), rng.choice([45, 55, None]))
+                         for index in range(20)] + squad[:3]:
+            for outgoing in (1, 3, 8, 14, 99):
+                expected = validate_transfer(squad, outgoing, incoming, bank, RULESET, sale).valid
+                assert legality.allows(outgoing, incoming, bank, sale) == expected
@@ -0,0 +1,83 @@
+import sqlite3
+import threading
+
+import pytest
+
+from app.utils.sqlite_pool import ConnectionPool, close_pools, configure_pool, get_pool
+
+
+def _pool(tmp_path, **options):
+    pool = ConnectionPool(str(tmp_path / "pool.sqlite3"), **options)
+    with pool.connection() as connection:
+        connection.execute("CREATE TABLE items (value INTEGER)")
+    return pool
+
+
+def test_each_thread_reuses_one_tuned_connection(tmp_path):
+    pool = _pool(tmp_path, cache_kib=2048, mmap_bytes=1 << 20)
+    both_open, seen = threading.Barrier(2), []
+
+    def use():
+        for _ in range(3):
+            with pool.connection() as connection:
+                seen.append(id(connection))
+        both_open.wait(5)
+
+    threads = [threading.Thread(target=use) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(seen)) == 2
+    with pool.connection() as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert connection.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert connection.execute("PRAGMA cache_size").fetchone()[0] == -2048
+        assert connection.execute("PRAGMA mmap_size").fetchone()[0] == 1 << 20
+    assert pool.stats() == {"opened": 3, "reused": 5, "closed": 0, "open": 3}
+
+
+def test_connections_of_finished_threads_are_closed_on_next_open(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.sqlite3"))
+    worker = threading.Thread(target=lambda: pool.connection().__enter__())
+    worker.start()
+    worker.join()
+
+    with pool.connection():
+        pass
+
+    assert pool.stats() == {"opened": 2, "reused": 0, "closed": 1, "open": 1}
+
+
+def test_failed_block_rolls_back_and_keeps_the_connection(tmp_path):
+    pool = _pool(tmp_path)
+
+    with pytest.raises(RuntimeError):
+        with pool.connection() as connection:
+            connection.execute("INSERT INTO items VALUES (1)")
+            raise RuntimeError("boom")
+    with pool.connection() as connection:
+        connection.execute("INSERT INTO items VALUES (2)")
+
+    with sqlite3.connect(pool.database_path) as connection:
+        assert connection.execute("SELECT value FROM items").fetchall() == [(2,)]
+    assert pool.stats()["opened"] == 1
+
+
+def test_unpooled_mode_and_shutdown_close_connections(tmp_path):
+    path = str(tmp_path / "pool.sqlite3")
+    unpooled = configure_pool(path, persistent=False)
+    with unpooled.connection() as connection:
+        connection.execute("CREATE TABLE items (value INTEGER)")
+    assert get_pool(path) is unpooled and unpooled.stats()["open"] == 0
+
+    pooled = configure_pool(path)
+    with pooled.connection() as connection:
+        connection.execute("INSERT INTO items VALUES (1)")
+    close_pools(path)
+
+    assert pooled.stats()["open"] == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        connection.execute("SELECT 1")
+    assert get_pool(path) is not pooled
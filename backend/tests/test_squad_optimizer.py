@@ -1,4 +1,16 @@
-from app.services.squad_optimizer import optimize_squad
+import itertools
+import random
+from collections import Counter
+from unittest.mock import patch
+
+from app import create_app
+from app.domain import get_ruleset, validate_squad
+from app.services import exact_squad_solver
+from app.services.exact_squad_solver import ExactSquadSolver
+from app.services.projection_engine import build_projection_matrix
+from app.services.squad_optimizer import _build_squad, optimize_squad
+from app.services.tracked_team_store import TrackedTeamStore
+from app.services.transfer_planner import _best_lineup, _position
 
 
 def _player(player_id, position, team, cost=50):
@@ -10,6 +22,34 @@ def _pool():
     return [_player(index + 1, position, (index % 5) + 1) for index, position in enumerate(positions)]
 
 
+def _reference_build_squad(players, values, budget, locked_ids, excluded_ids, diversity_ids=frozenset(), width=800):
+    """The dict-and-Counter beam that the array-backed states replaced."""
+    ruleset = get_ruleset()
+    player_by_id = {player['id']: player for player in players}
+    locks = [player_by_id[player_id] for player_id in locked_ids]
+    states = [{'ids': tuple(player['id'] for player in locks), 'cost': sum(player['now_cost'] for player in locks),
+               'score': sum(values.get(player['id'], 0) for player in locks), 'clubs': Counter(player['team'] for player in locks)}]
+    for position, required_count in ruleset.squad_position_counts.items():
+        candidates = [player for player in players if _position(player) == position and player.get('status') == 'a'
+                      and player['id'] not in excluded_ids and player['id'] not in locked_ids]
+        candidates = list({player['id']: player for player in (sorted(candidates, key=lambda player: player.get('now_cost', 10**9))[:40]
+                     + sorted(candidates, key=lambda player: values.get(player['id'], 0), reverse=True)[:80])}.values())
+        for _ in range(required_count - sum(_position(player) == position for player in locks)):
+            next_states = [{'ids': state['ids'] + (player['id'],), 'cost': state['cost'] + player['now_cost'],
+                            'score': state['score'] + values.get(player['id'], 0), 'clubs': state['clubs'] + Counter([player['team']])}
+                           for state in states for player in candidates
+                           if player['id'] not in state['ids'] and state['cost'] + player['now_cost'] <= budget
+                           and state['clubs'][player['team']] < ruleset.max_players_per_club]
+            states = sorted(next_states, key=lambda state: (state['score'] - state['cost'] * 0.025, -state['cost']), reverse=True)[:width]
+            if not states:
+                return None
+    for state in sorted(states, key=lambda state: (state['score'], -state['cost']), reverse=True):
+        squad = [player_by_id[player_id] for player_id in state['ids']]
+        if (not diversity_ids or set(state['ids']) - diversity_ids) and validate_squad(squad, ruleset, budget).valid:
+            return squad
+    return None
+
+
 def test_squad_optimizer_returns_legal_xi_and_captain():
     pool = _pool()
     projections = {(player['id'], 1): float(player['id']) for player in pool}
@@ -30,3 +70,112 @@ def test_squad_optimizer_explains_infeasible_locks():
 
     assert result['status'] == 'infeasible'
     assert 'cannot be both locked and excluded' in result['warnings'][0]
+
+
+def _random_pool(seed):
+    rng = random.Random(seed)
+    positions = [1] * 3 + [2] * 6 + [3] * 6 + [4] * 4
+    return [_player(index + 1, position, index % 6 + 1, rng.choice([40, 45, 50, 55, 60, 70, 85]))
+            for index, position in enumerate(positions)]
+
+
+def _brute_force_points(pool, values, budget):
+    ruleset, best = get_ruleset(), None
+    by_position = {position: [player for player in pool if player['element_type'] == position] for position in (1, 2, 3, 4)}
+    for picks in itertools.product(*(itertools.combinations(by_position[position], count) for position, count in zip((1, 2, 3, 4), (2, 5, 5, 3)))):
+        squad = [player for group in picks for player in group]
+        if validate_squad(squad, ruleset, budget).valid:
+            points = _best_lineup(squad, values)['projected_points']
+            best = points if best is None else max(best, points)
+    return best
+
+
+def test_array_backed_beam_matches_the_reference_beam():
+    for seed in range(4):
+        rng = random.Random(seed)
+        positions = [1] * 6 + [2] * 16 + [3] * 16 + [4] * 10
+        pool = [_player(index + 1, position, rng.randint(1, 10), rng.choice([40, 45, 50, 55, 60, 75, 90, 110]))
+                for index, position in enumerate(positions)]
+        # Coarse values produce many equal keys, exercising the tie order.
+        values = {player['id']: rng.choice([0, 1.5, 2.0, 2.5, 4.0, 7.5]) for player in pool}
+        locks = {6, 30} if seed % 2 else set()
+        for budget in (880, 1000):
+            expected = _reference_build_squad(pool, values, budget, locks, {3}, width=60)
+            assert _build_squad(pool, values, budget, locks, {3}, width=60)[0] == expected
+            if expected:
+                diversity = {player['id'] for player in expected}
+                assert (_build_squad(pool, values, budget, locks, {3}, diversity, width=60)[0]
+                        == _reference_build_squad(pool, values, budget, locks, {3}, diversity, width=60))
+
+
+def test_alternatives_each_add_a_player_outside_every_earlier_solution():
+    rng = random.Random(5)
+    positions = [1] * 6 + [2] * 16 + [3] * 16 + [4] * 10
+    pool = [_player(index + 1, position, index % 10 + 1, rng.choice([40, 45, 50, 55, 60])) for index, position in enumerate(positions)]
+    projections = {(player['id'], 1): round(rng.uniform(0, 8), 1) for player in pool}
+
+    for mode in ('beam', 'exact'):
+        result = optimize_squad(pool, projections, [1], 850, alternative_count=3, mode=mode)
+
+        squads = [{pick['player_id'] for pick in solution['squad']} for solution in result['solutions']]
+        assert [solution['rank'] for solution in result['solutions']] == [1, 2, 3, 4]
+        assert all(squad - set().union(*squads[:rank]) for rank, squad in enumerate(squads[1:], 1))
+
+
+def test_exact_mode_matches_brute_force_and_is_proven_optimal():
+    for seed in range(2):
+        pool = _random_pool(seed)
+        rng = random.Random(seed)
+        projections = {(player['id'], 1): round(rng.uniform(0, 12), 1) for player in pool}
+        values = {player_id: points for (player_id, _), points in projections.items()}
+
+        result = optimize_squad(pool, projections, [1], 850, mode='exact')
+
+        assert result['status'] == 'optimal'
+        assert result['solver']['proven_optimal'] and result['solver']['optimality_gap'] == 0
+        assert result['solutions'][0]['projected_points'] == _brute_force_points(pool, values, 850)
+
+
+def test_exact_mode_is_never_worse_than_the_beam_and_keeps_locks():
+    pool = _random_pool(7)
+    projections = {(player['id'], 1): float(player['now_cost'] % 13) for player in pool}
+
+    beam = optimize_squad(pool, projections, [1], 850, locked_player_ids=[4])
+    exact = optimize_squad(pool, projections, [1], 850, locked_player_ids=[4], mode='exact', alternative_count=1)
+
+    assert exact['solutions'][0]['projected_points'] >= beam['solutions'][0]['projected_points']
+    assert 4 in {pick['player_id'] for pick in exact['solutions'][0]['squad']}
+    assert beam['solver']['mode'] == 'beam' and not beam['solver']['proven_optimal']
+
+
+def test_exact_mode_reports_the_gap_when_the_time_limit_is_reached(monkeypatch):
+    monkeypatch.setattr(exact_squad_solver, '_CHECK_CLOCK_EVERY', 1)
+    pool = _random_pool(3)
+    values = {player['id']: float(player['id'] % 5) for player in pool}
+    # A legal but deliberately weak starting incumbent: the beam's squad for inverted values.
+    inverted = {(player_id, 1): -value for player_id, value in values.items()}
+    incumbent = [pick['player_id'] for pick in optimize_squad(pool, inverted, [1], 850)['solutions'][0]['squad']]
+    solver = ExactSquadSolver(pool, values, 850, [], get_ruleset(), time_limit_ms=1, clock=itertools.count().__next__)
+
+    result = solver.solve(incumbent)
+
+    assert not result.proven_optimal and result.nodes == 1
+    assert result.squad_ids == tuple(incumbent)
+    assert result.upper_bound == result.projected_points + result.optimality_gap and result.optimality_gap > 0
+
+
+def test_exact_mode_rejects_unknown_modes():
+    assert optimize_squad(_pool(), {}, [1], 750, mode='fast')['status'] == 'invalid_input'
+
+
+def test_squad_route_defaults_to_exact_mode(tmp_path):
+    app = create_app({'TESTING': True, 'DATABASE': str(tmp_path / 'tracker.sqlite3')})
+    players = [dict(player, form=str(player['id'] % 4 + 1)) for player in _pool()]
+    projection = build_projection_matrix(players, [], [1])
+    TrackedTeamStore(app.config['DATABASE']).save_projection_set('current', [1], projection.rows(), projection.warnings)
+
+    with patch('app.routes.planning_routes.FPLAPIClient.get_bootstrap_static', return_value={'elements': players}):
+        response = app.test_client().post('/api/v1/optimizations/squad', json={'budget_tenths': 1000, 'gameweeks': [1]})
+
+    assert response.status_code == 200
+    assert response.get_json()['run']['solver']['mode'] == 'exact' and response.get_json()['run']['status'] == 'optimal'
@@ -17,3 +17,11 @@ def test_alerts_report_stale_data_and_unavailable_owned_players():
                           [{'id': 8, 'web_name': 'Sample', 'status': 'i', 'news': 'Knee injury'}])
 
     assert {alert['type'] for alert in alerts} == {'stale_squad', 'player_unavailable'}
+
+
+def test_alerts_accept_an_indexed_player_lookup():
+    now = datetime.now(timezone.utc)
+    alerts = squad_alerts({'refresh_status': 'current'}, {'as_of': now.isoformat()}, [{'fpl_player_id': 8}, {'fpl_player_id': 9}],
+                          {8: {'id': 8, 'web_name': 'Sample', 'status': 'd', 'news': None}, 9: {'id': 9, 'status': 'a'}}, now=now)
+
+    assert [alert['player_id'] for alert in alerts] == [8]
@@ -1,3 +1,4 @@
+import json
 from unittest.mock import patch
 
 from app import create_app
@@ -83,3 +84,70 @@ def test_failed_refresh_records_freshness_error(tmp_path):
     team = client.get("/api/tracked-teams/99").get_json()
     assert team["refresh_status"] == "failed"
     assert team["refresh_error"] == "Unavailable"
+
+
+def _batch_refresh(client, body, picks=PICKS, failing=(), history_calls=None):
+    def team_data(team_id):
+        if team_id in failing:
+            raise FPLAPIError(f"Team {team_id} unavailable")
+        return {**TEAM, "name": f"Team {team_id}"}
+
+    def history(team_id):
+        if history_calls is not None:
+            history_calls.append(team_id)
+        return HISTORY
+
+    with patch("app.routes.tracked_team_routes.FPLAPIClient.get_current_gameweek", return_value=2), \
+         patch("app.routes.tracked_team_routes.FPLAPIClient.get_team_data", side_effect=team_data), \
+         patch("app.routes.tracked_team_routes.FPLAPIClient.get_team_picks", return_value=picks), \
+         patch("app.routes.tracked_team_routes.FPLAPIClient.get_team_history", side_effect=history):
+        return client.post("/api/tracked-teams/refresh", json=body)
+
+
+def test_batch_refresh_imports_teams_concurrently_and_skips_unchanged(tmp_path):
+    client = _app(tmp_path).test_client()
+    _refresh(client)
+
+    first_history_calls, history_calls = [], []
+    first = _batch_refresh(client, {"team_ids": [7, 8, 99], "max_workers": 3}, failing={8}, history_calls=first_history_calls).get_json()
+    failed = client.get("/api/tracked-teams/8").get_json()
+    second = _batch_refresh(client, {}, picks={**PICKS, "entry_history": {**PICKS["entry_history"], "points": 75}},
+                            history_calls=history_calls).get_json()
+
+    assert [(team["fpl_team_id"], team["status"]) for team in first["teams"]] == [(7, "refreshed"), (8, "failed"), (99, "unchanged")]
+    assert first["teams"][1]["error"] == "Team 8 unavailable"
+    assert first["summary"] == {"refreshed": 1, "unchanged": 1, "failed": 1}
+    assert first_history_calls == [7]
+    assert failed["refresh_status"] == "failed"
+    snapshots = client.get("/api/tracked-teams/7/snapshots").get_json()["snapshots"]
+    assert [snapshot["gameweek"] for snapshot in snapshots] == [2, 1]
+    assert second["summary"] == {"refreshed": 3, "unchanged": 0, "failed": 0}
+    assert sorted(history_calls) == [7, 8, 99]
+    assert client.get("/api/tracked-teams/99/snapshots").get_json()["snapshots"][0]["gameweek_points"] == 75
+
+
+def test_batch_refresh_rejects_invalid_input_and_runs_from_the_cli(tmp_path):
+    app = _app(tmp_path)
+    client = app.test_client()
+
+    assert _batch_refresh(client, {"team_ids": "7"}).status_code == 400
+    assert _batch_refresh(client, {"team_ids": [7], "max_workers": 0}).status_code == 400
+    with patch("app.commands.FPLAPIClient.get_current_gameweek", return_value=2), \
+         patch("app.commands.FPLAPIClient.get_team_data", return_value=TEAM), \
+         patch("app.commands.FPLAPIClient.get_team_picks", return_value=PICKS), \
+         patch("app.commands.FPLAPIClient.get_team_history", return_value=HISTORY):
+        output = app.test_cli_runner().invoke(args=["refresh-teams", "--team-id", "5", "--team-id", "6"]).output
+
+    assert json.loads(output)["summary"] == {"refreshed": 2, "unchanged": 0, "failed": 0}
+    assert len(client.get("/api/tracked-teams").get_json()["teams"]) == 2
+
+
+def test_batch_refresh_caps_requested_workers_at_the_configured_limit(tmp_path):
+    client = create_app({"TESTING": True, "DATABASE": str(tmp_path / "tracker.sqlite3"), "REFRESH_WORKERS": 2}).test_client()
+    result = {"teams": [], "summary": {"refreshed": 0, "unchanged": 0, "failed": 0}}
+
+    with patch("app.routes.tracked_team_routes.refresh_tracked_teams", return_value=result) as refresh:
+        assert client.post("/api/tracked-teams/refresh", json={"team_ids": [7], "max_workers": 10000}).status_code == 200
+        assert client.post("/api/tracked-teams/refresh", json={"team_ids": [7], "max_workers": 1}).status_code == 200
+
+    assert [call.args[-1] for call in refresh.call_args_list] == [2, 1]
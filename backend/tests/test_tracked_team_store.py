@@ -0,0 +1,146 @@
+import json
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from app import create_app
+from app.services.projection_engine import build_projection_matrix
+from app.services.tracked_team_store import TrackedTeamStore, initialize_database
+
+
+def _store(tmp_path):
+    path = str(tmp_path / "tracker.sqlite3")
+    initialize_database(path)
+    return TrackedTeamStore(path)
+
+
+def _projection():
+    players = [{"id": player_id, "team": player_id % 3 + 1, "form": "4.5", "status": "a"} for player_id in range(1, 8)]
+    fixtures = [{"event": 1, "team_h": 1, "team_a": 2, "team_h_difficulty": 2, "team_a_difficulty": 4}]
+    return build_projection_matrix(players, fixtures, [1, 2])
+
+
+def test_projection_rows_stream_in_chunks_and_keep_typed_components(tmp_path):
+    store, projection = _store(tmp_path), _projection()
+
+    saved = store.save_projection_set("current", [1, 2], projection.rows(), projection.warnings, chunk_size=3)
+
+    rows = store.projections(saved["id"])
+    expected = sorted(projection.rows(), key=lambda row: (row["fpl_player_id"], row["gameweek"]))
+    assert len(rows) == len(projection) == 14
+    assert [row["expected_points"] for row in rows] == [row["expected_points"] for row in expected]
+    assert rows[0]["components"] == {"official_form": 4.5, "availability": 1.0, "fdr_multiplier": 0.9}
+    assert store.projection_values(saved["id"])[(3, 1)] == 4.95
+
+
+def test_failed_projection_stream_leaves_no_partial_set(tmp_path):
+    store = _store(tmp_path)
+
+    def rows():
+        yield from _projection().rows()
+        raise RuntimeError("model crashed")
+
+    with pytest.raises(RuntimeError):
+        store.save_projection_set("current", [1, 2], rows(), [], chunk_size=4)
+
+    assert store.latest_projection_set() is None
+    with sqlite3.connect(store.database_path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM player_projections").fetchone()[0] == 0
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_json_components_are_migrated_to_typed_columns(tmp_path):
+    path = str(tmp_path / "tracker.sqlite3")
+    with sqlite3.connect(path) as connection:
+        connection.executescript("""
+            CREATE TABLE projection_sets (
+                id TEXT PRIMARY KEY, season TEXT NOT NULL, generated_at TEXT NOT NULL, model_version TEXT NOT NULL,
+                gameweeks_json TEXT NOT NULL, status TEXT NOT NULL, warnings_json TEXT NOT NULL DEFAULT '[]'
+            );
+            INSERT INTO projection_sets VALUES ('old', 'current', '2026-08-01T00:00:00+00:00', 'baseline-0.1', '[1]', 'complete', '[]');
+            CREATE TABLE player_projections (
+                projection_set_id TEXT NOT NULL, fpl_player_id INTEGER NOT NULL, gameweek INTEGER NOT NULL,
+                expected_points REAL NOT NULL, expected_minutes REAL NOT NULL, appearance_probability REAL NOT NULL,
+                risk REAL NOT NULL, fixture_count INTEGER NOT NULL, components_json TEXT NOT NULL,
+                PRIMARY KEY(projection_set_id, fpl_player_id, gameweek)
+            );
+        """)
+        connection.execute("INSERT INTO player_projections VALUES ('old', 7, 1, 3.2, 90.0, 1.0, 0.0, 1, ?)",
+                           (json.dumps({"official_form": 2.9, "availability": 1.0, "fdr_multiplier": 1.1}),))
+
+    initialize_database(path)
+    initialize_database(path)
+
+    with sqlite3.connect(path) as connection:
+        assert "WITHOUT ROWID" in connection.execute("SELECT sql FROM sqlite_master WHERE name = 'player_projections'").fetchone()[0]
+
+    assert TrackedTeamStore(path).projections("old") == [{
+        "fpl_player_id": 7, "gameweek": 1, "expected_points": 3.2, "expected_minutes": 90.0, "appearance_probability": 1.0,
+        "risk": 0.0, "fixture_count": 1, "components": {"official_form": 2.9, "availability": 1.0, "fdr_multiplier": 1.1}}]
+
+
+def _saved_sets(store, season, generated_days):
+    ids = []
+    for day in generated_days:
+        projection = _projection()
+        saved = store.save_projection_set(season, [1, 2], projection.rows(), [])
+        with sqlite3.connect(store.database_path) as connection:
+            connection.execute("UPDATE projection_sets SET generated_at = ? WHERE id = ?",
+                               (datetime(2026, 9, day, tzinfo=timezone.utc).isoformat(), saved["id"]))
+        ids.append(saved["id"])
+    return ids
+
+
+def test_retention_keeps_newest_sets_per_season_and_recent_days(tmp_path):
+    store = _store(tmp_path)
+    current = _saved_sets(store, "current", [1, 2, 3, 4, 5])
+    other = _saved_sets(store, "2025-26", [1])
+
+    result = store.prune_projection_sets(keep_latest=2, keep_days=2, now=datetime(2026, 9, 5, tzinfo=timezone.utc))
+
+    assert result == {"deleted_sets": 2, "deleted_rows": 28}
+    assert [store.get_projection_set(set_id) is not None for set_id in current] == [False, False, True, True, True]
+    assert store.get_projection_set(other[0]) is not None
+    assert store.projections(current[0]) == []
+    with pytest.raises(ValueError):
+        store.prune_projection_sets(keep_latest=0)
+
+
+def test_incremental_compaction_returns_freed_pages(tmp_path):
+    store = _store(tmp_path)
+    _saved_sets(store, "current", range(1, 21))
+    store.prune_projection_sets(keep_latest=1)
+
+    result = store.compact()
+
+    assert result["mode"] == "incremental"
+    assert result["before"]["free_bytes"] > 0
+    assert result["after"]["free_bytes"] == 0
+    assert result["after"]["file_bytes"] < result["before"]["file_bytes"]
+    assert store.storage_stats()["rows"]["projection_sets"] == 1
+
+
+def test_storage_metrics_endpoint_and_compaction_command(tmp_path):
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "tracker.sqlite3"), "PROJECTION_RETENTION_SETS": 1})
+    _saved_sets(TrackedTeamStore(app.config["DATABASE"]), "current", [1, 2, 3])
+
+    metrics = app.test_client().get("/api/v1/storage/metrics").get_json()
+    output = app.test_cli_runner().invoke(args=["compact-db"]).output
+
+    assert metrics["database"]["journal_mode"] == "wal"
+    assert metrics["rows"]["player_projections"] == 42
+    assert metrics["projection_series"][0]["sets"] == 3
+    assert json.loads(output)["retention"] == {"deleted_sets": 2, "deleted_rows": 28}
+
+
+def test_full_compaction_switches_older_files_to_incremental_mode(tmp_path):
+    path = str(tmp_path / "tracker.sqlite3")
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE legacy (value TEXT)")
+    initialize_database(path)
+    store = TrackedTeamStore(path)
+
+    assert store.compact()["mode"] == "full"
+    assert store.storage_stats()["database"]["auto_vacuum"] == "incremental"
+    assert store.compact()["mode"] == "incremental"
@@ -0,0 +1,114 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app import create_app
+from app.utils import fpl_api
+from app.utils.http_session import HTTPSession, http_session
+from app.utils.upstream_archive import UpstreamArchive
+
+
+class VersionedHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"version": %d}' % self.server.version
+        self.send_response(200)
+        self.send_header('ETag', f'"v{self.server.version}"')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), VersionedHandler)
+    server.version = 1
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server, f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def _record(directory, base, paths):
+    session = HTTPSession(sleep=lambda seconds: None)
+    session.archive = UpstreamArchive(str(directory), 'record')
+    for path in paths:
+        session.get(f'{base}{path}')
+    return session.archive
+
+
+def test_recorded_responses_replay_without_the_network(upstream, tmp_path):
+    server, base = upstream
+    _record(tmp_path, base, ['/bootstrap-static/', '/entry/1/'])
+    server.shutdown()
+
+    session = HTTPSession(max_retries=0)
+    session.archive = UpstreamArchive(str(tmp_path), 'replay')
+    response = session.get('http://unreachable.invalid/bootstrap-static/')
+
+    assert response.status_code == 200
+    assert response.json() == {'version': 1}
+    assert response.headers['etag'] == '"v1"'
+    assert session.stats()['requests'] == 0
+    assert session.archive.stats() == {'recorded': 0, 'replayed': 1, 'missing': 0, 'paths': 2, 'responses': 2}
+
+
+def test_replay_at_serves_the_state_of_that_moment(upstream, tmp_path):
+    server, base = upstream
+    archive = _record(tmp_path, base, ['/fixtures/'])
+    first_recorded = archive._entries['/fixtures/'][0]['recorded_at']
+    server.version = 2
+    _record(tmp_path, base, ['/fixtures/'])
+
+    latest = UpstreamArchive(str(tmp_path), 'replay')
+    earlier = UpstreamArchive(str(tmp_path), 'replay', replay_at=first_recorded)
+    before_any = UpstreamArchive(str(tmp_path), 'replay', replay_at='2000-01-01T00:00:00Z')
+
+    assert latest.replay(f'{base}/fixtures/').json() == {'version': 2}
+    assert earlier.replay(f'{base}/fixtures/').json() == {'version': 1}
+    with pytest.raises(requests.ConnectionError):
+        before_any.replay(f'{base}/fixtures/')
+    assert latest.stats()['responses'] == 2
+    assert len(list((tmp_path / 'bodies').rglob('*'))) == 4  # Two digest directories holding one body each.
+
+
+def test_replay_latency_is_fixed_or_as_recorded(upstream, tmp_path):
+    _, base = upstream
+    archive = _record(tmp_path, base, ['/element/1/'])
+    recorded_ms = archive._entries['/element/1/'][0]['elapsed_ms']
+    delays = []
+
+    UpstreamArchive(str(tmp_path), 'replay', latency=0.2, sleep=delays.append).replay(f'{base}/element/1/')
+    UpstreamArchive(str(tmp_path), 'replay', latency='recorded', sleep=delays.append).replay(f'{base}/element/1/')
+    UpstreamArchive(str(tmp_path), 'replay', sleep=delays.append).replay(f'{base}/element/1/')
+
+    assert delays == ([0.2, recorded_ms / 1000] if recorded_ms else [0.2])
+
+
+def test_unrecorded_paths_surface_as_upstream_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_session, 'archive', UpstreamArchive(str(tmp_path), 'replay'))
+
+    with pytest.raises(fpl_api.FPLAPIError):
+        fpl_api._get_json('/entry/404/')
+    assert http_session.archive.stats()['missing'] == 1
+
+
+def test_app_config_selects_the_archive(tmp_path):
+    try:
+        create_app({'TESTING': True, 'DATABASE': str(tmp_path / 'tracker.sqlite3'), 'UPSTREAM_MODE': 'replay',
+                    'UPSTREAM_ARCHIVE': str(tmp_path / 'archive'), 'REPLAY_LATENCY': '0.05'})
+        assert http_session.archive.mode == 'replay'
+        assert http_session.archive.latency == 0.05
+    finally:
+        create_app({'TESTING': True, 'DATABASE': str(tmp_path / 'tracker.sqlite3')})
+    assert http_session.archive is None
+    with pytest.raises(ValueError):
+        UpstreamArchive(str(tmp_path), 'live')